@@ -0,0 +1,46 @@
+"""Per-lookup latency through the agent vs. unlocking in-process
+
+Usage: python benchmarks/bench_agent.py [--repeat N]
+"""
+
+import argparse
+import threading
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli.agent import AgentServer, connect_agent, socket_path
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=db_path)
+    pm.store_password('github', 'johndoe', 'hunter2')
+
+    report('unlock + get_password (no cache)',
+           measure(lambda: PasswordManager(KEY, db_path=db_path).get_password('github', 'johndoe'),
+                   max(1, args.repeat // 20)))
+    report('unlock + get_password (key cache)',
+           measure(lambda: PasswordManager(KEY, db_path=db_path, use_key_cache=True)
+                   .get_password('github', 'johndoe'), args.repeat))
+
+    server = AgentServer(socket_path(db_path), pm, ttl=600)
+    thread = threading.Thread(target=server.serve_until_locked, daemon=True)
+    thread.start()
+    client = connect_agent(db_path)
+    report('agent get_password',
+           measure(lambda: client.get_password('github', 'johndoe'), args.repeat))
+    client.lock()
+    thread.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Throughput and event-loop stalls under concurrent lookups
+
+Compares calling the blocking PasswordManager from coroutines with
+AsyncPasswordManager. Lookups follow a skewed distribution over --hot keys,
+so concurrent requests for the same entry can be coalesced.
+
+Usage: python benchmarks/bench_async.py [--rows 10000] [--tasks 100] [--lookups 50] [--hot 50]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.aio import AsyncPasswordManager
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+async def run_load(get_password, keys: list, tasks: int, lookups: int) -> tuple:
+    """Return (ops/s, worst event loop lag in ms) for the given lookup coroutine"""
+    stop = asyncio.Event()
+    worst_lag = 0.0
+
+    async def ticker():
+        nonlocal worst_lag
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst_lag = max(worst_lag, time.perf_counter() - start - 0.001)
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(lookups):
+            service_name, username = keys[min(int(rng.expovariate(0.2)), len(keys) - 1)]
+            await get_password(service_name, username)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(tasks)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return tasks * lookups / elapsed, worst_lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--tasks', type=int, default=100)
+    parser.add_argument('--lookups', type=int, default=50)
+    parser.add_argument('--hot', type=int, default=50)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=db_path)
+    pm.store_many((f'service-{i}', 'user', f'password-{i}') for i in range(args.rows))
+    keys = [(f'service-{i}', 'user') for i in random.Random(1).sample(range(args.rows), args.hot)]
+
+    async def blocking(service_name, username):
+        return pm.get_password(service_name, username)
+
+    async def scenario():
+        rate, lag = await run_load(blocking, keys, args.tasks, args.lookups)
+        print(f"{'blocking PasswordManager':<40} {rate:10.0f} ops/s   worst loop lag {lag:8.2f} ms")
+
+        async with await AsyncPasswordManager.open(KEY, db_path) as vault:
+            decrypts = 0
+            decrypt = vault._pm._decrypt
+
+            def counting_decrypt(token):
+                nonlocal decrypts
+                decrypts += 1
+                return decrypt(token)
+
+            vault._pm._decrypt = counting_decrypt
+            rate, lag = await run_load(vault.get_password, keys, args.tasks, args.lookups)
+            print(f"{'AsyncPasswordManager':<40} {rate:10.0f} ops/s   worst loop lag {lag:8.2f} ms")
+            total = args.tasks * args.lookups
+            print(f"{'':<40} {decrypts} decrypts for {total} lookups "
+                  f"({total - decrypts} coalesced)")
+
+    asyncio.run(scenario())
+    pm.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Vault audit: a full pass vs. an incremental one from the audit cache
+
+Usage: python benchmarks/bench_audit.py [--rows N] [--changed N] [--workers N]
+"""
+
+import argparse
+import random
+import resource
+import time
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    report = fn()
+    print(f"{label:<32} {time.perf_counter() - start:8.2f} s   processed {report['processed']:>7}   "
+          f"reused groups {len(report['reused']):>6}   weak {len(report['weak']):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--changed', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%'
+
+    def password(n: int) -> str:
+        # Every tenth entry reuses a password, every twentieth is short
+        if n % 10 == 0:
+            return f'shared-{n % 1000}'
+        return ''.join(rng.choice(alphabet) for _ in range(8 if n % 20 == 1 else 20))
+
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=temp_db_path())
+    pm.store_many((f'service-{n}', 'user', password(n)) for n in range(args.rows))
+
+    timed('full audit (no cache)', lambda: pm.audit(use_cache=False, workers=args.workers))
+    timed('first audit (fills cache)', lambda: pm.audit(workers=args.workers))
+    pm.store_many((f'service-{n}', 'user', password(n)) for n in range(args.changed))
+    timed(f'audit after {args.changed} changes', lambda: pm.audit(workers=args.workers))
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Subprocess spawns and latency per command with the cached auth check
+
+A fake `sudo` that always succeeds is put first on PATH, so the real
+subprocess cost is measured without prompting.
+
+Usage: python benchmarks/bench_auth.py [--repeat N]
+"""
+
+import argparse
+import os
+import stat
+import sys
+import tempfile
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from click.testing import CliRunner
+
+from pass_cli.commands.list import list as list_command
+from pass_cli.commands.retrieve import retrieve
+from pass_cli.commands.store import store
+from pass_cli.database import PasswordManager
+from pass_cli.utils import check_initialized, check_sudo
+
+KEY = 'benchmark-key'
+spawns = 0
+
+
+def count_spawns(event, args):
+    global spawns
+    if event in ('subprocess.Popen', 'os.posix_spawn', 'os.fork', 'os.exec'):
+        spawns += 1
+
+
+def install_fake_sudo():
+    bin_dir = tempfile.mkdtemp(prefix='pass-cli-bench-bin-')
+    sudo = os.path.join(bin_dir, 'sudo')
+    with open(sudo, 'w') as f:
+        f.write('#!/bin/sh\nexit 0\n')
+    os.chmod(sudo, stat.S_IRWXU)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+
+def main():
+    global spawns
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    install_fake_sudo()
+    sys.addaudithook(count_spawns)
+    db_path = temp_db_path()
+    runner = CliRunner()
+    commands = [
+        ('store', store, ['-s', 'github', '-u', 'johndoe', '-p', 'hunter2']),
+        ('retrieve', retrieve, ['-s', 'github', '-u', 'johndoe', '--no-copy']),
+        ('list', list_command, []),
+    ]
+
+    with patch('keyring.set_password'), \
+            patch('keyring.get_password', return_value=KEY), \
+            patch.object(PasswordManager, 'DEFAULT_DB_PATH', db_path):
+        PasswordManager(KEY, db_path=db_path).close()
+
+        spawns = 0
+        timings = measure(check_sudo, args.repeat)
+        print(f'uncached check_sudo: {spawns // args.repeat} spawn(s) per call')
+        report('  check_sudo (sudo -n true)', timings)
+        report('  check_initialized (read-only probe)', measure(check_initialized, args.repeat))
+        print()
+
+        for name, command, command_args in commands:
+            spawns = 0
+            runner.invoke(command, command_args)
+            first = spawns
+            spawns = 0
+            timings = measure(lambda: runner.invoke(command, command_args), args.repeat)
+            print(f'{name:<10} first run: {first} spawn(s), '
+                  f'next {args.repeat} runs: {spawns} spawn(s)')
+            report(f'  {name} (warm auth token)', timings)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Breach index: build time, lookup latency and memory use
+
+Generates a sorted HIBP-style dump of synthetic hashes, builds the index and
+times lookups of present and absent passwords.
+
+Usage: python benchmarks/bench_breach.py [--hashes N] [--lookups N]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from common import measure, report
+
+from pass_cli.breach import BreachIndex, build_index
+
+
+def rss_mib() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hashes', type=int, default=2000000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='pass-cli-bench-')
+    dump, index_path = os.path.join(workdir, 'dump.txt'), os.path.join(workdir, 'breach.idx')
+    hashes = sorted(hashlib.sha1(f'password{n}'.encode()).hexdigest().upper()
+                    for n in range(args.hashes))
+    with open(dump, 'w') as f:
+        f.writelines(f'{h}:1\n' for h in hashes)
+    del hashes
+
+    start = time.perf_counter()
+    build_index(dump, index_path)
+    print(f"build: {time.perf_counter() - start:.1f}s for {args.hashes} hashes, "
+          f"dump {os.path.getsize(dump) / 2 ** 20:.0f} MiB -> index "
+          f"{os.path.getsize(index_path) / 2 ** 20:.0f} MiB")
+
+    with BreachIndex(index_path) as index:
+        # Only the fanout entries and a few hash pages are read per lookup
+        before = rss_mib()
+        for n in range(100):
+            f'password{n * 997}' in index
+        print(f"RSS growth from 100 lookups: {rss_mib() - before:.2f} MiB")
+
+        present = iter(f'password{n}' for n in range(0, args.hashes, max(1, args.hashes // args.lookups)))
+        absent = iter(f'absent{n}' for n in range(args.lookups))
+        report('lookup (breached)', measure(lambda: next(present) in index, args.lookups))
+        report('lookup (not breached)', measure(lambda: next(absent) in index, args.lookups))
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
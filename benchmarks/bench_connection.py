@@ -0,0 +1,53 @@
+"""Sequential get_password calls on one persistent connection vs. a new
+connection per call (the pre-pooling behaviour)
+
+Usage: python benchmarks/bench_connection.py [--calls N] [--repeat N]
+"""
+
+import argparse
+import sqlite3
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def get_password_reconnecting(pm, service_name, username):
+    with sqlite3.connect(pm.db_path) as conn:
+        row = conn.execute('''
+            SELECT encrypted_password FROM passwords
+            WHERE service_name = ? AND username = ?
+        ''', (service_name, username)).fetchone()
+    return pm.cipher_suite.decrypt(row[0].encode()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=db_path)
+    for i in range(100):
+        pm.store_password(f'service-{i}', 'johndoe', f'password-{i}')
+
+    def persistent():
+        for i in range(args.calls):
+            pm.get_password(f'service-{i % 100}', 'johndoe')
+
+    def reconnecting():
+        for i in range(args.calls):
+            get_password_reconnecting(pm, f'service-{i % 100}', 'johndoe')
+
+    report(f'{args.calls} x get_password (new connection)', measure(reconnecting, args.repeat))
+    report(f'{args.calls} x get_password (persistent)', measure(persistent, args.repeat))
+    pm.close()
+
+
+if __name__ == '__main__':
+    main()
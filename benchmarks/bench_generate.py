@@ -0,0 +1,80 @@
+"""Password generation throughput: secrets.choice per character vs. PasswordGenerator
+
+The legacy rows reproduce the original generate_strong_password, which made
+one secrets.choice() call (and one os.urandom read) per character plus a
+shuffle per password. The wordlist rows compare loading the packed passphrase
+wordlist against parsing the same words from a text file.
+
+Usage: python benchmarks/bench_generate.py [--count N] [--length N] [--repeat N]
+"""
+
+import argparse
+import os
+import secrets
+import string
+import tempfile
+
+from common import measure, report
+
+from pass_cli import wordlist
+from pass_cli.generator import PassphraseGenerator, PasswordGenerator
+
+SPECIAL = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+
+def legacy_password(length: int) -> str:
+    lowercase = string.ascii_lowercase
+    uppercase = string.ascii_uppercase
+    digits = string.digits
+    password = [
+        secrets.choice(lowercase),
+        secrets.choice(uppercase),
+        secrets.choice(digits),
+        secrets.choice(SPECIAL)
+    ]
+    all_characters = lowercase + uppercase + digits + SPECIAL
+    password.extend(secrets.choice(all_characters) for _ in range(length - 4))
+    secrets.SystemRandom().shuffle(password)
+    return ''.join(password)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--length', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    count, length = args.count, args.length
+    generator = PasswordGenerator(length)
+    passphrases = PassphraseGenerator()
+
+    cases = [
+        ('legacy secrets.choice', lambda: [legacy_password(length) for _ in range(count)]),
+        ('PasswordGenerator.generate', lambda: [generator.generate() for _ in range(count)]),
+        ('PasswordGenerator.generate_many', lambda: list(generator.generate_many(count))),
+        ('PassphraseGenerator.generate_many', lambda: list(passphrases.generate_many(count))),
+    ]
+    for name, fn in cases:
+        timings = measure(fn, args.repeat)
+        report(f'{name} x{count}', timings)
+        print(f"{'':<40} {count / min(timings):12,.0f} passwords/s")
+
+    text_path = os.path.join(tempfile.mkdtemp(prefix='pass-cli-bench-'), 'words.txt')
+    with open(text_path, 'w') as f:
+        f.write('\n'.join(f'{n:05d}\t{word}' for n, word in enumerate(wordlist.load())))
+
+    def parse_text():
+        with open(text_path) as f:
+            return [line.split('\t')[1] for line in f.read().splitlines()]
+
+    def load_packed():
+        wordlist.load.cache_clear()
+        return wordlist.load()
+
+    report('wordlist: parse text file', measure(parse_text, args.repeat * 20))
+    report('wordlist: load packed blob', measure(load_packed, args.repeat * 20))
+
+
+if __name__ == '__main__':
+    main()
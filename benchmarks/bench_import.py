@@ -0,0 +1,64 @@
+"""Bulk import throughput and peak memory vs. one store_password per entry
+
+Usage: python benchmarks/bench_import.py [--entries N]
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.database import PasswordManager
+from pass_cli.formats import read_records, write_records
+
+KEY = 'benchmark-key'
+
+
+def open_vault() -> PasswordManager:
+    with patch('keyring.set_password'):
+        return PasswordManager(KEY, db_path=temp_db_path())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=50000)
+    args = parser.parse_args()
+
+    source = io.StringIO()
+    write_records(source, 'csv', ((f'service-{i}', 'johndoe', f'password-{i}')
+                                  for i in range(args.entries)))
+
+    pm = open_vault()
+    source.seek(0)
+    start = time.perf_counter()
+    count = pm.store_many(read_records(source, 'csv'))
+    elapsed = time.perf_counter() - start
+    print(f"store_many:        {count} entries in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+    pm = open_vault()
+    source.seek(0)
+    tracemalloc.start()
+    pm.store_many(read_records(source, 'csv'))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"store_many peak traced memory: {peak / 1024:,.0f} KiB")
+
+    sample = min(args.entries, 2000)
+    pm = open_vault()
+    source.seek(0)
+    start = time.perf_counter()
+    for service_name, username, password in read_records(source, 'csv'):
+        pm.store_password(service_name, username, password)
+        sample -= 1
+        if not sample:
+            break
+    elapsed = time.perf_counter() - start
+    count = min(args.entries, 2000)
+    print(f"store_password:    {count} entries in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+
+if __name__ == '__main__':
+    main()
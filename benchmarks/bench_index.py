@@ -0,0 +1,62 @@
+"""Lookup latency with and without the (service_name, username) index
+
+Usage: python benchmarks/bench_index.py [--sizes 10000,100000,1000000] [--lookups N]
+"""
+
+import argparse
+import random
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def build_vault(rows: int) -> PasswordManager:
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=temp_db_path())
+    encrypted = pm.cipher_suite.encrypt(b'hunter2').decode()
+    with pm._conn:
+        pm._conn.executemany(
+            'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+            ((f'service-{i}', f'user-{i}', encrypted) for i in range(rows)))
+    return pm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    query = '''
+        SELECT encrypted_password FROM passwords
+        WHERE service_name = ? AND username = ?
+    '''
+    for rows in (int(size) for size in args.sizes.split(',')):
+        pm = build_vault(rows)
+        keys = [random.randrange(rows) for _ in range(args.lookups)]
+        keys_iter = iter(keys * 2)
+
+        def lookup():
+            i = next(keys_iter)
+            pm.get_password(f'service-{i}', f'user-{i}')
+
+        report(f'{rows:>8} rows get_password (indexed)', measure(lookup, args.lookups))
+
+        pm._conn.execute('DROP INDEX idx_passwords_service_username')
+        unindexed = min(args.lookups, 20)
+        keys_iter = iter(keys)
+
+        def scan():
+            i = next(keys_iter)
+            pm._conn.execute(query, (f'service-{i}', f'user-{i}')).fetchone()
+
+        report(f'{rows:>8} rows lookup (full scan)', measure(scan, unindexed))
+        pm.close()
+
+
+if __name__ == '__main__':
+    main()
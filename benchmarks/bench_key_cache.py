@@ -0,0 +1,49 @@
+"""Cold vs. warm unlock latency with the derived key cache
+
+Usage: python benchmarks/bench_key_cache.py [--repeat N]
+"""
+
+import argparse
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from click.testing import CliRunner
+
+from pass_cli.commands.retrieve import retrieve
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'), \
+            patch('keyring.get_password', return_value=KEY), \
+            patch('subprocess.run') as mock_run, \
+            patch.object(PasswordManager, 'DEFAULT_DB_PATH', db_path):
+        mock_run.return_value.returncode = 0
+        pm = PasswordManager(KEY, db_path=db_path)
+        pm.store_password('github', 'johndoe', 'hunter2')
+
+        def unlock():
+            PasswordManager(KEY, db_path=db_path, use_key_cache=True).get_password('github', 'johndoe')
+
+        report('unlock + get_password (cold)', measure(unlock, args.repeat, setup=pm.clear_key_cache))
+        report('unlock + get_password (warm)', measure(unlock, args.repeat))
+
+        runner = CliRunner()
+
+        def command():
+            runner.invoke(retrieve, ['-s', 'github', '-u', 'johndoe', '--no-copy'])
+
+        report('pass-cli retrieve (cold)', measure(command, args.repeat, setup=pm.clear_key_cache))
+        report('pass-cli retrieve (warm)', measure(command, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Listing throughput and memory: fetchall + per-line echo vs streamed batches
+
+Usage: python benchmarks/bench_list.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import tracemalloc
+from unittest.mock import patch
+
+import click
+from common import measure, report, temp_db_path
+
+from pass_cli.database import PasswordManager
+from pass_cli.formats import BufferedWriter, write_records
+
+KEY = 'benchmark-key'
+
+
+def build_vault(rows: int) -> PasswordManager:
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=temp_db_path())
+    encrypted = pm.cipher_suite.encrypt(b'hunter2').decode()
+    with pm._conn:
+        pm._conn.executemany(
+            'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+            ((f'service-{i:07d}', f'user-{i}', encrypted) for i in range(rows)))
+    return pm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pm = build_vault(args.rows)
+    devnull = open(os.devnull, 'w')
+
+    def legacy():
+        rows = pm._conn.execute('SELECT service_name, username FROM passwords').fetchall()
+        for service_name, username in rows:
+            click.echo(f"Service: {service_name}", file=devnull)
+            click.echo(f"Username: {username}", file=devnull)
+            click.echo("─" * 50, file=devnull)
+
+    def streamed():
+        stream = BufferedWriter(lambda text: click.echo(text, nl=False, file=devnull))
+        write_records(stream, 'tsv', pm.list_passwords(), fields=('service', 'username'))
+        stream.flush()
+
+    for name, fn in (('fetchall + echo per line', legacy), ('streamed tsv', streamed)):
+        report(f'{args.rows} rows {name}', measure(fn, args.repeat))
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{'':<40} peak memory {peak / 1024 / 1024:9.1f} MiB")
+
+    page = 100
+    middle = args.rows // 2
+    after = (f'service-{middle - 1:07d}', f'user-{middle - 1}')
+    report(f'page at offset {middle}',
+           measure(lambda: sum(1 for _ in pm.list_passwords(limit=page, offset=middle)), 20))
+    report('page after keyset cursor',
+           measure(lambda: sum(1 for _ in pm.list_passwords(limit=page, after=after)), 20))
+    report('prefix filter (100 rows)',
+           measure(lambda: sum(1 for _ in pm.list_passwords(prefix='service-00001')), 20))
+    pm.close()
+    devnull.close()
+
+
+if __name__ == '__main__':
+    main()
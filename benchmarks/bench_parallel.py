@@ -0,0 +1,46 @@
+"""Bulk decryption (export) and encryption (import) throughput by worker count
+
+Usage: python benchmarks/bench_parallel.py [--entries N] [--workers 1,2,4,0]
+"""
+
+import argparse
+import os
+import time
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--workers', default='1,2,4,0',
+                        help='Comma-separated worker counts, 0 for one per CPU')
+    args = parser.parse_args()
+
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=temp_db_path())
+    records = [(f'service-{i}', 'johndoe', f'password-{i}') for i in range(args.entries)]
+
+    for workers in (int(w) for w in args.workers.split(',')):
+        label = f'{workers or os.cpu_count()} workers'
+
+        pm._conn.execute('DELETE FROM passwords')
+        pm._conn.commit()
+        start = time.perf_counter()
+        pm.store_many(records, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f'store_many {label:<12} {args.entries / elapsed:>10,.0f} rows/s')
+
+        start = time.perf_counter()
+        count = sum(1 for _ in pm.iter_all(workers))
+        elapsed = time.perf_counter() - start
+        print(f'iter_all   {label:<12} {count / elapsed:>10,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Key rotation throughput by batch size
+
+Usage: python benchmarks/bench_rekey.py [--entries N] [--batch-sizes 100,500,5000] [--workers N]
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.database import PasswordManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--batch-sizes', default='100,500,5000')
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+        with patch('keyring.set_password'), patch('keyring.get_password'), \
+                patch('keyring.delete_password'):
+            pm = PasswordManager('old-key', db_path=temp_db_path())
+            pm.store_many((f'service-{i}', 'johndoe', f'password-{i}')
+                          for i in range(args.entries))
+            start = time.perf_counter()
+            count = pm.rekey('new-key', batch_size=batch_size, workers=args.workers)
+            elapsed = time.perf_counter() - start
+        print(f'batch size {batch_size:>6}: {count} rows in {elapsed:.2f}s '
+              f'({count / elapsed:,.0f} rows/s)')
+        pm.close()
+
+
+if __name__ == '__main__':
+    main()
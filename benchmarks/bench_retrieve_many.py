@@ -0,0 +1,47 @@
+"""Batched lookups: get_passwords() vs. one get_password() per secret
+
+`retrieve` pays an unlock per secret, `retrieve-many` pays it once, so the
+unlock rows show the per-command cost of fetching one vs. all secrets.
+
+Usage: python benchmarks/bench_retrieve_many.py [--rows N] [--secrets N] [--repeat N]
+"""
+
+import argparse
+import random
+
+from common import build_vault, measure, report
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--secrets', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    pm = build_vault(args.rows, KEY)
+    rng = random.Random(0)
+    keys = [(f'service-{n}', f'user-{n}') for n in rng.sample(range(args.rows), args.secrets)]
+
+    report('get_password x1', measure(lambda: pm.get_password(*keys[0]), args.repeat))
+    report(f'get_password x{args.secrets}',
+           measure(lambda: [pm.get_password(*key) for key in keys], args.repeat))
+    report(f'get_passwords({args.secrets})', measure(lambda: pm.get_passwords(keys), args.repeat))
+
+    def unlocked(fn):
+        with PasswordManager(KEY, db_path=pm.db_path) as vault:
+            fn(vault)
+
+    repeat = max(1, args.repeat // 10)
+    report('unlock + get_password x1',
+           measure(lambda: unlocked(lambda vault: vault.get_password(*keys[0])), repeat))
+    report(f'unlock + get_passwords({args.secrets})',
+           measure(lambda: unlocked(lambda vault: vault.get_passwords(keys)), repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Search latency: trigram FTS5 index vs LIKE scan vs scan-and-filter in Python
+
+Usage: python benchmarks/bench_search.py [--rows 1000000] [--repeat 20]
+"""
+
+import argparse
+import random
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+WORDS = ['github', 'gitlab', 'gmail', 'slack', 'aws', 'azure', 'bank', 'shop', 'vpn', 'jira']
+
+
+def build_vault(rows: int) -> PasswordManager:
+    with patch('keyring.set_password'):
+        pm = PasswordManager(KEY, db_path=temp_db_path())
+    encrypted = pm.cipher_suite.encrypt(b'hunter2').decode()
+    rng = random.Random(0)
+    with pm._conn:
+        pm._conn.executemany(
+            'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+            ((f'{rng.choice(WORDS)}-{i}', f'user{rng.randrange(rows)}@example.com', encrypted)
+             for i in range(rows)))
+    return pm
+
+
+def scan_and_filter(pm: PasswordManager, query: str, limit: int) -> list:
+    terms = query.lower().split()
+    matches = []
+    for service_name, username in pm.list_passwords():
+        text = f'{service_name} {username}'.lower()
+        if all(term in text for term in terms):
+            matches.append((service_name, username))
+    return matches[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pm = build_vault(args.rows)
+    queries = ['hub-12345', 'user4242', 'slack 999']
+    for query in queries:
+        report(f"fts  '{query}'", measure(lambda: list(pm.search(query)), args.repeat))
+
+        pm._search_index = False
+        report(f"like '{query}'",
+               measure(lambda: list(pm.search(query)), max(1, args.repeat // 10)))
+        pm._search_index = True
+
+        report(f"scan '{query}'",
+               measure(lambda: scan_and_filter(pm, query, 20), max(1, args.repeat // 10)))
+    pm.close()
+
+
+if __name__ == '__main__':
+    main()
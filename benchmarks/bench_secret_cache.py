@@ -0,0 +1,42 @@
+"""Repeated get_password calls with and without the decrypted value cache
+
+Usage: python benchmarks/bench_secret_cache.py [--calls N] [--repeat N]
+"""
+
+import argparse
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'):
+        PasswordManager(KEY, db_path=db_path).store_many(
+            (f'service-{i}', 'deploy', f'password-{i}') for i in range(5))
+
+    for cache_size in (0, 16):
+        pm = PasswordManager(KEY, db_path=db_path, cache_size=cache_size)
+
+        def lookups():
+            for i in range(args.calls):
+                pm.get_password(f'service-{i % 5}', 'deploy')
+
+        report(f'{args.calls} x get_password (cache_size={cache_size})',
+               measure(lookups, args.repeat))
+        if cache_size:
+            print(f'cache stats: {pm.cache_stats()}')
+        pm.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""CLI startup latency and the slowest imports for a command
+
+Usage: python benchmarks/bench_startup.py [--repeat N] [ARGS...]
+Example: python benchmarks/bench_startup.py generate --no-copy
+"""
+
+import argparse
+import subprocess
+import sys
+
+from common import ROOT, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('args', nargs='*', default=['--help'])
+    args = parser.parse_args()
+
+    code = f"from pass_cli.cli import main\nmain({args.args!r})"
+
+    def run(*options):
+        return subprocess.run([sys.executable, *options, '-c', code], cwd=ROOT,
+                              capture_output=True, text=True)
+
+    report(f"python -c 'pass-cli {' '.join(args.args)}'", measure(run, args.repeat))
+    report("python -c 'pass' (interpreter baseline)",
+           measure(lambda: subprocess.run([sys.executable, '-c', 'pass']), args.repeat))
+
+    imports = []
+    for line in run('-X', 'importtime').stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            self_us, _, name = line[len('import time:'):].split('|')
+            imports.append((int(self_us), name.strip()))
+    print('\nSlowest imports (self time):')
+    for self_us, name in sorted(imports, reverse=True)[:10]:
+        print(f'  {self_us / 1000:8.2f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Stress test: many threads doing mixed store/retrieve/delete on one PasswordManager
+
+Reports throughput and lock contention counters for several pool sizes.
+
+Usage: python benchmarks/bench_threads.py [--threads 16] [--seconds 3] [--pool-sizes 1,4,8]
+"""
+
+import argparse
+import random
+import threading
+import time
+from unittest.mock import patch
+
+from common import temp_db_path
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def run(pm: PasswordManager, threads: int, seconds: float, keys: int) -> tuple:
+    deadline = time.perf_counter() + seconds
+    counts = [0] * threads
+    errors = []
+
+    def worker(n: int):
+        rng = random.Random(n)
+        try:
+            while time.perf_counter() < deadline:
+                service = f'service-{rng.randrange(keys)}'
+                roll = rng.random()
+                if roll < 0.7:
+                    pm.get_password(service, 'user')
+                elif roll < 0.95:
+                    pm.store_password(service, 'user', 'hunter2')
+                else:
+                    pm.delete_password(service, 'user')
+                counts[n] += 1
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--keys', type=int, default=1000)
+    parser.add_argument('--pool-sizes', default='1,4,8')
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'):
+        PasswordManager(KEY, db_path=db_path).close()
+
+    for pool_size in (int(size) for size in args.pool_sizes.split(',')):
+        pm = PasswordManager(KEY, db_path=db_path, thread_safe=True, pool_size=pool_size)
+        rate, errors = run(pm, args.threads, args.seconds, args.keys)
+        stats = pm.pool_stats()
+        print(f"pool_size={pool_size:<3} {rate:10.0f} ops/s   errors {len(errors)}   "
+              f"writer waits {stats['writer_waits']}   reader waits {stats['reader_waits']}   "
+              f"busy retries {stats['busy_retries']}")
+        pm.close()
+
+
+if __name__ == '__main__':
+    main()
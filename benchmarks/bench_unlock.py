@@ -0,0 +1,51 @@
+"""Unlock latency: separate verifier and cipher key derivations vs one KDF pass + HKDF split
+
+The two-pass baseline derives the verifier and the Fernet key with the same
+KDF parameters (equal strength), as an unlock that verifies the key as
+strongly as it encrypts would have to.
+
+Usage: python benchmarks/bench_unlock.py [--algorithm argon2id] [--repeat 10]
+"""
+
+import argparse
+from unittest.mock import patch
+
+from common import measure, report, temp_db_path
+
+from pass_cli import kdf
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--algorithm', choices=kdf.available_algorithms(),
+                        default=kdf.default_algorithm())
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    params = kdf.default_params(args.algorithm)
+    print(f"{args.algorithm} {params}")
+    verifier_spec = kdf.new_spec(args.algorithm, params)
+    cipher_spec = kdf.new_spec(args.algorithm, params)
+
+    def two_pass():
+        kdf.derive(KEY.encode(), verifier_spec)
+        kdf.derive(KEY.encode(), cipher_spec)
+
+    def single_pass():
+        kdf.split(kdf.derive(KEY.encode(), cipher_spec))
+
+    report('two KDF passes', measure(two_pass, args.repeat))
+    report('one KDF pass + HKDF split', measure(single_pass, args.repeat))
+
+    db_path = temp_db_path()
+    with patch('keyring.set_password'), patch.dict('os.environ', {kdf.KDF_ENV: args.algorithm}):
+        PasswordManager(KEY, db_path=db_path).close()
+        report('PasswordManager unlock',
+               measure(lambda: PasswordManager(KEY, db_path=db_path).close(), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Shared helpers for the standalone benchmark scripts"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def measure(fn, repeat: int = 20, setup=None) -> list:
+    """Run fn `repeat` times and return the wall times in seconds"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(timings: list) -> dict:
+    """Return latency percentiles in milliseconds and throughput in ops/s"""
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'median_ms': statistics.median(ordered) * 1000,
+        'p90_ms': percentile(ordered, 0.90) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'min_ms': ordered[0] * 1000,
+        'max_ms': ordered[-1] * 1000,
+        'mean_ms': total / len(ordered) * 1000,
+        'ops_per_sec': len(ordered) / total if total > 0 else 0.0,
+        'samples': len(ordered),
+    }
+
+
+def report(name: str, timings: list):
+    stats = summarize(timings)
+    print(f"{name:<40} median {stats['median_ms']:9.3f} ms   "
+          f"p95 {stats['p95_ms']:9.3f} ms   min {stats['min_ms']:9.3f} ms")
+
+
+def temp_db_path() -> str:
+    return os.path.join(tempfile.mkdtemp(prefix='pass-cli-bench-'), 'passwords.db')
+
+
+def build_vault(rows: int, key: str = 'benchmark-key', db_path: str = None):
+    """Create a vault with `rows` synthetic entries named service-N / user-N
+
+    All rows share one Fernet token (decrypting to 'hunter2'), which keeps
+    building large vaults fast without changing lookup costs.
+    """
+    from unittest.mock import patch
+
+    from pass_cli.database import PasswordManager
+
+    with patch('keyring.set_password'):
+        pm = PasswordManager(key, db_path=db_path or temp_db_path())
+    encrypted = pm.cipher_suite.encrypt(b'hunter2').decode()
+    with pm._conn:
+        pm._conn.executemany(
+            'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+            ((f'service-{i}', f'user-{i}', encrypted) for i in range(rows)))
+    return pm
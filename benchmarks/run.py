@@ -0,0 +1,182 @@
+"""Benchmark suite: latency percentiles and throughput per operation
+
+Builds synthetic vaults of each requested size, times every operation and
+writes the results to JSON. Given a baseline file from an earlier run, cases
+whose median slowed down by more than the threshold are reported as
+regressions and the script exits with status 1.
+
+Usage: python benchmarks/run.py [--sizes 1000,10000] [--repeat N] [--only CASE,...]
+                                [--output results.json] [--baseline old.json]
+                                [--threshold 0.2]
+Example: python benchmarks/run.py --output main.json
+         python benchmarks/run.py --baseline main.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+from common import ROOT, build_vault, measure, summarize
+
+from pass_cli.database import PasswordManager
+
+KEY = 'benchmark-key'
+# Cases that do not depend on the vault size run once, against the first size
+SIZE_INDEPENDENT = ('cli_startup',)
+
+
+def bench_unlock(pm: PasswordManager, rows: int, repeat: int) -> list:
+    return measure(lambda: PasswordManager(KEY, db_path=pm.db_path).close(), repeat)
+
+
+def bench_unlock_cached(pm: PasswordManager, rows: int, repeat: int) -> list:
+    def unlock():
+        PasswordManager(KEY, db_path=pm.db_path, use_key_cache=True).close()
+
+    unlock()
+    return measure(unlock, repeat)
+
+
+def bench_get_password(pm: PasswordManager, rows: int, repeat: int) -> list:
+    rng = random.Random(0)
+
+    def get():
+        n = rng.randrange(rows)
+        pm.get_password(f'service-{n}', f'user-{n}')
+
+    return measure(get, repeat)
+
+
+def bench_store_password(pm: PasswordManager, rows: int, repeat: int) -> list:
+    counter = iter(range(rows, rows + repeat))
+
+    def store():
+        n = next(counter)
+        pm.store_password(f'service-{n}', f'user-{n}', 'hunter2')
+
+    return measure(store, repeat)
+
+
+def bench_list_all(pm: PasswordManager, rows: int, repeat: int) -> list:
+    return measure(lambda: sum(1 for _ in pm.list_passwords()), repeat)
+
+
+def bench_list_page(pm: PasswordManager, rows: int, repeat: int) -> list:
+    return measure(lambda: list(pm.list_passwords(limit=50, offset=rows // 2)), repeat)
+
+
+def bench_search(pm: PasswordManager, rows: int, repeat: int) -> list:
+    return measure(lambda: list(pm.search('service-12')), repeat)
+
+
+def bench_cli_startup(pm: PasswordManager, rows: int, repeat: int) -> list:
+    code = "from pass_cli.cli import main\nmain(['--help'])"
+    return measure(lambda: subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                                          capture_output=True), repeat)
+
+
+CASES = {
+    'unlock': bench_unlock,
+    'unlock_cached': bench_unlock_cached,
+    'get_password': bench_get_password,
+    'store_password': bench_store_password,
+    'list_all': bench_list_all,
+    'list_page': bench_list_page,
+    'search': bench_search,
+    'cli_startup': bench_cli_startup,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(sizes: list, repeat: int, cases: list) -> dict:
+    results = {}
+    for index, rows in enumerate(sizes):
+        with patch('keyring.set_password'):
+            pm = build_vault(rows, KEY)
+            for name in cases:
+                if name in SIZE_INDEPENDENT and index > 0:
+                    continue
+                stats = summarize(CASES[name](pm, rows, repeat))
+                results[f'{name}[{rows}]'] = stats
+                print(f"{name + f'[{rows}]':<24} median {stats['median_ms']:9.3f} ms   "
+                      f"p95 {stats['p95_ms']:9.3f} ms   p99 {stats['p99_ms']:9.3f} ms   "
+                      f"{stats['ops_per_sec']:10.1f} ops/s")
+            pm.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (case, baseline ms, current ms) for medians slower than threshold"""
+    regressions = []
+    for case, stats in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        if stats['median_ms'] > previous['median_ms'] * (1 + threshold):
+            regressions.append((case, previous['median_ms'], stats['median_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Comma-separated vault sizes (default: 1000,10000)')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--only', help=f"Comma-separated cases from: {', '.join(CASES)}")
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed median slowdown before flagging (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    cases = args.only.split(',') if args.only else list(CASES)
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    document = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'repeat': args.repeat,
+        },
+        'results': run_suite(sizes, args.repeat, cases),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(document['results'], baseline['results'], args.threshold)
+        print(f"\nCompared with {args.baseline} (commit {baseline['meta'].get('commit')}):")
+        for case, before, after in regressions:
+            print(f"  REGRESSION {case:<24} {before:9.3f} ms -> {after:9.3f} ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print("  no regressions")
+
+
+if __name__ == '__main__':
+    main()
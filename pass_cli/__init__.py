@@ -1,6 +1,12 @@
 """Password manager CLI application"""
 
-from . import utils
+import importlib
 
 __version__ = "0.1.0"
 __all__ = ["utils"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,168 @@
+"""Long-lived agent that keeps an unlocked vault in memory
+
+The agent answers requests from the CLI over a Unix domain socket, similar to
+ssh-agent. The socket is only accessible to the owning user and the agent
+locks itself (drops the unlocked vault and exits) once its TTL expires.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import time
+import types
+
+from . import trace
+
+SOCKET_ENV = 'PASS_CLI_AGENT_SOCK'
+SOCKET_NAME = 'agent.sock'
+DEFAULT_TTL = 900
+CLIENT_TIMEOUT = 5.0
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+class AgentError(Exception):
+    """Raised when the agent rejects or fails a request"""
+
+
+def socket_path(db_path: str) -> str:
+    """Return the agent socket path for the vault at db_path"""
+    return os.getenv(SOCKET_ENV) or os.path.join(os.path.dirname(db_path), SOCKET_NAME)
+
+
+class AgentClient:
+    """Client exposing the PasswordManager methods served by the agent"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _call(self, op: str, **params):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(self.path)
+            sock.sendall(json.dumps({'op': op, 'params': params}).encode() + b'\n')
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+        if not line:
+            raise AgentError("Agent closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise AgentError(response.get('error', 'Agent request failed'))
+        return response.get('result')
+
+    def ping(self) -> dict:
+        return self._call('ping')
+
+    def lock(self):
+        return self._call('lock')
+
+    def get_password(self, service_name: str, username: str) -> str:
+        return self._call('get_password', service_name=service_name, username=username)
+
+    def get_passwords(self, keys) -> list:
+        return self._call('get_passwords', keys=[list(key) for key in keys])
+
+    def store_password(self, service_name: str, username: str, password: str):
+        self._call('store_password', service_name=service_name,
+                   username=username, password=password)
+
+    def list_passwords(self, service_name: str = None, **filters):
+        rows = self._call('list_passwords', service_name=service_name, **filters)
+        return iter([tuple(row) for row in rows])
+
+    def search(self, query: str, limit: int = 20):
+        return iter([tuple(row) for row in self._call('search', query=query, limit=limit)])
+
+
+def connect_agent(db_path: str) -> AgentClient:
+    """Return a client for a running agent, or None if no agent is listening"""
+    path = socket_path(db_path)
+    if not os.path.exists(path):
+        return None
+    with trace.span('agent.connect'):
+        return _probe(path)
+
+
+def _probe(path: str) -> AgentClient:
+    client = AgentClient(path)
+    try:
+        client.ping()
+    except (OSError, ValueError, AgentError):
+        return None
+    return client
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.request.settimeout(CLIENT_TIMEOUT)
+        if not self.server.verify_peer(self.request):
+            return
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_SIZE))
+            result = self.server.dispatch(request['op'], request.get('params') or {})
+            response = {'ok': True, 'result': result}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+class AgentServer(socketserver.UnixStreamServer):
+    """Serves requests for an unlocked PasswordManager until the TTL expires"""
+
+    OPERATIONS = ('get_password', 'get_passwords', 'store_password', 'list_passwords', 'search')
+
+    def __init__(self, path: str, password_manager, ttl: int = DEFAULT_TTL):
+        self.password_manager = password_manager
+        self.expires_at = time.monotonic() + ttl
+        self._locked = False
+
+        if os.path.exists(path):
+            if _probe(path):
+                raise AgentError(f"An agent is already running on {path}")
+            os.remove(path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _AgentRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def verify_peer(self, sock) -> bool:
+        """Only serve processes running as the agent's own user"""
+        if not hasattr(socket, 'SO_PEERCRED'):
+            return True
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', creds)
+        return uid == os.getuid()
+
+    def dispatch(self, op: str, params: dict):
+        if op == 'ping':
+            return {'pid': os.getpid(), 'ttl': max(0, int(self.expires_at - time.monotonic()))}
+        if op == 'lock':
+            self._locked = True
+            return True
+        if op not in self.OPERATIONS:
+            raise AgentError(f"Unsupported operation: {op}")
+        result = getattr(self.password_manager, op)(**params)
+        if isinstance(result, types.GeneratorType):
+            # Listings are lazy, materialize them for the JSON response
+            result = list(result)
+        return result
+
+    def serve_until_locked(self):
+        """Handle requests until the TTL expires or a lock request arrives"""
+        try:
+            while not self._locked:
+                remaining = self.expires_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.timeout = remaining
+                self.handle_request()
+        finally:
+            self.password_manager = None
+            self.server_close()
+            try:
+                os.remove(self.server_address)
+            except OSError:
+                pass
+
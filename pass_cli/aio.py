@@ -0,0 +1,142 @@
+"""asyncio interface to the password vault
+
+SQLite and Fernet calls block, so they cannot run on the event loop. Once the
+vault is open, all database access happens on one dedicated thread, which
+keeps statements on the shared connection strictly serialized, while
+encryption and decryption run on a separate executor.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .database import PasswordManager
+
+
+class AsyncPasswordManager:
+    """Non-blocking wrapper around PasswordManager
+
+    Concurrent get_password calls for the same entry are coalesced: they
+    share a single database lookup and decrypt.
+
+    Example:
+        async with await AsyncPasswordManager.open(key) as vault:
+            password = await vault.get_password("github", "johndoe")
+
+    Args:
+        password_manager: Unlocked PasswordManager, owned by this object
+        crypto_executor: Executor for encryption and decryption, the event
+            loop's default executor when None
+    """
+
+    PAGE_SIZE = 500
+
+    def __init__(self, password_manager: PasswordManager, crypto_executor=None):
+        self._pm = password_manager
+        self._crypto_executor = crypto_executor
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pass-cli-db')
+        self._inflight = {}
+
+    @classmethod
+    async def open(cls, encryption_key: str, db_path: str = None, crypto_executor=None,
+                   **kwargs) -> 'AsyncPasswordManager':
+        """Open and unlock a vault without blocking the event loop
+
+        Key derivation runs on the crypto executor; keyword arguments are
+        passed on to PasswordManager.
+        """
+        loop = asyncio.get_running_loop()
+        password_manager = await loop.run_in_executor(
+            crypto_executor, functools.partial(PasswordManager, encryption_key, db_path, **kwargs))
+        return cls(password_manager, crypto_executor)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the database connection and stop the connection thread"""
+        if self._pm is None:
+            return
+        await self._run_db(self._pm.close)
+        self._pm = None
+        self._db_executor.shutdown(wait=False)
+
+    def _run_db(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._db_executor, functools.partial(fn, *args, **kwargs))
+
+    def _run_crypto(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._crypto_executor, fn, *args)
+
+    async def get_password(self, service_name: str, username: str) -> str:
+        """Return the decrypted password, or None if it is not stored"""
+        key = (service_name, username)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(service_name, username))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        # Shield the shared lookup so one cancelled caller does not cancel it for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _lookup(self, service_name: str, username: str) -> str:
+        password = self._pm._cached_password(service_name, username)
+        if password is not None:
+            return password
+
+        generation = self._pm._cache_generation()
+        encrypted_password = await self._run_db(self._pm._fetch_encrypted, service_name, username)
+        if encrypted_password is None:
+            return None
+        password = await self._run_crypto(self._pm._decrypt, encrypted_password)
+        # A write to this entry while we were decrypting detaches the lookup,
+        # so a stale password never makes it into the cache
+        if self._inflight.get((service_name, username)) is asyncio.current_task():
+            self._pm._cache_password(service_name, username, password, generation)
+        return password
+
+    async def store_password(self, service_name: str, username: str, password: str):
+        """Store a password, replacing any existing one for the same service and username"""
+        key = (service_name, username)
+        self._inflight.pop(key, None)
+        generation = self._pm._cipher_generation
+        encrypted_password = await self._run_crypto(self._pm._encrypt, password)
+        # Encrypted again in the write transaction if the keys were rotated meanwhile
+        await self._run_db(self._pm._write_encrypted, service_name, username, password,
+                           (generation, encrypted_password))
+        self._inflight.pop(key, None)
+
+    async def delete_password(self, service_name: str, username: str) -> bool:
+        """Delete a password, returns False if it was not found"""
+        key = (service_name, username)
+        self._inflight.pop(key, None)
+        deleted = await self._run_db(self._pm.delete_password, service_name, username)
+        self._inflight.pop(key, None)
+        return deleted
+
+    async def list_passwords(self, service_name: str = None, **filters) -> list:
+        """Return (service_name, username) pairs, see PasswordManager.list_passwords"""
+        return await self._run_db(
+            lambda: [tuple(row) for row in self._pm.list_passwords(service_name, **filters)])
+
+    async def iter_passwords(self, service_name: str = None, prefix: str = None,
+                             pattern: str = None, page_size: int = PAGE_SIZE):
+        """Yield (service_name, username) pairs, fetched in keyset-paginated pages"""
+        after = None
+        while True:
+            page = await self._run_db(
+                lambda: [tuple(row) for row in self._pm.list_passwords(
+                    service_name, prefix=prefix, pattern=pattern, limit=page_size, after=after)])
+            for entry in page:
+                yield entry
+            if len(page) < page_size:
+                return
+            after = page[-1]
@@ -0,0 +1,40 @@
+"""Password strength scoring used by `pass-cli audit`
+
+Entropy is estimated from length and the size of the character classes a
+password draws from. This is an upper bound: it does not see dictionary
+words or keyboard patterns, but it reliably flags short and single-class
+passwords.
+"""
+
+import math
+import string
+
+LOWER, UPPER, DIGIT, SYMBOL, OTHER = 1, 2, 4, 8, 16
+CLASS_SIZES = {LOWER: 26, UPPER: 26, DIGIT: 10, SYMBOL: 33, OTHER: 100}
+CLASS_NAMES = {LOWER: 'lowercase', UPPER: 'uppercase', DIGIT: 'digits',
+               SYMBOL: 'symbols', OTHER: 'other'}
+
+_CLASS_OF = {**{c: LOWER for c in string.ascii_lowercase},
+             **{c: UPPER for c in string.ascii_uppercase},
+             **{c: DIGIT for c in string.digits},
+             **{c: SYMBOL for c in string.punctuation + ' '}}
+
+
+def char_classes(password: str) -> int:
+    """Bitmask of the character classes used in password"""
+    classes = 0
+    for char in set(password):
+        classes |= _CLASS_OF.get(char, OTHER)
+    return classes
+
+
+def entropy_bits(password: str, classes: int = None) -> float:
+    """Estimated entropy: length * log2(size of the classes used)"""
+    if classes is None:
+        classes = char_classes(password)
+    pool = sum(size for flag, size in CLASS_SIZES.items() if classes & flag)
+    return len(password) * math.log2(pool) if pool else 0.0
+
+
+def class_names(classes: int) -> list:
+    return [name for flag, name in CLASS_NAMES.items() if classes & flag]
@@ -0,0 +1,94 @@
+"""Pluggable authentication backends and a session-scoped auth token"""
+
+import json
+import os
+import subprocess
+import time
+
+from .utils import check_sudo, is_private_file, session_id
+
+BACKEND_ENV = 'PASS_CLI_AUTH'
+TOKEN_TTL_ENV = 'PASS_CLI_AUTH_TTL'
+DEFAULT_TOKEN_TTL = 300
+
+
+class SudoAuth:
+    """Requires a valid sudo timestamp for the current user"""
+
+    name = 'sudo'
+
+    def is_authenticated(self) -> bool:
+        return check_sudo()
+
+    def authenticate(self) -> bool:
+        try:
+            return subprocess.run(['sudo', '-v']).returncode == 0
+        except OSError:
+            return False
+
+
+class NoAuth:
+    """Accepts every request, for hosts where keyring access is the only gate"""
+
+    name = 'none'
+
+    def is_authenticated(self) -> bool:
+        return True
+
+    def authenticate(self) -> bool:
+        return True
+
+
+BACKENDS = {backend.name: backend for backend in (SudoAuth, NoAuth)}
+
+
+def get_backend(name: str = None):
+    """Return the backend selected by name or PASS_CLI_AUTH (default: sudo)"""
+    name = name or os.getenv(BACKEND_ENV, SudoAuth.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown auth backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+class AuthToken:
+    """Time-bounded record of a successful auth check for the login session
+
+    The token lives in a 0600 file next to the database, like sudo's own
+    timestamp, and is only honoured for the session and backend that issued it.
+    """
+
+    FILENAME = '.auth-token'
+
+    def __init__(self, directory: str, ttl: int = None):
+        self.path = os.path.join(directory, self.FILENAME)
+        self.ttl = int(os.getenv(TOKEN_TTL_ENV, DEFAULT_TOKEN_TTL)) if ttl is None else ttl
+
+    def is_valid(self, backend_name: str) -> bool:
+        if self.ttl <= 0:
+            return False
+        try:
+            if not is_private_file(self.path):
+                return False
+            with open(self.path) as f:
+                token = json.load(f)
+            now = time.time()
+            return (token['session'] == session_id()
+                    and token['backend'] == backend_name
+                    and now < float(token['expires_at']) <= now + self.ttl)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def issue(self, backend_name: str):
+        if self.ttl <= 0 or not os.path.isdir(os.path.dirname(self.path)):
+            return
+        token = {'session': session_id(), 'backend': backend_name,
+                 'expires_at': time.time() + self.ttl}
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(token, f)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,213 @@
+"""Offline breached-password lookups against a local SHA-1 index
+
+The index is built once from an HIBP-style dump (one "SHA1[:COUNT]" line per
+hash) into a compact binary file that is memory-mapped for lookups:
+
+    magic    8 bytes   b'PCBREACH'
+    count    8 bytes   number of hashes, little-endian
+    build id 16 bytes  random, changes whenever the index is rebuilt
+    fanout   65537 x 8 bytes, number of hashes below each 16-bit prefix
+    hashes   count x 18 bytes, SHA-1 digests without their 2-byte prefix, sorted
+
+A lookup reads two fanout entries and binary-searches one prefix bucket
+(about log2(count / 65536) probes), so only a handful of pages of a
+multi-gigabyte index are ever touched.
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+INDEX_ENV = 'PASS_CLI_BREACH_INDEX'
+INDEX_NAME = 'breach.idx'
+MAGIC = b'PCBREACH'
+HEADER = struct.Struct('<8sQ16s')
+PREFIX_BYTES = 2
+RECORD_SIZE = 20 - PREFIX_BYTES
+FANOUT_SIZE = 256 ** PREFIX_BYTES + 1
+HASHES_OFFSET = HEADER.size + FANOUT_SIZE * 8
+# Unsorted dumps are split into this many buckets (by first byte) and sorted in memory
+SORT_BUCKETS = 256
+
+
+def default_index_path() -> str:
+    from .database import PasswordManager
+
+    return os.getenv(INDEX_ENV) or os.path.join(
+        os.path.dirname(PasswordManager.DEFAULT_DB_PATH), INDEX_NAME)
+
+
+def password_digest(password: str) -> bytes:
+    return hashlib.sha1(password.encode()).digest()
+
+
+def _parse_dump(lines):
+    """Yield (digest, count) from "SHA1[:COUNT]" lines, skipping blank and malformed ones"""
+    for line in lines:
+        sha1, _, count = line.strip().partition(b':')
+        if len(sha1) != 40:
+            continue
+        try:
+            yield bytes.fromhex(sha1.decode('ascii')), int(count or 1)
+        except ValueError:
+            continue
+
+
+class _IndexWriter:
+    """Writes sorted, de-duplicated digests and fills in the fanout table on close"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'wb')
+        self.file.write(b'\0' * HASHES_OFFSET)
+        self.counts = [0] * (FANOUT_SIZE - 1)
+        self.count = 0
+        self.last = None
+
+    def add(self, digest: bytes) -> bool:
+        """Append digest, False if it sorts before the previous one"""
+        if self.last is not None and digest <= self.last:
+            return digest == self.last
+        self.file.write(digest[PREFIX_BYTES:])
+        self.counts[int.from_bytes(digest[:PREFIX_BYTES], 'big')] += 1
+        self.count += 1
+        self.last = digest
+        return True
+
+    def close(self):
+        fanout, total = [0], 0
+        for count in self.counts:
+            total += count
+            fanout.append(total)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.count, os.urandom(16)))
+        self.file.write(struct.pack(f'<{FANOUT_SIZE}Q', *fanout))
+        self.file.close()
+
+
+def build_index(source: str, path: str, min_count: int = 1) -> int:
+    """Build an index at path from the dump file source
+
+    Dumps sorted by hash (as HIBP distributes them) are converted in one
+    streaming pass. Otherwise the hashes are split into bucket files by
+    first byte and each bucket is sorted in memory.
+
+    Args:
+        source: Dump with one "SHA1[:COUNT]" line per hash
+        path: Index file to write, replaced atomically
+        min_count: Skip hashes seen fewer times than this
+
+    Returns:
+        int: Number of hashes in the index
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, partial = tempfile.mkstemp(dir=directory, prefix='.breach-')
+    os.close(fd)
+    try:
+        with open(source, 'rb') as dump:
+            writer = _IndexWriter(partial)
+            in_order = all(writer.add(digest) for digest, count in _parse_dump(dump)
+                           if count >= min_count)
+            if in_order:
+                writer.close()
+            else:
+                writer.file.close()
+                dump.seek(0)
+                writer = _build_from_buckets(dump, partial, min_count)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return writer.count
+
+
+def _build_from_buckets(dump, path: str, min_count: int) -> _IndexWriter:
+    workdir = tempfile.mkdtemp(dir=os.path.dirname(path), prefix='.breach-sort-')
+    try:
+        buckets = [open(os.path.join(workdir, f'{n:02x}'), 'wb') for n in range(SORT_BUCKETS)]
+        try:
+            for digest, count in _parse_dump(dump):
+                if count >= min_count:
+                    buckets[digest[0]].write(digest)
+        finally:
+            for bucket in buckets:
+                bucket.close()
+
+        writer = _IndexWriter(path)
+        for bucket in buckets:
+            with open(bucket.name, 'rb') as f:
+                data = f.read()
+            for digest in sorted(data[i:i + 20] for i in range(0, len(data), 20)):
+                writer.add(digest)
+        writer.close()
+        return writer
+    finally:
+        shutil.rmtree(workdir)
+
+
+class _Hashes:
+    """Sequence view of the hashes in the index, for bisect"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return (len(self.data) - HASHES_OFFSET) // RECORD_SIZE
+
+    def __getitem__(self, index: int) -> bytes:
+        offset = HASHES_OFFSET + index * RECORD_SIZE
+        return self.data[offset:offset + RECORD_SIZE]
+
+
+class BreachIndex:
+    """Read-only, memory-mapped breach index
+
+    Raises:
+        ValueError: If path is not a breach index
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HASHES_OFFSET or self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a breach index, rebuild it with --build")
+        if hasattr(mmap, 'MADV_RANDOM'):
+            # Lookups touch scattered pages, readahead would only inflate RSS
+            self._map.madvise(mmap.MADV_RANDOM)
+        _, self.count, build_id = HEADER.unpack_from(self._map)
+        self.build_id = build_id.hex()
+        self._hashes = _Hashes(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def contains_digest(self, digest: bytes) -> bool:
+        prefix = int.from_bytes(digest[:PREFIX_BYTES], 'big')
+        lo, hi = struct.unpack_from('<2Q', self._map, HEADER.size + prefix * 8)
+        suffix = digest[PREFIX_BYTES:]
+        position = bisect.bisect_left(self._hashes, suffix, lo, hi)
+        return position < hi and self._hashes[position] == suffix
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(password_digest(password))
+
+
+def open_default_index() -> BreachIndex:
+    """The index at default_index_path(), or None if none has been built"""
+    path = default_index_path()
+    if not os.path.exists(path):
+        return None
+    return BreachIndex(path)
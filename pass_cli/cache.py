@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def _wipe(buffer: bytearray):
+    buffer[:] = bytes(len(buffer))
+
+
+class SecretCache:
+    """LRU cache of decrypted values with a per-entry TTL
+
+    Values are kept in bytearrays that are overwritten with zeros as soon as
+    they are evicted, expire, are invalidated or the cache is cleared. Expired
+    entries are swept on every get() and put(), whichever key they are for.
+    The strings returned by get() are regular Python strings and are not wiped.
+
+    A value looked up while another thread overwrites it must not be cached
+    after the invalidation. Take generation() before the lookup and pass it to
+    put(), which drops the value if its key was invalidated (or the cache
+    cleared) since.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Keys in put() order, which with one TTL for all is also expiry order
+        self._expiry = OrderedDict()
+        # Generation of each key's last invalidation, the oldest forgotten
+        # beyond maxsize keys; puts older than _floor are always dropped
+        self._generation = 0
+        self._invalidated = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> str:
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            self._sweep()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].decode()
+
+    def generation(self) -> int:
+        """Token for put() of a value looked up after this call"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value: str, generation: int = None):
+        """Cache a value, evicting the least recently used entry when full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            generation: generation() taken before value was looked up; the
+                value is dropped if key was invalidated since
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation < max(
+                    self._floor, self._invalidated.get(key, 0)):
+                return
+            self._sweep()
+            self._drop(key)
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = (expires, bytearray(value.encode()))
+            self._expiry[key] = expires
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def _sweep(self):
+        """Wipe every expired entry, oldest first"""
+        now = time.monotonic()
+        while self._expiry:
+            key, expires = next(iter(self._expiry.items()))
+            if expires > now:
+                return
+            self._drop(key)
+
+    def _drop(self, key):
+        self._expiry.pop(key, None)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _wipe(entry[1])
+
+    def invalidate(self, key):
+        """Drop and wipe a single entry"""
+        with self._lock:
+            self._drop(key)
+            self._generation += 1
+            self._invalidated.pop(key, None)
+            self._invalidated[key] = self._generation
+            while len(self._invalidated) > max(self.maxsize, 1):
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def clear(self):
+        """Drop and wipe every entry"""
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            for _, buffer in self._entries.values():
+                _wipe(buffer)
+            self._entries.clear()
+            self._expiry.clear()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
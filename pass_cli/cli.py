@@ -1,29 +1,88 @@
+import importlib
+import os
+
 import click
 
-from .commands.auth import auth
-from .commands.auth_check import auth_check
-from .commands.delete import delete
-from .commands.generate import generate
-from .commands.init import init
-from .commands.list import list
-from .commands.retrieve import retrieve
-from .commands.store import store
+from . import trace
+
+LAZY_COMMANDS = {
+    "agent": ".commands.agent:agent",
+    "audit": ".commands.audit:audit",
+    "auth": ".commands.auth:auth",
+    "auth-check": ".commands.auth_check:auth_check",
+    "breach-check": ".commands.breach_check:breach_check",
+    "delete": ".commands.delete:delete",
+    "encrypt-metadata": ".commands.encrypt_metadata:encrypt_metadata",
+    "exec": ".commands.exec_command:exec_command",
+    "export": ".commands.export:export",
+    "generate": ".commands.generate:generate",
+    "import": ".commands.import_passwords:import_passwords",
+    "init": ".commands.init:init",
+    "kdf-bench": ".commands.kdf_bench:kdf_bench",
+    "list": ".commands.list:list",
+    "rekey": ".commands.rekey:rekey",
+    "retrieve": ".commands.retrieve:retrieve",
+    "retrieve-many": ".commands.retrieve_many:retrieve_many",
+    "search": ".commands.search:search",
+    "store": ".commands.store:store",
+}
+
+
+class LazyGroup(click.Group):
+    """Group that imports a command's module only when the command is used"""
+
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
 
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(":")
+            with trace.span(f"import {cmd_name}"):
+                module = importlib.import_module(module_name, __package__)
+            self.add_command(getattr(module, attribute), cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-class CustomHelpCommand(click.Group):
+
+class CustomHelpCommand(LazyGroup):
     def format_help(self, ctx, formatter):
         """Customize the help message."""
         formatter.write("\nA secure password manager CLI application.\n")
         formatter.write("\nCommands:\n")
         formatter.write("\n  Setup:\n")
         formatter.write("    pass-cli init        Initialize password manager\n")
+        formatter.write("      --encrypt-metadata Also encrypt service names and usernames\n")
         formatter.write("    pass-cli auth        Authenticate with sudo\n")
         formatter.write("    pass-cli auth-check  Check authentication status\n")
+        formatter.write("    pass-cli agent       Keep the password manager unlocked in an agent\n")
+        formatter.write("      -t, --ttl          Seconds until the agent locks itself (default: 900)\n")
+        formatter.write("      --stop             Lock and stop the running agent\n")
+        formatter.write("    pass-cli rekey       Re-encrypt all passwords with a new key\n")
+        formatter.write("      -b, --batch-size   Rows re-encrypted per transaction (default: 500)\n")
+        formatter.write("      -j, --workers      Worker processes for encryption, 0 for one per CPU\n")
+        formatter.write("      --upgrade-kdf      Keep the key, only re-derive it with the KDF target\n")
+        formatter.write("    pass-cli encrypt-metadata  Encrypt service names and usernames at rest\n")
+        formatter.write("      -f, --force        Skip confirmation\n")
+        formatter.write("    pass-cli kdf-bench   Calibrate key derivation for this machine\n")
+        formatter.write("      -t, --target-ms    Target unlock time (default: 500)\n")
+        formatter.write("      -a, --algorithm    argon2id, scrypt or pbkdf2 (default: all)\n")
+        formatter.write("      --apply            Re-encrypt the vault with the calibrated parameters\n")
         formatter.write("\n  Password Management:\n")
         formatter.write("    pass-cli generate    Generate a secure password\n")
         formatter.write("      -l, --length       Password length (default: 12)\n")
+        formatter.write("      -n, --count        Number of passwords (default: 1)\n")
+        formatter.write("      -c, --classes      lower,upper,digits,symbols (default: all, each at least once)\n")
+        formatter.write("      -x, --exclude      Characters never to use\n")
+        formatter.write("      -P, --passphrase   Generate a passphrase of dictionary words\n")
+        formatter.write("      -w, --words        Passphrase words (default: 6)\n")
+        formatter.write("      -e, --entropy      Fewest passphrase words giving this many bits\n")
+        formatter.write("      --separator        Passphrase word separator (default: -)\n")
+        formatter.write("      --capitalize       none, first, all or random (default: none)\n")
         formatter.write("      -s, --service      Service name to store password\n")
-        formatter.write("      -u, --username     Username to store password\n")
+        formatter.write("      -u, --username     Username to store password, {n} numbers them with --count\n")
         formatter.write("      --no-copy          Show password in terminal instead of copying to clipboard\n")
         formatter.write("\n    pass-cli store        Store a password\n")
         formatter.write("      -s, --service      Service name (required)\n")
@@ -32,38 +91,85 @@ class CustomHelpCommand(click.Group):
         formatter.write("\n    pass-cli retrieve     Retrieve a password\n")
         formatter.write("      -s, --service      Service name (required)\n")
         formatter.write("      -u, --username     Username (required)\n")
+        formatter.write("\n    pass-cli retrieve-many REF...  Retrieve several passwords at once\n")
+        formatter.write("      REF                [NAME=]service:username, read from stdin if omitted\n")
+        formatter.write("      -F, --format       json or env (default: json)\n")
+        formatter.write("\n    pass-cli exec -m NAME=REF... -- COMMAND  Run a command with secrets in its environment\n")
+        formatter.write("      -m, --map          NAME=service:username, may be repeated\n")
         formatter.write("\n    pass-cli list         List saved passwords\n")
         formatter.write("      -s, --service      Filter passwords by service name\n")
+        formatter.write("      -p, --prefix       Only services starting with a prefix\n")
+        formatter.write("      -m, --match        Only services matching a glob pattern\n")
+        formatter.write("      -n, --limit        Maximum number of entries\n")
+        formatter.write("      --offset           Number of entries to skip\n")
+        formatter.write("      -F, --format       text, json, jsonl or tsv (default: text)\n")
+        formatter.write("\n    pass-cli search QUERY Search service names and usernames\n")
+        formatter.write("      -n, --limit        Maximum number of results (default: 20)\n")
+        formatter.write("      -F, --format       text, json, jsonl or tsv (default: text)\n")
         formatter.write("\n    pass-cli delete       Delete a stored password\n")
         formatter.write("      -s, --service      Service name (required)\n")
         formatter.write("      -u, --username     Username (required)\n")
         formatter.write("      -f, --force        Skip confirmation\n")
+        formatter.write("\n    pass-cli audit        Find reused, weak and old passwords\n")
+        formatter.write("      --min-entropy      Weak below this many bits (default: 60)\n")
+        formatter.write("      --max-age          Old after this many days (default: 365)\n")
+        formatter.write("      --no-cache         Re-check every password\n")
+        formatter.write("      -j, --workers      Worker processes for decryption, 0 for one per CPU\n")
+        formatter.write("      --breach-index     Also flag passwords found in this breach index\n")
+        formatter.write("      -F, --format       text or json (default: text)\n")
+        formatter.write("\n    pass-cli breach-check  Check passwords against a local breach index\n")
+        formatter.write("      --build DUMP       Build the index from an HIBP-style SHA1:COUNT dump\n")
+        formatter.write("      --min-count        With --build, skip hashes seen fewer times\n")
+        formatter.write("      --index            Index file (default: next to the database)\n")
+        formatter.write("      --password         Check a password entered at a prompt\n")
+        formatter.write("\n  Import/Export:\n")
+        formatter.write("    pass-cli import FILE  Import passwords from a file\n")
+        formatter.write("      -F, --format       csv, json or jsonl (default: from file extension)\n")
+        formatter.write("      -j, --workers      Worker processes for encryption, 0 for one per CPU\n")
+        formatter.write("\n    pass-cli export       Export all passwords in plain text\n")
+        formatter.write("      -o, --output       Output file (default: stdout)\n")
+        formatter.write("      -F, --format       csv, json or jsonl (default: from file extension)\n")
+        formatter.write("      -j, --workers      Worker processes for decryption, 0 for one per CPU\n")
         formatter.write("\nExamples:\n")
         formatter.write("  pass-cli generate -l 16 -s github -u johndoe\n")
+        formatter.write("  pass-cli generate -n 100 -c lower,digits -x 0o1l -s ci -u runner-{n}\n")
+        formatter.write("  pass-cli generate -e 80 --capitalize random --no-copy\n")
         formatter.write("  pass-cli store -s github -u johndoe -p mypassword\n")
         formatter.write("  pass-cli retrieve -s github -u johndoe\n")
+        formatter.write("  eval \"$(pass-cli retrieve-many -F env DB_PASS=prod/db:app)\"\n")
+        formatter.write("  pass-cli exec -m DB_PASS=prod/db:app -- ./server\n")
+        formatter.write("  pass-cli --profile retrieve -s github -u johndoe --no-copy\n")
         formatter.write("  pass-cli list\n")
         formatter.write("  pass-cli list -s github\n")
+        formatter.write("  pass-cli list -p git -F tsv\n")
+        formatter.write("  pass-cli search hub token\n")
         formatter.write("  pass-cli delete -s github -u johndoe\n")
         formatter.write("  pass-cli delete -s github -u johndoe --force\n")
+        formatter.write("  pass-cli audit --max-age 180\n")
+        formatter.write("  pass-cli breach-check --build pwned-passwords-sha1-ordered-by-hash.txt\n")
+        formatter.write("  pass-cli encrypt-metadata\n")
+        formatter.write("  pass-cli import passwords.csv\n")
+        formatter.write("  pass-cli export -o backup.jsonl\n")
         formatter.write("\nOptions:\n")
-        formatter.write("  --help  Show this message and exit.\n")
+        formatter.write("  --profile  Print a per-phase timing breakdown to stderr.\n")
+        formatter.write("  --help     Show this message and exit.\n")
+        formatter.write(f"\nSet {trace.TRACE_ENV}=json:FILE or cprofile:FILE to record timings to a file.\n")
+
 
+def _start_trace(ctx, param, value):
+    # Eager, so lazily imported commands are timed as well
+    target = os.getenv(trace.TRACE_ENV)
+    if value or target:
+        ctx.call_on_close(trace.Session(report=value, target=target).finish)
 
-@click.group(cls=CustomHelpCommand)
+
+@click.group(cls=CustomHelpCommand, lazy_commands=LAZY_COMMANDS)
+@click.option('--profile', is_flag=True, is_eager=True, expose_value=False,
+              callback=_start_trace, help='Print a per-phase timing breakdown to stderr')
 def main():
     """A secure password manager CLI application."""
     pass
 
 
-main.add_command(auth)
-main.add_command(auth_check)
-main.add_command(generate)
-main.add_command(init)
-main.add_command(store)
-main.add_command(retrieve)
-main.add_command(list)
-main.add_command(delete)
-
 if __name__ == "__main__":
     main()
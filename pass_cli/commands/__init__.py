@@ -1,12 +1,5 @@
-"""CLI commands package"""
+"""CLI commands package
 
-from .auth import auth
-from .auth_check import auth_check
-from .generate import generate
-from .init import init
-from .list import list
-from .retrieve import retrieve
-from .store import store
-
-__all__ = ["auth", "auth_check", "generate",
-           "init", "retrieve", "store", "list"]
+Commands are imported on demand by ``pass_cli.cli.LazyGroup``; import them
+from their modules, e.g. ``from pass_cli.commands.store import store``.
+"""
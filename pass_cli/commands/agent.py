@@ -0,0 +1,52 @@
+import click
+
+from ..agent import DEFAULT_TTL, AgentServer, connect_agent, socket_path
+from ..database import PasswordManager
+from ..utils import check_auth, check_initialized
+
+
+@click.command()
+@click.option('--ttl', '-t', type=int, default=DEFAULT_TTL,
+              help=f'Seconds until the agent locks itself (default: {DEFAULT_TTL})')
+@click.option('--stop', is_flag=True, help='Lock and stop the running agent')
+def agent(ttl: int, stop: bool) -> None:
+    """Run an agent that keeps the password manager unlocked"""
+    if stop:
+        client = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+        if client is None:
+            click.echo(click.style("✗ No agent is running.", fg="yellow"))
+            return
+        client.lock()
+        click.echo(click.style("✓ Agent locked.", fg="green"))
+        return
+
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+            fg="red"))
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+            return
+
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        path = socket_path(password_manager.db_path)
+        server = AgentServer(path, password_manager, ttl)
+        click.echo(click.style(f"✓ Agent listening on {path} (locks in {ttl}s)", fg="green"))
+        server.serve_until_locked()
+        click.echo(click.style("Agent locked.", fg="yellow"))
+
+    except KeyboardInterrupt:
+        click.echo(click.style("Agent locked.", fg="yellow"))
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
@@ -0,0 +1,99 @@
+import json
+import time
+
+import click
+
+from ..breach import BreachIndex, open_default_index
+from ..database import PasswordManager
+from ..parallel import default_workers
+from ..utils import check_auth, check_initialized
+
+AUDIT_FORMATS = ('text', 'json')
+
+
+def print_report(report: dict, min_entropy: float, max_age: int) -> None:
+    if report['reused']:
+        click.echo(click.style(
+            f"\n✗ Reused passwords ({len(report['reused'])}):", fg="red"))
+        for entries in report['reused']:
+            click.echo("  " + ", ".join(f"{service} / {username}" for service, username in entries))
+
+    if report['weak']:
+        click.echo(click.style(
+            f"\n✗ Weak passwords, under {min_entropy:g} bits ({len(report['weak'])}):", fg="red"))
+        for service, username, bits, classes in report['weak']:
+            click.echo(f"  {service} / {username}: {bits:.0f} bits, {', '.join(classes) or 'empty'}")
+
+    if report['old']:
+        click.echo(click.style(
+            f"\n✗ Unchanged for over {max_age} days ({len(report['old'])}):", fg="yellow"))
+        for service, username, days in report['old']:
+            click.echo(f"  {service} / {username}: {days} days")
+
+    if report['breached']:
+        click.echo(click.style(
+            f"\n✗ Found in known breaches ({len(report['breached'])}):", fg="red"))
+        for service, username in report['breached']:
+            click.echo(f"  {service} / {username}")
+
+    if not (report['reused'] or report['weak'] or report['old'] or report['breached']):
+        click.echo(click.style("\n✓ No issues found.", fg="green"))
+
+
+@click.command()
+@click.option('--min-entropy', type=float, default=60.0,
+              help='Flag passwords with fewer estimated bits of entropy (default: 60)')
+@click.option('--max-age', type=click.IntRange(min=0), default=365,
+              help='Flag passwords unchanged for more days (default: 365)')
+@click.option('--no-cache', is_flag=True, help='Re-check every password, ignoring earlier audits')
+@click.option('--workers', '-j', type=int, default=default_workers,
+              help='Decryption worker processes, 0 for one per CPU (default: 1)')
+@click.option('--breach-index', type=click.Path(exists=True, dir_okay=False),
+              help='Breach index to check against (default: the one built by breach-check)')
+@click.option('--format', '-F', 'fmt', type=click.Choice(AUDIT_FORMATS), default='text',
+              help='Output format (default: text)')
+def audit(min_entropy: float, max_age: int, no_cache: bool, workers: int, breach_index: str,
+          fmt: str) -> None:
+    """Find reused, weak and old passwords"""
+    err = fmt != 'text'
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.",
+            fg="red"), err=err)
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"), err=err)
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"),
+                err=err)
+            return
+
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        index = BreachIndex(breach_index) if breach_index else open_default_index()
+        start = time.perf_counter()
+        try:
+            report = password_manager.audit(min_entropy=min_entropy, max_age_days=max_age,
+                                            use_cache=not no_cache, workers=workers,
+                                            breach_index=index)
+        finally:
+            if index is not None:
+                index.close()
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"), err=err)
+        return
+
+    if fmt == 'json':
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    click.echo(f"Audited {report['total']} passwords in {elapsed:.2f}s "
+               f"({report['processed']} checked, the rest from the audit cache)")
+    print_report(report, min_entropy, max_age)
@@ -1,7 +1,9 @@
-import subprocess
+import os
 
 import click
 
+from ..auth import AuthToken, get_backend
+from ..database import PasswordManager
 from ..utils import check_initialized
 
 
@@ -12,9 +14,12 @@ def auth():
         click.echo(click.style("Password manager not initialized. Please run 'pass-cli init' first.", fg="red"))
         raise click.Abort()
 
-    try:
-        subprocess.run(["sudo", "-v"], check=True)
+    backend = get_backend()
+    token = AuthToken(os.path.dirname(PasswordManager.DEFAULT_DB_PATH))
+    if backend.authenticate():
+        token.issue(backend.name)
         click.echo(click.style("✓ Authentication successful!", fg="green"))
-    except subprocess.CalledProcessError:
+    else:
+        token.clear()
         click.echo(click.style("✗ Authentication failed!", fg="red"))
         raise click.Abort()
@@ -1,6 +1,6 @@
 import click
 
-from ..utils import check_initialized, check_sudo
+from ..utils import check_auth, check_initialized
 
 
 @click.command()
@@ -10,7 +10,7 @@ def auth_check():
         click.echo(click.style("Password manager not initialized. Please run 'pass-cli init' first.", fg="red"))
         raise click.Abort()
 
-    if check_sudo():
+    if check_auth():
         click.echo(click.style("✓ User is authenticated", fg="green"))
     else:
         click.echo(click.style("✗ User is not authenticated", fg="red"))
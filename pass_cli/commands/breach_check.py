@@ -0,0 +1,98 @@
+import os
+import time
+
+import click
+
+from ..breach import BreachIndex, build_index, default_index_path
+from ..database import PasswordManager
+from ..parallel import default_workers
+from ..utils import check_auth, check_initialized
+
+
+@click.command(name='breach-check')
+@click.option('--build', 'dump', type=click.Path(exists=True, dir_okay=False),
+              help='Build the index from an HIBP-style "SHA1:COUNT" dump')
+@click.option('--min-count', type=click.IntRange(min=1), default=1,
+              help='With --build, skip hashes seen fewer times (default: 1)')
+@click.option('--index', 'index_path', type=click.Path(dir_okay=False),
+              help='Index file (default: breach.idx next to the database)')
+@click.option('--password', 'check_password', is_flag=True,
+              help='Check a password entered at a prompt instead of the vault')
+@click.option('--workers', '-j', type=int, default=default_workers,
+              help='Decryption worker processes, 0 for one per CPU (default: 1)')
+def breach_check(dump: str, min_count: int, index_path: str, check_password: bool,
+                 workers: int) -> None:
+    """Check passwords against a local breached-password index"""
+    index_path = index_path or default_index_path()
+
+    if dump:
+        start = time.perf_counter()
+        try:
+            count = build_index(dump, index_path, min_count=min_count)
+        except OSError as e:
+            click.echo(click.style(f"✗ {str(e)}", fg="red"))
+            return
+        click.echo(click.style(
+            f"✓ Indexed {count} hashes into {index_path} in {time.perf_counter() - start:.1f}s "
+            f"({os.path.getsize(index_path) / 2 ** 20:.1f} MiB)", fg="green"))
+        return
+
+    if not os.path.exists(index_path):
+        click.echo(click.style(
+            "✗ No breach index found! Build one with 'pass-cli breach-check --build DUMP'.",
+            fg="red"))
+        return
+
+    try:
+        index = BreachIndex(index_path)
+    except (OSError, ValueError) as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
+
+    with index:
+        if check_password:
+            password = click.prompt("Password to check", hide_input=True)
+            if password in index:
+                click.echo(click.style("✗ This password appears in known breaches!", fg="red"))
+            else:
+                click.echo(click.style(
+                    f"✓ Not found among {len(index)} breached passwords.", fg="green"))
+            return
+
+        if not check_initialized():
+            click.echo(click.style(
+                "✗ Password manager not initialized! Please run 'pass-cli init' first.",
+                fg="red"))
+            return
+
+        if not check_auth():
+            click.echo(click.style(
+                "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+            return
+
+        try:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                click.echo(click.style(
+                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                return
+
+            password_manager = PasswordManager(encryption_key, use_key_cache=True)
+            checked = 0
+            breached = []
+            for service, username, password in password_manager.iter_all(workers=workers):
+                checked += 1
+                if password in index:
+                    breached.append((service, username))
+        except Exception as e:
+            click.echo(click.style(f"✗ {str(e)}", fg="red"))
+            return
+
+    if not breached:
+        click.echo(click.style(
+            f"✓ None of {checked} passwords appear in known breaches.", fg="green"))
+        return
+    click.echo(click.style(
+        f"✗ {len(breached)} of {checked} passwords appear in known breaches:", fg="red"))
+    for service, username in breached:
+        click.echo(f"  {service} / {username}")
@@ -1,7 +1,7 @@
 import click
 
 from ..database import PasswordManager
-from ..utils import check_initialized, check_sudo
+from ..utils import check_auth, check_initialized
 
 
 @click.command()
@@ -10,17 +10,17 @@ from ..utils import check_initialized, check_sudo
 @click.option('--force', '-f', is_flag=True, help='Skip confirmation')
 def delete(service: str, username: str, force: bool) -> None:
     """Delete a stored password"""
-    if not check_sudo():
-        click.echo(click.style(
-            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
-        return
-
     if not check_initialized():
         click.echo(click.style(
             "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
             fg="red"))
         return
 
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
     try:
         encryption_key = PasswordManager.get_stored_key()
         if not encryption_key:
@@ -28,7 +28,7 @@ def delete(service: str, username: str, force: bool) -> None:
                 "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
             return
 
-        password_manager = PasswordManager(encryption_key)
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
 
         if not password_manager.get_password(service, username):
             click.echo(click.style(
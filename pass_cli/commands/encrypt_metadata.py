@@ -0,0 +1,62 @@
+import time
+
+import click
+
+from ..agent import connect_agent
+from ..database import PasswordManager
+from ..utils import check_auth, check_initialized
+
+
+@click.command(name='encrypt-metadata')
+@click.option('--force', '-f', is_flag=True, help='Skip confirmation')
+def encrypt_metadata(force: bool) -> None:
+    """Encrypt service names and usernames in the database"""
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.",
+            fg="red"))
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+            return
+
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        if password_manager.metadata_encrypted:
+            click.echo(click.style("✓ Service names and usernames are already encrypted.",
+                                   fg="green"))
+            return
+
+        if not force:
+            click.confirm(
+                "Service names and usernames will be encrypted and the full-text search "
+                "index dropped. This cannot be undone. Continue?",
+                abort=True
+            )
+
+        # A running agent would keep writing plaintext names
+        agent = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+        if agent is not None:
+            agent.lock()
+            click.echo(click.style("Locked the running agent.", fg="yellow"))
+
+        start = time.perf_counter()
+        count = password_manager.encrypt_metadata()
+        click.echo(click.style(
+            f"✓ Encrypted the names of {count} entries in {time.perf_counter() - start:.2f}s",
+            fg="green"))
+
+    except click.Abort:
+        click.echo(click.style("Operation cancelled.", fg="yellow"))
+        return
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import click
+
+from ..utils import parse_secret_ref
+from .retrieve_many import fail, fetch_secrets
+
+
+@click.command(name='exec', context_settings={'ignore_unknown_options': True})
+@click.option('--map', '-m', 'mappings', multiple=True, required=True,
+              help='NAME=service:username, may be repeated')
+@click.argument('command', nargs=-1, required=True, type=click.UNPROCESSED)
+def exec_command(mappings: tuple, command: tuple) -> None:
+    """Run COMMAND with secrets in its environment
+
+    The vault is unlocked once, all mapped secrets are fetched with a single
+    query and this process is replaced by COMMAND, so secrets never touch the
+    clipboard, stdout or a temporary file.
+    """
+    try:
+        secrets = [parse_secret_ref(mapping) for mapping in mappings]
+    except ValueError as e:
+        fail(str(e))
+
+    passwords = fetch_secrets(secrets)
+    env = dict(os.environ)
+    env.update((name, password) for (name, _, _), password in zip(secrets, passwords))
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execvpe(command[0], command, env)
+    except OSError as e:
+        fail(f"Cannot run {command[0]}: {e.strerror}", code=127)
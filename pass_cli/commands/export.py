@@ -0,0 +1,70 @@
+import os
+import time
+
+import click
+
+from ..database import PasswordManager
+from ..formats import FORMATS, detect_format, write_records
+from ..parallel import default_workers
+from ..utils import check_auth, check_initialized
+
+
+def open_private(path: str):
+    """Open path for writing, readable by the owner only; '-' is stdout"""
+    if path == '-':
+        return click.get_text_stream('stdout')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    if hasattr(os, 'fchmod'):
+        # The mode only applies to new files, an existing one may be wider
+        os.fchmod(fd, 0o600)
+    return open(fd, 'w', encoding='utf-8')
+
+
+@click.command()
+@click.option('--output', '-o', type=click.Path(dir_okay=False, allow_dash=True), default='-',
+              help='Output file (default: stdout)')
+@click.option('--format', '-F', 'fmt', type=click.Choice(FORMATS),
+              help='Output format (default: detected from the file extension, csv for stdout)')
+@click.option('--workers', '-j', type=int, default=default_workers,
+              help='Decryption worker processes, 0 for one per CPU (default: 1)')
+def export(output: str, fmt: str, workers: int) -> None:
+    """Export all passwords in plain text"""
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+            fg="red"), err=True)
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"), err=True)
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"), err=True)
+            return
+
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        fmt = fmt or detect_format(output)
+
+        start = time.perf_counter()
+        stream = open_private(output)
+        try:
+            count = write_records(stream, fmt, password_manager.iter_all(workers))
+            stream.flush()
+        finally:
+            if output != '-':
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed > 0 else 0
+        click.echo(click.style(
+            f"✓ Exported {count} passwords in {elapsed:.2f}s ({rate:.0f}/s). "
+            "The export is not encrypted, keep it safe.", fg="yellow"), err=True)
+
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"), err=True)
+        return
@@ -1,49 +1,133 @@
+import contextlib
+import itertools
+
 import click
-import pyperclip
 
+from ..breach import open_default_index
 from ..database import PasswordManager
-from ..utils import check_initialized, check_sudo, generate_strong_password
+from ..formats import BufferedWriter
+from ..generator import CAPITALIZE, DEFAULT_CLASSES, PassphraseGenerator, PasswordGenerator
+from ..utils import check_auth, check_initialized
+
+
+# Consecutive breached candidates before giving up on the policy
+MAX_BREACHED = 100
+
+
+def unbreached(passwords, index):
+    """Drop the (unlikely) passwords that are already in a breach corpus
+
+    Raises:
+        ValueError: After MAX_BREACHED breached candidates in a row, when the
+            policy can (almost) only produce breached passwords
+    """
+    if index is None:
+        yield from passwords
+        return
+    rejected = 0
+    for password in passwords:
+        if password not in index:
+            rejected = 0
+            yield password
+            continue
+        rejected += 1
+        if rejected >= MAX_BREACHED:
+            raise ValueError(f"Policy too weak, the last {MAX_BREACHED} candidates were all "
+                             "breached. Use a longer length or more words.")
 
 
 @click.command()
 @click.option('--length', '-l', type=int, default=12, help='Password length (default: 12)')
+@click.option('--count', '-n', type=click.IntRange(min=1), default=1,
+              help='Number of passwords to generate (default: 1)')
+@click.option('--classes', '-c', default=','.join(DEFAULT_CLASSES),
+              help='Character classes to use, each at least once (default: lower,upper,digits,symbols)')
+@click.option('--exclude', '-x', default='', help='Characters never to use, e.g. "0O1lI"')
+@click.option('--passphrase', '-P', is_flag=True, help='Generate a passphrase of dictionary words')
+@click.option('--words', '-w', type=click.IntRange(min=1),
+              help='Passphrase words (default: 6, implies --passphrase)')
+@click.option('--entropy', '-e', type=click.FloatRange(min=1),
+              help='Use as few words as give this many bits (implies --passphrase)')
+@click.option('--separator', default='-', help='Passphrase word separator (default: -)')
+@click.option('--capitalize', type=click.Choice(CAPITALIZE), default='none',
+              help='Capitalize no word, the first, all or each at random (default: none)')
 @click.option('--service', '-s', help='Service name to store the password')
-@click.option('--username', '-u', help='Username to store the password')
+@click.option('--username', '-u',
+              help='Username to store the password, with {n} numbering each one when --count > 1')
 @click.option('--no-copy', is_flag=True, help='Show password in terminal instead of copying to clipboard')
-def generate(length: int, service: str, username: str, no_copy: bool) -> None:
-    """Generate a secure random password"""
-    if service and not check_sudo():
+def generate(length: int, count: int, classes: str, exclude: str, passphrase: bool, words: int,
+             entropy: float, separator: str, capitalize: str, service: str, username: str,
+             no_copy: bool) -> None:
+    """Generate secure random passwords or passphrases"""
+    store = bool(service and username)
+    if store and count > 1 and '{n}' not in username:
         click.echo(click.style(
-            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+            "✗ --username needs a {n} placeholder to store several passwords, "
+            "e.g. -u 'svc-{n}'.", fg="red"))
         return
 
     if service and not check_initialized():
         click.echo(click.style(
-            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.",
             fg="red"))
         return
 
+    if service and not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
     try:
-        password = generate_strong_password(length)
+        kind = 'passphrase' if passphrase or words or entropy else 'password'
+        if kind == 'password':
+            generator = PasswordGenerator(length, classes.split(','), exclude)
+        elif entropy:
+            generator = PassphraseGenerator.for_entropy(entropy, separator=separator,
+                                                        capitalize=capitalize)
+        else:
+            generator = PassphraseGenerator(words or 6, separator, capitalize)
+        strength = f"{generator.entropy_bits:.1f} bits of entropy"
+        with open_default_index() or contextlib.nullcontext() as index:
+            passwords = itertools.islice(unbreached(generator, index), count)
+
+            if store:
+                encryption_key = PasswordManager.get_stored_key()
+                if not encryption_key:
+                    click.echo(click.style(
+                        "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                    return
 
-        if service and username:
-            encryption_key = PasswordManager.get_stored_key()
-            if not encryption_key:
+                password_manager = PasswordManager(encryption_key, use_key_cache=True)
+                if count > 1:
+                    stored = password_manager.store_many(
+                        (service, username.format(n=n), password)
+                        for n, password in enumerate(passwords, 1))
+                    click.echo(click.style(
+                        f"✓ Generated and stored {stored} {kind}s for {service} ({strength})",
+                        fg="green"))
+                    return
+                password = next(passwords)
+                password_manager.store_password(service, username, password)
                 click.echo(click.style(
-                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                    f"✓ Generated and stored {kind} for {service} ({strength})", fg="green"))
+            elif count > 1:
+                stream = BufferedWriter(lambda text: click.echo(text, nl=False))
+                for password in passwords:
+                    stream.write(password + '\n')
+                stream.flush()
                 return
+            else:
+                password = next(passwords)
 
-            password_manager = PasswordManager(encryption_key)
-            password_manager.store_password(service, username, password)
-            click.echo(click.style(
-                f"✓ Generated and stored password for {service}", fg="green"))
+            if no_copy:
+                click.echo(click.style(f"Generated {kind} ({strength}):", fg="green"))
+                click.echo(password)
+            else:
+                import pyperclip
 
-        if no_copy:
-            click.echo(click.style("Generated password:", fg="green"))
-            click.echo(password)
-        else:
-            pyperclip.copy(password)
-            click.echo(click.style("✓ Password copied to clipboard!", fg="green"))
+                pyperclip.copy(password)
+                click.echo(click.style(
+                    f"✓ {kind.capitalize()} copied to clipboard! ({strength})", fg="green"))
 
     except Exception as e:
         click.echo(click.style(f"✗ {str(e)}", fg="red"))
@@ -0,0 +1,51 @@
+import time
+
+import click
+
+from ..database import PasswordManager
+from ..formats import FORMATS, detect_format, read_records
+from ..parallel import default_workers
+from ..utils import check_auth, check_initialized
+
+
+@click.command(name='import')
+# utf-8-sig drops the byte order mark some exporters (and Excel) write
+@click.argument('file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--format', '-F', 'fmt', type=click.Choice(FORMATS),
+              help='Input format (default: detected from the file extension, csv for stdin)')
+@click.option('--workers', '-j', type=int, default=default_workers,
+              help='Encryption worker processes, 0 for one per CPU (default: 1)')
+def import_passwords(file, fmt: str, workers: int) -> None:
+    """Import passwords from a CSV, JSON or JSON Lines file"""
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+            fg="red"))
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+            return
+
+        password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        fmt = fmt or detect_format(file.name)
+
+        start = time.perf_counter()
+        count = password_manager.store_many(read_records(file, fmt), workers=workers)
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed > 0 else 0
+        click.echo(click.style(
+            f"✓ Imported {count} passwords in {elapsed:.2f}s ({rate:.0f}/s)", fg="green"))
+
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
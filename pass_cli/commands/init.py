@@ -8,7 +8,9 @@ from ..utils import check_initialized, generate_strong_password
 
 
 @click.command()
-def init():
+@click.option('--encrypt-metadata', is_flag=True,
+              help='Also encrypt service names and usernames (see encrypt-metadata)')
+def init(encrypt_metadata: bool):
     """Initialize the password manager"""
     try:
         if check_initialized():
@@ -27,7 +29,9 @@ def init():
             click.echo(click.style(
                 "Generated secure encryption key.", fg="green"))
 
-        PasswordManager(encryption_key)
+        with PasswordManager(encryption_key) as password_manager:
+            if encrypt_metadata:
+                password_manager.encrypt_metadata()
         click.echo(click.style("✓ Password manager initialized successfully!", fg="green"))
 
     except Exception as e:
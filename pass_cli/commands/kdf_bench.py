@@ -0,0 +1,77 @@
+import click
+
+from .. import kdf
+from ..agent import connect_agent
+from ..database import PasswordManager
+from ..utils import check_auth, check_initialized
+
+
+def _format_params(params: dict) -> str:
+    return ' '.join(f"{name}={value}" for name, value in params.items())
+
+
+@click.command(name='kdf-bench')
+@click.option('--target-ms', '-t', type=click.IntRange(min=10), default=500,
+              help='Target unlock time in milliseconds (default: 500)')
+@click.option('--algorithm', '-a', type=click.Choice(kdf.ALGORITHMS),
+              help='Only calibrate this algorithm')
+@click.option('--apply', is_flag=True,
+              help='Re-encrypt the vault with the calibrated parameters')
+def kdf_bench(target_ms: int, algorithm: str, apply: bool) -> None:
+    """Calibrate key derivation parameters for this machine"""
+    if apply and not algorithm:
+        click.echo(click.style("✗ --apply requires --algorithm.", fg="red"))
+        return
+
+    if check_initialized():
+        with PasswordManager() as password_manager:
+            spec = password_manager.kdf_spec()
+        click.echo(f"Vault KDF: {spec['algorithm']} {_format_params(spec['params'])}")
+    elif apply:
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.", fg="red"))
+        return
+
+    available = kdf.available_algorithms()
+    results = {}
+    click.echo(click.style(f"\nCalibrating for {target_ms} ms per unlock:", fg="green"))
+    for name in [algorithm] if algorithm else kdf.ALGORITHMS:
+        if name not in available:
+            click.echo(f"  {name:<9} not supported by the installed cryptography package")
+            continue
+        params, elapsed = kdf.calibrate(name, target_ms / 1000)
+        results[name] = params
+        click.echo(f"  {name:<9} {_format_params(params):<45} {elapsed * 1000:8.1f} ms")
+
+    if not apply or algorithm not in results:
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+            return
+
+        agent = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+        if agent is not None:
+            agent.lock()
+            click.echo(click.style("Locked the running agent.", fg="yellow"))
+
+        with PasswordManager(encryption_key) as password_manager:
+            if password_manager.rekey_in_progress():
+                click.echo(click.style(
+                    "✗ A key rotation is in progress, run 'pass-cli rekey' first.", fg="red"))
+                return
+            password_manager.set_kdf_target(algorithm, results[algorithm])
+            count = password_manager.rekey(encryption_key)
+        click.echo(click.style(
+            f"✓ Upgraded the vault to {algorithm}, re-encrypted {count} passwords.", fg="green"))
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
@@ -1,51 +1,92 @@
+import itertools
 import sys
 
 import click
 
+from ..agent import connect_agent
 from ..database import PasswordManager
-from ..utils import check_initialized, check_sudo
+from ..formats import BufferedWriter, write_records
+from ..utils import check_auth, check_initialized
+
+LIST_FORMATS = ('text', 'json', 'jsonl', 'tsv')
+LIST_FIELDS = ('service', 'username')
+SEPARATOR = "─" * 50
+
+
+def write_entries(fmt: str, entries):
+    """Echo (service_name, username) pairs in buffered batches
+
+    Args:
+        fmt: One of LIST_FORMATS
+        entries: Iterable of (service_name, username) pairs
+    """
+    stream = BufferedWriter(lambda text: click.echo(text, nl=False))
+    if fmt == 'text':
+        for service_name, username in entries:
+            stream.write(f"Service: {service_name}\nUsername: {username}\n{SEPARATOR}\n")
+    else:
+        write_records(stream, fmt, entries, fields=LIST_FIELDS)
+    stream.flush()
 
 
 @click.command()
 @click.option('--service', '-s', help='Filter passwords by service name')
-def list(service: str = None) -> None:
+@click.option('--prefix', '-p', help='Only services starting with this prefix')
+@click.option('--match', '-m', 'pattern', help='Only services matching this glob pattern')
+@click.option('--limit', '-n', type=click.IntRange(min=0), help='Maximum number of entries')
+@click.option('--offset', type=click.IntRange(min=0), default=0, help='Number of entries to skip')
+@click.option('--format', '-F', 'fmt', type=click.Choice(LIST_FORMATS), default='text',
+              help='Output format (default: text)')
+def list(service: str = None, prefix: str = None, pattern: str = None, limit: int = None,
+         offset: int = 0, fmt: str = 'text') -> None:
     """List saved passwords for all or specific service"""
-    if not check_sudo():
-        click.echo(click.style(
-            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
-        return
+    # Keep machine-readable output clean by sending messages to stderr
+    err = fmt != 'text'
+    password_manager = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+    if password_manager is None:
+        if not check_initialized():
+            click.echo(click.style(
+                "✗ Password manager not initialized! Please run 'pass-cli init' first.",
+                fg="red"), err=err)
+            return
 
-    if not check_initialized():
-        click.echo(click.style(
-            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
-            fg="red"))
-        return
+        if not check_auth():
+            click.echo(click.style(
+                "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"), err=err)
+            return
 
     try:
-        encryption_key = PasswordManager.get_stored_key()
-        if not encryption_key:
-            click.echo(click.style(
-                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+        if password_manager is None:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                click.echo(click.style(
+                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"),
+                    err=err)
+                return
+
+            password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        stored_passwords = password_manager.list_passwords(
+            service, prefix=prefix, pattern=pattern, limit=limit, offset=offset)
+
+        if fmt != 'text':
+            write_entries(fmt, stored_passwords)
             return
 
-        password_manager = PasswordManager(encryption_key)
-        stored_passwords = password_manager.list_passwords(service)
-        
-        if not stored_passwords:
+        first = next(stored_passwords, None)
+        if first is None:
             if service:
                 click.echo(click.style(
                     f"✗ No passwords found for service: {service}", fg="yellow"))
+            elif prefix or pattern or offset:
+                click.echo(click.style("✗ No matching passwords found.", fg="yellow"))
             else:
                 click.echo(click.style("✗ No passwords stored yet.", fg="yellow"))
             return
 
         click.echo(click.style("\nStored Passwords:", fg="green"))
-        click.echo("─" * 50)
-        for service_name, username in stored_passwords:
-            click.echo(f"Service: {service_name}")
-            click.echo(f"Username: {username}")
-            click.echo("─" * 50)
+        click.echo(SEPARATOR)
+        write_entries(fmt, itertools.chain([first], stored_passwords))
 
     except Exception as e:
-        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        click.echo(click.style(f"✗ {str(e)}", fg="red"), err=err)
         return
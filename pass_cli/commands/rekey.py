@@ -0,0 +1,76 @@
+import time
+
+import click
+
+from ..agent import connect_agent
+from ..database import PasswordManager
+from ..parallel import default_workers
+from ..utils import check_auth, check_initialized, generate_strong_password
+
+
+@click.command()
+@click.option('--batch-size', '-b', type=int, default=PasswordManager.BATCH_SIZE,
+              help=f'Rows re-encrypted per transaction (default: {PasswordManager.BATCH_SIZE})')
+@click.option('--workers', '-j', type=int, default=default_workers,
+              help='Encryption worker processes, 0 for one per CPU (default: 1)')
+@click.option('--upgrade-kdf', is_flag=True,
+              help='Keep the encryption key, only re-derive it with the KDF target')
+def rekey(batch_size: int, workers: int, upgrade_kdf: bool) -> None:
+    """Re-encrypt all passwords with a new encryption key"""
+    if not check_initialized():
+        click.echo(click.style(
+            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+            fg="red"))
+        return
+
+    if not check_auth():
+        click.echo(click.style(
+            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
+        return
+
+    try:
+        encryption_key = PasswordManager.get_stored_key()
+        if not encryption_key:
+            click.echo(click.style(
+                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+            return
+
+        agent = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+        if agent is not None:
+            agent.lock()
+            click.echo(click.style("Locked the running agent.", fg="yellow"))
+
+        # rekey() derives the new key with the KDF target, no separate upgrade needed
+        password_manager = PasswordManager(encryption_key, use_key_cache=True, upgrade_kdf=False)
+
+        if password_manager.rekey_in_progress():
+            # KDF upgrades rotate to the current key, which is not stored twice
+            new_key = PasswordManager.get_pending_key() or encryption_key
+            click.echo(click.style("Resuming interrupted key rotation.", fg="yellow"))
+        elif upgrade_kdf:
+            if not password_manager.kdf_upgrade_needed():
+                click.echo(click.style("✓ The vault already uses the KDF target.", fg="green"))
+                return
+            new_key = encryption_key
+        else:
+            new_key = click.prompt(
+                "Enter new encryption key (or press Enter to generate one)", 
+                default='', 
+                hide_input=True
+            )
+            if not new_key:
+                new_key = generate_strong_password(is_encryption_key=True)
+                click.echo(click.style(
+                    "Generated secure encryption key.", fg="green"))
+
+        start = time.perf_counter()
+        count = password_manager.rekey(new_key, batch_size=batch_size, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        rate = count / elapsed if elapsed > 0 else 0
+        click.echo(click.style(
+            f"✓ Re-encrypted {count} passwords in {elapsed:.2f}s ({rate:.0f} rows/s)", fg="green"))
+
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"))
+        return
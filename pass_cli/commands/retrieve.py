@@ -1,8 +1,9 @@
 import click
-import pyperclip
 
+from .. import trace
+from ..agent import connect_agent
 from ..database import PasswordManager
-from ..utils import check_initialized, check_sudo
+from ..utils import check_auth, check_initialized
 
 
 @click.command()
@@ -11,25 +12,28 @@ from ..utils import check_initialized, check_sudo
 @click.option('--no-copy', is_flag=True, help='Show password in terminal instead of copying to clipboard')
 def retrieve(service: str, username: str, no_copy: bool) -> None:
     """Retrieve a stored password"""
-    if not check_sudo():
-        click.echo(click.style(
-            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
-        return
-
-    if not check_initialized():
-        click.echo(click.style(
-            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
-            fg="red"))
-        return
+    password_manager = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+    if password_manager is None:
+        if not check_initialized():
+            click.echo(click.style(
+                "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+                fg="red"))
+            return
 
-    try:
-        encryption_key = PasswordManager.get_stored_key()
-        if not encryption_key:
+        if not check_auth():
             click.echo(click.style(
-                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
             return
 
-        password_manager = PasswordManager(encryption_key)
+    try:
+        if password_manager is None:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                click.echo(click.style(
+                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                return
+
+            password_manager = PasswordManager(encryption_key, use_key_cache=True)
 
         password = password_manager.get_password(service, username)
         if password is None:
@@ -41,7 +45,10 @@ def retrieve(service: str, username: str, no_copy: bool) -> None:
             click.echo(click.style("Retrieved password:", fg="green"))
             click.echo(password)
         else:
-            pyperclip.copy(password)
+            with trace.span('clipboard'):
+                import pyperclip
+
+                pyperclip.copy(password)
             click.echo(click.style("✓ Password copied to clipboard!", fg="green"))
 
     except Exception as e:
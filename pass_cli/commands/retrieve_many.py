@@ -0,0 +1,98 @@
+import json
+import shlex
+import sys
+
+import click
+
+from ..agent import connect_agent
+from ..database import PasswordManager
+from ..utils import check_auth, check_initialized, parse_secret_ref
+
+OUTPUT_FORMATS = ('json', 'env')
+
+
+def read_refs(refs: tuple) -> list:
+    """References from the arguments, or one per line from stdin
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    if not refs:
+        refs = [line.strip() for line in click.get_text_stream('stdin')]
+        refs = [ref for ref in refs if ref and not ref.startswith('#')]
+    return [parse_secret_ref(ref) for ref in refs]
+
+
+def format_secrets(fmt: str, secrets: list, passwords: list) -> str:
+    """Render (name, service_name, username) references with their passwords"""
+    if fmt == 'env':
+        return ''.join(f"{name}={shlex.quote(password)}\n"
+                       for (name, _, _), password in zip(secrets, passwords))
+    return json.dumps([
+        {'name': name, 'service': service_name, 'username': username, 'password': password}
+        for (name, service_name, username), password in zip(secrets, passwords)
+    ], indent=2) + '\n'
+
+
+def fail(message: str, code: int = 1):
+    click.echo(click.style(f"✗ {message}", fg="red"), err=True)
+    sys.exit(code)
+
+
+def fetch_secrets(secrets: list) -> list:
+    """Unlock the vault once and return the passwords of (name, service, username) refs
+
+    Exits with an error message on stderr if the vault cannot be unlocked or
+    any secret is missing.
+    """
+    keys = [(service_name, username) for _, service_name, username in secrets]
+    password_manager = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+    if password_manager is None:
+        if not check_initialized():
+            fail("Password manager not initialized! Please run 'pass-cli init' first.")
+
+        if not check_auth():
+            fail("Authentication required! Please run 'pass-cli auth' first.")
+
+    try:
+        if password_manager is None:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                fail("No encryption key found! Please run 'pass-cli init' first.")
+
+            # Closed before returning, so no database handle outlives the lookup
+            with PasswordManager(encryption_key, use_key_cache=True) as password_manager:
+                passwords = password_manager.get_passwords(keys)
+        else:
+            passwords = password_manager.get_passwords(keys)
+    except Exception as e:
+        fail(str(e))
+
+    missing = [f"{service_name} / {username}"
+               for (_, service_name, username), password in zip(secrets, passwords)
+               if password is None]
+    if missing:
+        fail(f"No password found for {', '.join(missing)}")
+    return passwords
+
+
+@click.command(name='retrieve-many')
+@click.argument('refs', nargs=-1)
+@click.option('--format', '-F', 'fmt', type=click.Choice(OUTPUT_FORMATS), default='json',
+              help='Output format (default: json)')
+def retrieve_many(refs: tuple, fmt: str) -> None:
+    """Retrieve several passwords at once
+
+    REFS are [NAME=]service:username references, read one per line from
+    stdin when none are given. The vault is unlocked once and all entries
+    are fetched with a single query. env output prints NAME=value lines
+    that can be eval'd by a shell.
+    """
+    try:
+        secrets = read_refs(refs)
+    except ValueError as e:
+        fail(str(e))
+    if not secrets:
+        fail("No secret references given.")
+
+    passwords = fetch_secrets(secrets)
+    click.echo(format_secrets(fmt, secrets, passwords), nl=False)
@@ -0,0 +1,61 @@
+import itertools
+
+import click
+
+from ..agent import connect_agent
+from ..database import PasswordManager
+from ..utils import check_auth, check_initialized
+from .list import LIST_FORMATS, SEPARATOR, write_entries
+
+
+@click.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=20,
+              help='Maximum number of results (default: 20)')
+@click.option('--format', '-F', 'fmt', type=click.Choice(LIST_FORMATS), default='text',
+              help='Output format (default: text)')
+def search(query: tuple, limit: int, fmt: str) -> None:
+    """Search service names and usernames"""
+    err = fmt != 'text'
+    password_manager = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+    if password_manager is None:
+        if not check_initialized():
+            click.echo(click.style(
+                "✗ Password manager not initialized! Please run 'pass-cli init' first.",
+                fg="red"), err=err)
+            return
+
+        if not check_auth():
+            click.echo(click.style(
+                "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"), err=err)
+            return
+
+    try:
+        if password_manager is None:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                click.echo(click.style(
+                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"),
+                    err=err)
+                return
+
+            password_manager = PasswordManager(encryption_key, use_key_cache=True)
+        terms = ' '.join(query)
+        matches = password_manager.search(terms, limit=limit)
+
+        if fmt != 'text':
+            write_entries(fmt, matches)
+            return
+
+        first = next(matches, None)
+        if first is None:
+            click.echo(click.style(f"✗ No passwords matching: {terms}", fg="yellow"))
+            return
+
+        click.echo(click.style(f"\nMatches for '{terms}':", fg="green"))
+        click.echo(SEPARATOR)
+        write_entries(fmt, itertools.chain([first], matches))
+
+    except Exception as e:
+        click.echo(click.style(f"✗ {str(e)}", fg="red"), err=err)
+        return
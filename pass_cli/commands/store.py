@@ -2,8 +2,9 @@ import os
 
 import click
 
+from ..agent import connect_agent
 from ..database import PasswordManager
-from ..utils import check_initialized, check_sudo
+from ..utils import check_auth, check_initialized
 
 
 @click.command()
@@ -12,25 +13,28 @@ from ..utils import check_initialized, check_sudo
 @click.option('--password', '-p', required=True, help='Password to store')
 def store(service: str, username: str, password: str) -> None:
     """Store a password for a service"""
-    if not check_sudo():
-        click.echo(click.style(
-            "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
-        return
-
-    if not check_initialized():
-        click.echo(click.style(
-            "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
-            fg="red"))
-        return
+    password_manager = connect_agent(PasswordManager.DEFAULT_DB_PATH)
+    if password_manager is None:
+        if not check_initialized():
+            click.echo(click.style(
+                "✗ Password manager not initialized! Please run 'pass-cli init' first.", 
+                fg="red"))
+            return
 
-    try:
-        encryption_key = PasswordManager.get_stored_key()
-        if not encryption_key:
+        if not check_auth():
             click.echo(click.style(
-                "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                "✗ Authentication required! Please run 'pass-cli auth' first.", fg="red"))
             return
 
-        password_manager = PasswordManager(encryption_key)
+    try:
+        if password_manager is None:
+            encryption_key = PasswordManager.get_stored_key()
+            if not encryption_key:
+                click.echo(click.style(
+                    "✗ No encryption key found! Please run 'pass-cli init' first.", fg="red"))
+                return
+
+            password_manager = PasswordManager(encryption_key, use_key_cache=True)
         password_manager.store_password(service, username, password)
         click.echo(click.style("✓ Password stored successfully!", fg="green"))
 
@@ -1,138 +1,1190 @@
 import base64
+import fnmatch
+import hashlib
+import hmac
+import itertools
+import json
 import os
 import sqlite3
 from datetime import datetime
+from urllib.request import pathname2url
 
-import keyring
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from . import audit, kdf, trace
+from .cache import SecretCache
+from .keycache import DerivedKeyCache
+from .parallel import CryptoPool, build_cipher
+from .pool import ConnectionPool
+
+UPSERT_PASSWORD_SQL = '''
+    INSERT INTO passwords (service_name, username, encrypted_password, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (service_name, username) DO UPDATE SET
+        encrypted_password = excluded.encrypted_password,
+        updated_at = excluded.updated_at
+'''
+# Encrypted-metadata vaults upsert on the blind index instead of the names
+UPSERT_SEALED_SQL = '''
+    INSERT INTO passwords (service_name, username, lookup, encrypted_password, updated_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (lookup) DO UPDATE SET
+        encrypted_password = excluded.encrypted_password,
+        updated_at = excluded.updated_at
+'''
+
+
+def _batched(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string above every string starting with prefix, None if there is none"""
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if last == 0xD800:
+            # Surrogates cannot be encoded as UTF-8, the next character is U+E000
+            last = 0xE000
+        if last <= 0x10FFFF:
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
 
 
 class PasswordManager:
     KEYRING_SERVICE = "pass-cli"
     KEYRING_USERNAME = "encryption_key"
+    KEYRING_PENDING_USERNAME = "pending_encryption_key"
     ITERATIONS = 100 if os.getenv('TESTING') == 'true' else 1000
     DEFAULT_DB_PATH = os.path.expanduser('~/.pass-cli/passwords.db')
+    KEY_CACHE_TTL = int(os.getenv('PASS_CLI_KEY_CACHE_TTL', '300'))
+    BUSY_TIMEOUT = float(os.getenv('PASS_CLI_BUSY_TIMEOUT', '5.0'))
+    SCHEMA_VERSION = 7
+    FTS_TABLE = 'passwords_fts'
+    FTS_MIN_TERM = 3
+    AUDIT_TABLE = 'audit_cache'
+    BATCH_SIZE = 500
+    # Keys per get_passwords() query, two parameters each (SQLite's lowest limit is 999)
+    LOOKUP_BATCH = 400
+    SEALED_ERROR = 'metadata is encrypted, unlock the vault again'
+
+    def __init__(self, encryption_key: str = None, db_path: str = None,
+                 use_key_cache: bool = False, cache_size: int = 0, cache_ttl: float = 60.0,
+                 thread_safe: bool = False, pool_size: int = 4, upgrade_kdf: bool = False):
+        """Open (and unlock) a password vault
 
-    def __init__(self, encryption_key: str = None, db_path: str = None):
+        By default an instance must only be used by one thread at a time. With
+        thread_safe=True it can be shared between threads: reads run on a pool
+        of up to pool_size reader connections, writes are serialized on one
+        writer connection and retried with backoff while the database is busy.
+
+        Args:
+            encryption_key: Key to unlock the vault with, or to initialize it
+            db_path: Database file, defaults to DEFAULT_DB_PATH
+            use_key_cache: Reuse the derived key across processes
+            cache_size: Keep up to this many decrypted passwords in memory
+            cache_ttl: Seconds a decrypted password stays cached
+            thread_safe: Allow concurrent use from multiple threads
+            pool_size: Maximum number of reader connections in thread-safe mode
+            upgrade_kdf: Re-encrypt the vault after unlocking when its KDF
+                differs from the target (see set_kdf_target), or resume such
+                an upgrade that was interrupted
+        """
         self.db_path = db_path or self.DEFAULT_DB_PATH
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        self._init_db()
+        self._key_cache = DerivedKeyCache(self.db_path, self.KEY_CACHE_TTL)
+        self._secret_cache = SecretCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._metadata_key = self._metadata_cipher = None
+        self._cipher_generation = 0
+        self._vault_salt = self._pending_salt = None
+        with trace.span('sqlite.open'):
+            self._pool = ConnectionPool(self._connect, readers=pool_size if thread_safe else 0)
+            self._conn = self._pool.writer_conn
+            self._init_db()
+            self._search_index = self._has_search_index()
         
         if encryption_key is None:
             return
-            
+
+        with trace.span('unlock'):
+            self._open_vault(encryption_key, use_key_cache, upgrade_kdf)
+
+    def _open_vault(self, encryption_key: str, use_key_cache: bool, upgrade_kdf: bool):
+        # The key derivation function runs at most once per unlock
+        cipher_key = None
+        cached = False
         if not self._has_encryption_key():
-            self._set_encryption_key(encryption_key)
-            keyring.set_password(self.KEYRING_SERVICE, self.KEYRING_USERNAME, encryption_key)
-        elif not self._verify_encryption_key(encryption_key):
-            raise ValueError("Invalid encryption key")
-            
-        self._setup_cipher(encryption_key)
+            import keyring
+
+            self._key_cache.clear()
+            cipher_key = self._set_encryption_key(encryption_key)
+            with trace.span('keyring.set'):
+                keyring.set_password(self.KEYRING_SERVICE, self.KEYRING_USERNAME, encryption_key)
+        elif use_key_cache:
+            salt = self._get_vault_salt()
+            with trace.span('keycache.load'):
+                cipher_key = self._key_cache.load(encryption_key, salt)
+            cached = cipher_key is not None
+            if cached:
+                self._vault_salt = salt
+
+        if cipher_key is None:
+            cipher_key = self._unlock(encryption_key)
+            if cipher_key is None:
+                encryption_key, cipher_key = self._recover_finished_rekey()
+        if use_key_cache and not cached:
+            with trace.span('keycache.save'):
+                self._key_cache.save(cipher_key, encryption_key, self._vault_salt)
+
+        self._use_cipher_key(cipher_key)
+        self._key_tag_secret = os.urandom(32)
+        self._key_tag = self._tag_key(encryption_key)
+        self._load_pending_cipher(encryption_key)
+        self._load_metadata_key()
+        self._upgrade_kdf(encryption_key, upgrade_kdf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database connection and wipe cached passwords"""
+        if self._secret_cache is not None:
+            self._secret_cache.clear()
+        if self._conn is not None:
+            self._pool.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, cached_statements=128,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _schema_version(self) -> int:
+        return self._conn.execute('PRAGMA user_version').fetchone()[0]
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS encryption_keys (
-                    id INTEGER PRIMARY KEY,
-                    key_hash TEXT NOT NULL,
-                    salt TEXT NOT NULL
-                )
-            ''')
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS passwords (
-                    id INTEGER PRIMARY KEY,
-                    service_name TEXT NOT NULL,
-                    username TEXT NOT NULL,
-                    encrypted_password TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        """Run the schema migrations the database has not seen yet"""
+        if self._schema_version() >= self.SCHEMA_VERSION:
+            return
+
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            version = self._schema_version()
+            for target in range(version + 1, self.SCHEMA_VERSION + 1):
+                getattr(self, f'_migrate_v{target}')()
+            self._conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+
+    def _migrate_v1(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS encryption_keys (
+                id INTEGER PRIMARY KEY,
+                key_hash TEXT NOT NULL,
+                salt TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS passwords (
+                id INTEGER PRIMARY KEY,
+                service_name TEXT NOT NULL,
+                username TEXT NOT NULL,
+                encrypted_password TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def _migrate_v2(self):
+        """Add updated_at and make (service_name, username) unique"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(passwords)')}
+        if 'updated_at' not in columns:
+            self._conn.execute('ALTER TABLE passwords ADD COLUMN updated_at TIMESTAMP')
+        self._conn.execute('UPDATE passwords SET updated_at = created_at WHERE updated_at IS NULL')
+        # Duplicates were stored by repeated `store` calls, keep the latest one
+        self._conn.execute('''
+            DELETE FROM passwords WHERE id NOT IN (
+                SELECT MAX(id) FROM passwords GROUP BY service_name, username
+            )
+        ''')
+        self._conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_service_username
+            ON passwords (service_name, username)
+        ''')
+
+    def _migrate_v3(self):
+        """Add a key/value table for vault-wide state"""
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS vault_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+
+    def _migrate_v4(self):
+        """Add a trigram full-text index over service names and usernames
+
+        The index is an external-content FTS5 table kept in sync by triggers.
+        SQLite builds without FTS5 or the trigram tokenizer skip it and search()
+        falls back to a LIKE scan.
+        """
+        fts = self.FTS_TABLE
+        try:
+            self._conn.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    service_name, username,
+                    content='passwords', content_rowid='id', tokenize='trigram'
                 )
             ''')
+        except sqlite3.OperationalError:
+            return
+        # executescript() would commit the migration transaction, so run the
+        # triggers one statement at a time
+        remove_old = (f"INSERT INTO {fts} ({fts}, rowid, service_name, username) "
+                      "VALUES ('delete', old.id, old.service_name, old.username);")
+        add_new = (f"INSERT INTO {fts} (rowid, service_name, username) "
+                   "VALUES (new.id, new.service_name, new.username);")
+        triggers = {
+            'passwords_fts_insert': ('AFTER INSERT', add_new),
+            'passwords_fts_delete': ('AFTER DELETE', remove_old),
+            'passwords_fts_update': ('AFTER UPDATE OF service_name, username',
+                                     remove_old + ' ' + add_new),
+        }
+        for name, (event, body) in triggers.items():
+            self._conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON passwords BEGIN {body} END")
+        self._conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def _migrate_v5(self):
+        """Add the audit cache of per-entry keyed fingerprints and strength scores"""
+        self._create_audit_table(self.AUDIT_TABLE)
+        # A cached row is valid until its password changes
+        for name, event in (('audit_cache_update', 'AFTER UPDATE OF encrypted_password'),
+                            ('audit_cache_delete', 'AFTER DELETE')):
+            self._conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON passwords "
+                f"BEGIN DELETE FROM {self.AUDIT_TABLE} WHERE id = old.id; END")
+
+    def _migrate_v6(self):
+        """Record whether an audited password is in the breach index"""
+        columns = {row[1] for row in self._conn.execute(f'PRAGMA table_info({self.AUDIT_TABLE})')}
+        if 'breached' not in columns:
+            self._conn.execute(f'ALTER TABLE {self.AUDIT_TABLE} ADD COLUMN breached INTEGER')
+
+    def _migrate_v7(self):
+        """Add the blind index column of encrypted-metadata vaults"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(passwords)')}
+        if 'lookup' not in columns:
+            self._conn.execute('ALTER TABLE passwords ADD COLUMN lookup BLOB')
+        # NULLs are distinct, so plaintext rows never conflict
+        self._conn.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_lookup ON passwords (lookup)')
+
+    def _create_audit_table(self, table: str, temporary: bool = False):
+        self._conn.execute(f'''
+            CREATE {'TEMP ' if temporary else ''}TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                fingerprint BLOB NOT NULL,
+                entropy REAL NOT NULL,
+                classes INTEGER NOT NULL,
+                breached INTEGER
+            )
+        ''')
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{table}_fingerprint ON {table} (fingerprint)')
+
+    def _has_search_index(self) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.FTS_TABLE,)
+        ).fetchone()
+        return row is not None
+
+    def _get_meta(self, key: str) -> str:
+        # On the writer connection, under its (re-entrant) lock: callers inside a
+        # write transaction must see its uncommitted state, and in thread-safe
+        # mode nothing may interleave with another thread's transaction
+        with self._pool.write() as conn:
+            row = conn.execute('SELECT value FROM vault_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        self._conn.execute('''
+            INSERT INTO vault_meta (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        ''', (key, str(value)))
 
     def _has_encryption_key(self) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('SELECT COUNT(*) FROM encryption_keys')
-            return cursor.fetchone()[0] > 0
+        cursor = self._conn.execute('SELECT COUNT(*) FROM encryption_keys')
+        return cursor.fetchone()[0] > 0
+
+    def _hash_key(self, key: str, salt: bytes) -> str:
+        """Verifier of vaults whose KDF spec has no HKDF split"""
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-    def _set_encryption_key(self, key: str):
-        salt = os.urandom(16)
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=salt,
             iterations=self.ITERATIONS,
         )
-        key_hash = base64.b64encode(kdf.derive(key.encode())).decode()
+        with trace.span('kdf.derive'):
+            return base64.b64encode(kdf.derive(key.encode())).decode()
+
+    def _derive_keys(self, key: str, spec: dict) -> tuple:
+        """Run the KDF once and split the result into (verifier, cipher key)"""
+        with trace.span('kdf.derive'):
+            master = kdf.derive(key.encode(), spec)
+        verifier, cipher_key = kdf.split(master)
+        return base64.b64encode(verifier).decode(), base64.urlsafe_b64encode(cipher_key)
+
+    def _check_key(self, key: str, key_hash: str, salt: str, spec: dict) -> bytes:
+        """Return the cipher key if key matches the stored verifier, None otherwise"""
+        if spec.get('split'):
+            verifier, cipher_key = self._derive_keys(key, spec)
+            return cipher_key if hmac.compare_digest(verifier, key_hash) else None
+        if not hmac.compare_digest(self._hash_key(key, base64.b64decode(salt)), key_hash):
+            return None
+        return self._derive_cipher_key(key, spec)
+
+    def _set_encryption_key(self, key: str) -> bytes:
+        spec = self._new_kdf_spec()
+        key_hash, cipher_key = self._derive_keys(key, spec)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
+        with self._conn:
+            self._conn.execute('''
                 INSERT INTO encryption_keys (key_hash, salt)
                 VALUES (?, ?)
-            ''', (key_hash, base64.b64encode(salt).decode()))
-
-    def _verify_encryption_key(self, key: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('SELECT key_hash, salt FROM encryption_keys LIMIT 1')
-            stored_hash, stored_salt = cursor.fetchone()
-            
-            salt = base64.b64decode(stored_salt)
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=self.ITERATIONS,
-            )
-            key_hash = base64.b64encode(kdf.derive(key.encode())).decode()
-            return key_hash == stored_hash
+            ''', (key_hash, spec['salt']))
+            self._set_meta('kdf', json.dumps(spec))
+        self._vault_salt = spec['salt']
+        return cipher_key
 
-    def _setup_cipher(self, key: str):
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b'encryption-salt',
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(key.encode()))
-        self.cipher_suite = Fernet(key)
+    def _unlock(self, key: str) -> bytes:
+        """Return the vault's cipher key, or None if key is wrong"""
+        cursor = self._conn.execute('SELECT key_hash, salt FROM encryption_keys LIMIT 1')
+        stored_hash, stored_salt = cursor.fetchone()
+        cipher_key = self._check_key(key, stored_hash, stored_salt, self.kdf_spec())
+        if cipher_key is not None:
+            # Lets rekey() notice a rotation finished by another process
+            self._vault_salt = stored_salt
+        return cipher_key
+
+    def _get_vault_salt(self) -> str:
+        cursor = self._conn.execute('SELECT salt FROM encryption_keys LIMIT 1')
+        return cursor.fetchone()[0]
+
+    def _tag_key(self, key: str) -> bytes:
+        # Lets rekey() recognize the unlocked key without another KDF pass
+        return hmac.new(self._key_tag_secret, key.encode(), hashlib.sha256).digest()
+
+    def kdf_spec(self) -> dict:
+        """Algorithm, parameters and salt the vault's cipher key is derived with"""
+        spec = self._get_meta('kdf')
+        return json.loads(spec) if spec else dict(kdf.LEGACY_SPEC)
+
+    def kdf_target(self) -> dict:
+        """Algorithm and parameters new keys are derived with"""
+        target = self._get_meta('kdf.target')
+        if target:
+            return json.loads(target)
+        algorithm = kdf.default_algorithm()
+        return {'algorithm': algorithm, 'params': kdf.default_params(algorithm)}
+
+    def _new_kdf_spec(self) -> dict:
+        target = self.kdf_target()
+        return kdf.new_spec(target['algorithm'], target['params'])
+
+    def set_kdf_target(self, algorithm: str, params: dict = None):
+        """Record the KDF the vault is upgraded to
+
+        The vault keeps its current KDF until rekey() runs with the current
+        key (`pass-cli rekey --upgrade-kdf`) or it is opened with
+        upgrade_kdf=True.
+        """
+        if algorithm not in kdf.available_algorithms():
+            raise ValueError(f"Unsupported KDF: {algorithm}")
+        target = {'algorithm': algorithm, 'params': params or kdf.default_params(algorithm)}
+        with self._pool.write(), self._conn:
+            self._set_meta('kdf.target', json.dumps(target))
+
+    def kdf_upgrade_needed(self) -> bool:
+        """Whether the vault's KDF differs from the target, or predates the HKDF split"""
+        return not self.rekey_in_progress() and not kdf.same_strength(
+            self.kdf_spec(), dict(self.kdf_target(), split=kdf.SPLIT))
+
+    def _upgrade_kdf(self, key: str, enabled: bool):
+        if not enabled:
+            return
+        if self.rekey_in_progress():
+            # Resume an interrupted upgrade; rotations to a new key are left to `rekey`
+            if self._get_meta('rekey.same_key'):
+                self._finish_rotation(key)
+        elif self.kdf_upgrade_needed():
+            self.rekey(key)
+
+    def _derive_cipher_key(self, key: str, spec: dict = None) -> bytes:
+        """Cipher key of vaults whose KDF spec has no HKDF split"""
+        with trace.span('kdf.derive'):
+            return base64.urlsafe_b64encode(kdf.derive(key.encode(), spec or self.kdf_spec()))
+
+    def _use_cipher_key(self, cipher_key: bytes, pending_cipher_key: bytes = None,
+                        pending_salt: str = None):
+        self._cipher_key = cipher_key
+        self._pending_cipher_key = pending_cipher_key
+        self._pending_salt = pending_salt
+        self.cipher_suite = build_cipher(self._cipher_keys())
+        # Tokens encrypted under an older generation are encrypted again on write
+        self._cipher_generation += 1
+
+    def _cipher_keys(self) -> list:
+        """Active Fernet keys, the key being rotated to (if any) first"""
+        if self._pending_cipher_key is None:
+            return [self._cipher_key]
+        return [self._pending_cipher_key, self._cipher_key]
+
+    def _pending_kdf_spec(self) -> dict:
+        # Rotations started before KDF specs were recorded keep the vault's KDF
+        spec = self._get_meta('rekey.kdf')
+        return json.loads(spec) if spec else self.kdf_spec()
+
+    def _unlock_pending(self, key: str) -> bytes:
+        """Return the cipher key of the rotation in progress, or None if key is not its key"""
+        return self._check_key(key, self._get_meta('rekey.key_hash'),
+                               self._get_meta('rekey.salt'), self._pending_kdf_spec())
+
+    def _load_pending_cipher(self, key: str):
+        """Decrypt with both keys while a key rotation is in progress
+
+        Args:
+            key: The current encryption key, which is also the pending one
+                when only the KDF is being upgraded
+        """
+        if not self.rekey_in_progress():
+            return
+        pending_key = None if self._get_meta('rekey.same_key') else self.get_pending_key()
+        pending_cipher_key = self._unlock_pending(pending_key or key)
+        if pending_cipher_key is None:
+            raise ValueError("Key rotation in progress but the new encryption key is unavailable")
+        self._use_cipher_key(self._cipher_key, pending_cipher_key, self._get_meta('rekey.salt'))
+
+    @property
+    def metadata_encrypted(self) -> bool:
+        """Whether service names and usernames are stored encrypted"""
+        return self._get_meta('metadata.key') is not None
+
+    def _load_metadata_key(self):
+        wrapped = self._get_meta('metadata.key')
+        if wrapped is not None:
+            with trace.span('fernet.decrypt'):
+                self._use_metadata_key(self.cipher_suite.decrypt(wrapped.encode()))
+
+    def _use_metadata_key(self, metadata_key: bytes):
+        self._metadata_key = metadata_key
+        self._metadata_cipher = build_cipher([metadata_key])
+        self._blind_key = kdf.expand(base64.urlsafe_b64decode(metadata_key),
+                                     b'pass-cli blind index')
+
+    def _blind_index(self, service_name: str, username: str) -> bytes:
+        # JSON keeps ("a:b", "c") and ("a", "b:c") apart
+        return hmac.new(self._blind_key, json.dumps([service_name, username]).encode(),
+                        hashlib.sha256).digest()
+
+    def _seal_names(self, service_name: str, username: str) -> tuple:
+        """Stored (service_name, username, lookup) columns of an encrypted-metadata entry"""
+        encrypt = self._metadata_cipher.encrypt
+        return (encrypt(service_name.encode()).decode(), encrypt(username.encode()).decode(),
+                self._blind_index(service_name, username))
+
+    def _open_names(self, rows):
+        """Yield rows with their leading service_name and username decrypted, if encrypted"""
+        if self._metadata_cipher is None:
+            yield from rows
+            return
+        decrypt = self._metadata_cipher.decrypt
+        for service_name, username, *rest in rows:
+            yield (decrypt(service_name.encode()).decode(), decrypt(username.encode()).decode(),
+                   *rest)
+
+    def _begin_write(self, conn: sqlite3.Connection):
+        """Start a write transaction on conn, switching to the keys and encrypted
+        metadata another instance rotated to or converted the vault to since
+        this one was unlocked"""
+        conn.execute('BEGIN IMMEDIATE')
+        self._follow_rotation()
+        if self._metadata_cipher is None and self._get_meta('metadata.key') is not None:
+            self._load_metadata_key()
+            self._search_index = False
+
+    def _follow_rotation(self):
+        """Load the vault and pending cipher keys if another process started or
+        finished a key rotation, looking the keys up in the keyring
+
+        Raises:
+            ValueError: If the keyring has no key matching the vault
+        """
+        if self._vault_salt is None:
+            # Not unlocked, there is no key to follow
+            return
+        vault_salt, pending_salt = self._get_vault_salt(), self._get_meta('rekey.salt')
+        if vault_salt == self._vault_salt and pending_salt == self._pending_salt:
+            return
+
+        keys = [key for key in (self.get_pending_key(), self.get_stored_key()) if key]
+        cipher_key = self._cipher_key
+        if vault_salt != self._vault_salt:
+            for key in keys:
+                cipher_key = self._unlock(key)
+                if cipher_key is not None:
+                    self._key_tag = self._tag_key(key)
+                    break
+            else:
+                raise ValueError("The vault was rekeyed by another process, unlock it again")
+
+        pending_cipher_key = self._pending_cipher_key
+        if pending_salt is None:
+            pending_cipher_key = None
+        elif pending_salt != self._pending_salt:
+            # A KDF upgrade keeps the key this instance was unlocked with
+            same_key = self._get_meta('rekey.same_key') is not None
+            for key in keys:
+                if same_key and not hmac.compare_digest(self._tag_key(key), self._key_tag):
+                    continue
+                pending_cipher_key = self._unlock_pending(key)
+                if pending_cipher_key is not None:
+                    break
+            else:
+                raise ValueError("The vault is being rekeyed by another process, unlock it again")
+        self._use_cipher_key(cipher_key, pending_cipher_key, pending_salt)
+
+    def _entry_filter(self, service_name: str, username: str) -> tuple:
+        """WHERE clause and parameters matching one entry, by name or by blind index"""
+        if self._metadata_cipher is None:
+            return 'service_name = ? AND username = ?', (service_name, username)
+        return 'lookup = ?', (self._blind_index(service_name, username),)
+
+    def _all_names(self) -> list:
+        with self._pool.read() as conn:
+            rows = conn.execute('SELECT service_name, username FROM passwords').fetchall()
+        return list(self._open_names(rows))
+
+    def encrypt_metadata(self, batch_size: int = BATCH_SIZE) -> int:
+        """Encrypt service names and usernames at rest
+
+        Names are encrypted with a random metadata key, which is stored wrapped
+        by the vault key, so rekey() only has to re-wrap it. Each entry also
+        gets a blind index: an HMAC of its (service_name, username) under a
+        subkey of the metadata key. Exact lookups (get_password(),
+        get_passwords(), store_password(), delete_password()) stay single
+        probes of the unique index on it. Listing and searching decrypt every
+        name instead, and the full-text search index is dropped. The
+        conversion runs in one transaction, is followed by a VACUUM so no
+        plaintext is left in free space, and cannot be undone. Instances
+        unlocked before the conversion pick up the metadata key on their next
+        write, and a trigger rejects rows without a blind index.
+
+        Args:
+            batch_size: Rows converted per statement
+
+        Returns:
+            int: Number of entries converted, 0 if the metadata is already encrypted
+        """
+        if self._metadata_cipher is not None:
+            return 0
+        from cryptography.fernet import Fernet
+
+        metadata_key = Fernet.generate_key()
+        converted = last_id = 0
+        try:
+            with self._pool.write(), self._conn:
+                self._begin_write(self._conn)
+                if self._metadata_cipher is not None:
+                    return 0
+                if self.rekey_in_progress():
+                    raise ValueError("Finish the key rotation in progress first")
+                wrapped = self.cipher_suite.encrypt(metadata_key).decode()
+                self._use_metadata_key(metadata_key)
+                for name in ('passwords_fts_insert', 'passwords_fts_delete', 'passwords_fts_update'):
+                    self._conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+                self._conn.execute(f'DROP TABLE IF EXISTS {self.FTS_TABLE}')
+                while True:
+                    rows = self._conn.execute('''
+                        SELECT id, service_name, username FROM passwords
+                        WHERE id > ? ORDER BY id LIMIT ?
+                    ''', (last_id, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    self._conn.executemany(
+                        'UPDATE passwords SET service_name = ?, username = ?, lookup = ? WHERE id = ?',
+                        [(*self._seal_names(service_name, username), row_id)
+                         for row_id, service_name, username in rows])
+                    last_id = rows[-1][0]
+                    converted += len(rows)
+                # Instances unlocked before the conversion must not add plaintext
+                # names, whatever version of pass-cli they run
+                for name, event in (('passwords_sealed_insert', 'BEFORE INSERT'),
+                                    ('passwords_sealed_update', 'BEFORE UPDATE OF lookup')):
+                    self._conn.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON passwords "
+                        "WHEN new.lookup IS NULL "
+                        f"BEGIN SELECT RAISE(ABORT, '{self.SEALED_ERROR}'); END")
+                self._set_meta('metadata.key', wrapped)
+        except BaseException:
+            self._metadata_key = self._metadata_cipher = None
+            raise
+        with self._pool.write():
+            # Rewrite the file, page splits and freed pages keep stale copies of
+            # the plaintext names, then drop the old pages left in the WAL
+            self._conn.execute('VACUUM')
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        self._search_index = False
+        return converted
+
+    def _recover_finished_rekey(self) -> tuple:
+        """Return the new key and cipher key of a rotation that finished before
+        the keyring was updated"""
+        pending_key = self.get_pending_key()
+        cipher_key = None
+        if not self.rekey_in_progress() and pending_key:
+            cipher_key = self._unlock(pending_key)
+        if cipher_key is None:
+            raise ValueError("Invalid encryption key")
+        self._replace_stored_key(pending_key)
+        return pending_key, cipher_key
+
+    def _replace_stored_key(self, key: str):
+        import keyring
+        from keyring.errors import PasswordDeleteError
+
+        keyring.set_password(self.KEYRING_SERVICE, self.KEYRING_USERNAME, key)
+        try:
+            keyring.delete_password(self.KEYRING_SERVICE, self.KEYRING_PENDING_USERNAME)
+        except PasswordDeleteError:
+            pass
+
+    def rekey_in_progress(self) -> bool:
+        """Whether an interrupted key rotation is waiting to be resumed"""
+        return self._get_meta('rekey.cursor') is not None
+
+    def rekey(self, new_key: str, batch_size: int = BATCH_SIZE, workers: int = 1) -> int:
+        """Re-encrypt every password under a new encryption key
+
+        Rows are re-encrypted in batches and the position of the last
+        committed batch is stored in the database, so an interrupted rotation
+        resumes where it stopped. Until it finishes, reads accept both keys.
+        The new key is derived with the KDF target, so rekeying with the
+        current key upgrades the vault's KDF.
+
+        Args:
+            new_key: The new encryption key
+            batch_size: Number of rows re-encrypted per transaction
+            workers: Encryption worker processes, 0 for one per CPU
+
+        Returns:
+            int: Number of rows re-encrypted by this call
+        """
+        if not self.rekey_in_progress():
+            same_key = hmac.compare_digest(self._tag_key(new_key), self._key_tag)
+            spec = self._new_kdf_spec()
+            key_hash, pending_cipher_key = self._derive_keys(new_key, spec)
+            if self._start_rotation(new_key, same_key, key_hash, spec):
+                self._use_cipher_key(self._cipher_key, pending_cipher_key, spec['salt'])
+                return self._finish_rotation(new_key, batch_size, workers)
+            if not self.rekey_in_progress():
+                # Another process finished a rotation since this vault was unlocked
+                if not same_key:
+                    raise ValueError("The vault was rekeyed by another process, unlock it again")
+                self._reload_vault_key(new_key)
+                return 0
+
+        pending_cipher_key = self._unlock_pending(new_key)
+        if pending_cipher_key is None:
+            raise ValueError("A rotation to a different encryption key is in progress")
+        self._use_cipher_key(self._cipher_key, pending_cipher_key, self._get_meta('rekey.salt'))
+        return self._finish_rotation(new_key, batch_size, workers)
+
+    def _start_rotation(self, new_key: str, same_key: bool, key_hash: str, spec: dict) -> bool:
+        """Record a rotation to new_key, unless another process started or
+        finished one since this vault was unlocked"""
+        with self._pool.write(), self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            if self.rekey_in_progress() or self._get_vault_salt() != self._vault_salt:
+                return False
+            if not same_key:
+                import keyring
+
+                keyring.set_password(self.KEYRING_SERVICE, self.KEYRING_PENDING_USERNAME, new_key)
+            self._set_meta('rekey.key_hash', key_hash)
+            self._set_meta('rekey.salt', spec['salt'])
+            self._set_meta('rekey.kdf', json.dumps(spec))
+            if same_key:
+                self._set_meta('rekey.same_key', 1)
+            self._set_meta('rekey.cursor', 0)
+        return True
+
+    def _reload_vault_key(self, key: str):
+        """Switch to the vault key another process rotated to"""
+        cipher_key = self._unlock(key)
+        if cipher_key is None:
+            raise ValueError("The vault was rekeyed by another process, unlock it again")
+        self._key_cache.clear()
+        self._use_cipher_key(cipher_key)
+        self._load_pending_cipher(key)
+
+    def _finish_rotation(self, new_key: str, batch_size: int = BATCH_SIZE,
+                         workers: int = 1) -> int:
+        """Re-encrypt the remaining rows of the rotation in progress and switch keys"""
+        rotated = 0
+        same_key = hmac.compare_digest(self._tag_key(new_key), self._key_tag)
+        pending_salt = self._get_meta('rekey.salt')
+        with CryptoPool(self._cipher_keys(), workers) as pool:
+            pool.chunk_size = max(1, -(-batch_size // pool.workers))
+            while True:
+                # Other processes may be resuming the same rotation: each batch
+                # reads the cursor and advances it under the database write lock
+                with self._pool.write(), self._conn:
+                    self._conn.execute('BEGIN IMMEDIATE')
+                    cursor = self._get_meta('rekey.cursor')
+                    if cursor is None:
+                        break
+                    rows = self._conn.execute('''
+                        SELECT id, encrypted_password FROM passwords
+                        WHERE id > ? ORDER BY id LIMIT ?
+                    ''', (int(cursor), batch_size)).fetchall()
+                    if not rows:
+                        self._switch_keys()
+                        break
+                    self._conn.executemany(
+                        'UPDATE passwords SET encrypted_password = ? WHERE id = ?',
+                        [(token, row_id) for row_id, token in pool.rotate_many(rows)])
+                    self._set_meta('rekey.cursor', rows[-1][0])
+                rotated += len(rows)
+
+        if not same_key:
+            self._replace_stored_key(new_key)
+            self._key_tag = self._tag_key(new_key)
+        self._key_cache.clear()
+        self._vault_salt = pending_salt
+        self._use_cipher_key(self._pending_cipher_key)
+        return rotated
+
+    def _switch_keys(self):
+        """Make the pending key the vault key, inside the last rotation transaction"""
+        self._conn.execute('UPDATE encryption_keys SET key_hash = ?, salt = ?', (
+            self._get_meta('rekey.key_hash'), self._get_meta('rekey.salt')))
+        self._set_meta('kdf', json.dumps(self._pending_kdf_spec()))
+        self._conn.execute("DELETE FROM vault_meta WHERE key LIKE 'rekey.%'")
+        if self._metadata_key is not None:
+            # Names stay encrypted under the metadata key, only its wrapping changes
+            self._set_meta('metadata.key', build_cipher([self._pending_cipher_key]).encrypt(
+                self._metadata_key).decode())
+        # Fingerprints are keyed with the old cipher key
+        self._conn.execute(f'DELETE FROM {self.AUDIT_TABLE}')
+
+    def clear_key_cache(self):
+        """Drop the cached derived key so the next unlock derives it again"""
+        self._key_cache.clear()
 
     def store_password(self, service_name: str, username: str, password: str):
-        encrypted_password = self.cipher_suite.encrypt(password.encode()).decode()
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO passwords (service_name, username, encrypted_password)
-                VALUES (?, ?, ?)
-            ''', (service_name, username, encrypted_password))
+        """Store a password, replacing any existing one for the same service and username"""
+        self._write_encrypted(service_name, username, password)
+
+    def _encrypt(self, password: str) -> str:
+        with trace.span('fernet.encrypt'):
+            return self.cipher_suite.encrypt(password.encode()).decode()
+
+    def _decrypt(self, encrypted_password: str) -> str:
+        with trace.span('fernet.decrypt'):
+            return self.cipher_suite.decrypt(encrypted_password.encode()).decode()
+
+    def _write_encrypted(self, service_name: str, username: str, password: str,
+                         encrypted: tuple = None):
+        """Upsert an entry, encrypting password once the write transaction has
+        picked up any key rotation
+
+        Args:
+            encrypted: (cipher generation, token) of password encrypted ahead
+                of time, used if the cipher keys have not changed since
+        """
+        def upsert(conn):
+            self._begin_write(conn)
+            if encrypted is not None and encrypted[0] == self._cipher_generation:
+                encrypted_password = encrypted[1]
+            else:
+                encrypted_password = self._encrypt(password)
+            if self._metadata_cipher is None:
+                return conn.execute(UPSERT_PASSWORD_SQL,
+                                    (service_name, username, encrypted_password))
+            return conn.execute(UPSERT_SEALED_SQL,
+                                (*self._seal_names(service_name, username), encrypted_password))
+
+        with trace.span('sqlite.write'):
+            self._pool.run_write(upsert)
+        if self._secret_cache is not None:
+            self._secret_cache.invalidate((service_name, username))
+
+    def store_many(self, records, batch_size: int = BATCH_SIZE, workers: int = 1) -> int:
+        """Store many passwords in a single transaction
+
+        Records are consumed lazily and encrypted in batches, so memory use
+        does not grow with the number of records.
+
+        Args:
+            records: Iterable of (service_name, username, password) tuples
+            batch_size: Number of records encrypted and inserted at a time
+            workers: Encryption worker processes, 0 for one per CPU
+
+        Returns:
+            int: Number of records stored
+        """
+        count = 0
+        with self._pool.write() as conn, conn:
+            self._begin_write(conn)
+            sql = UPSERT_PASSWORD_SQL if self._metadata_cipher is None else UPSERT_SEALED_SQL
+            # Encrypt with the keys picked up by _begin_write()
+            with CryptoPool(self._cipher_keys(), workers, batch_size) as pool:
+                for batch in _batched(pool.encrypt_many(records), batch_size):
+                    if self._metadata_cipher is not None:
+                        batch = [(*self._seal_names(service_name, username), token)
+                                 for service_name, username, token in batch]
+                    conn.executemany(sql, batch)
+                    count += len(batch)
+        if self._secret_cache is not None:
+            self._secret_cache.clear()
+        return count
 
     def get_password(self, service_name: str, username: str) -> str:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT encrypted_password FROM passwords
-                WHERE service_name = ? AND username = ?
-            ''', (service_name, username))
-            
-            result = cursor.fetchone()
-            if result:
-                encrypted_password = result[0]
-                return self.cipher_suite.decrypt(encrypted_password.encode()).decode()
-            return None 
-
-    def list_passwords(self, service_name: str = None):
-        with sqlite3.connect(self.db_path) as conn:
-            if service_name:
-                cursor = conn.execute(
-                    "SELECT service_name, username FROM passwords WHERE service_name = ?", 
-                    (service_name,)
-                )
+        password = self._cached_password(service_name, username)
+        if password is not None:
+            return password
+
+        generation = self._cache_generation()
+        encrypted_password = self._fetch_encrypted(service_name, username)
+        if encrypted_password is None:
+            return None
+        password = self._decrypt(encrypted_password)
+        self._cache_password(service_name, username, password, generation)
+        return password
+
+    def _fetch_encrypted(self, service_name: str, username: str) -> str:
+        clause, params = self._entry_filter(service_name, username)
+        with trace.span('sqlite.read'), self._pool.read() as conn:
+            result = conn.execute(
+                f'SELECT encrypted_password FROM passwords WHERE {clause}', params).fetchone()
+        return result[0] if result else None
+
+    def get_passwords(self, keys) -> list:
+        """Look up many passwords with one query per LOOKUP_BATCH keys
+
+        Args:
+            keys: Iterable of (service_name, username) pairs
+
+        Returns:
+            list: Passwords in the order of keys, None where no entry exists
+        """
+        keys = [(service_name, username) for service_name, username in keys]
+        passwords = [self._cached_password(*key) for key in keys]
+        generation = self._cache_generation()
+        missing = sorted({key for key, password in zip(keys, passwords) if password is None})
+        found = {}
+        for batch in _batched(missing, self.LOOKUP_BATCH):
+            found.update(self._fetch_encrypted_many(batch))
+
+        for index, key in enumerate(keys):
+            if passwords[index] is None and key in found:
+                passwords[index] = self._decrypt(found[key])
+                self._cache_password(*key, passwords[index], generation)
+        return passwords
+
+    def _fetch_encrypted_many(self, keys: list) -> dict:
+        # CROSS JOIN keeps the wanted keys as the outer loop, so each one is an
+        # index lookup; a row-value IN (VALUES ...) would scan the whole table
+        if self._metadata_cipher is not None:
+            lookups = {self._blind_index(*key): key for key in keys}
+            values = ', '.join(['(?)'] * len(lookups))
+            with trace.span('sqlite.read'), self._pool.read() as conn:
+                rows = conn.execute(f'''
+                    WITH wanted (lookup) AS (VALUES {values})
+                    SELECT p.lookup, p.encrypted_password
+                    FROM wanted CROSS JOIN passwords AS p ON p.lookup = wanted.lookup
+                ''', list(lookups)).fetchall()
+            return {lookups[lookup]: encrypted for lookup, encrypted in rows}
+
+        values = ', '.join(['(?, ?)'] * len(keys))
+        with trace.span('sqlite.read'), self._pool.read() as conn:
+            rows = conn.execute(f'''
+                WITH wanted (service_name, username) AS (VALUES {values})
+                SELECT p.service_name, p.username, p.encrypted_password
+                FROM wanted CROSS JOIN passwords AS p
+                    ON p.service_name = wanted.service_name AND p.username = wanted.username
+            ''', [part for key in keys for part in key]).fetchall()
+        return {(service_name, username): encrypted for service_name, username, encrypted in rows}
+
+    def _cached_password(self, service_name: str, username: str) -> str:
+        if self._secret_cache is None:
+            return None
+        return self._secret_cache.get((service_name, username))
+
+    def _cache_generation(self) -> int:
+        # Taken before a lookup, so a concurrent write keeps its result out of the cache
+        return None if self._secret_cache is None else self._secret_cache.generation()
+
+    def _cache_password(self, service_name: str, username: str, password: str,
+                        generation: int = None):
+        if self._secret_cache is not None:
+            self._secret_cache.put((service_name, username), password, generation)
+
+    def list_passwords(self, service_name: str = None, prefix: str = None,
+                       pattern: str = None, limit: int = None, offset: int = 0,
+                       after: tuple = None):
+        """Yield (service_name, username) pairs ordered by service and username
+
+        Filtering and pagination run in SQL on the (service_name, username)
+        index, and rows are fetched lazily, so memory use does not depend on
+        the size of the vault.
+
+        Args:
+            service_name: Only entries for this exact service
+            prefix: Only services starting with this prefix
+            pattern: Only services matching this case-sensitive glob pattern
+            limit: Maximum number of entries
+            offset: Number of entries to skip
+            after: (service_name, username) keyset cursor; only entries
+                sorting after it are returned
+        """
+        if self._metadata_cipher is not None:
+            yield from self._list_sealed(service_name, prefix, pattern, limit, offset, after)
+            return
+
+        clauses, params = [], []
+        if service_name:
+            clauses.append("service_name = ?")
+            params.append(service_name)
+        if prefix:
+            # A half-open range keeps the prefix search on the index, unlike LIKE
+            clauses.append("service_name >= ?")
+            params.append(prefix)
+            end = _prefix_end(prefix)
+            if end is not None:
+                clauses.append("service_name < ?")
+                params.append(end)
+        if pattern:
+            clauses.append("service_name GLOB ?")
+            params.append(pattern)
+        if after:
+            clauses.append("(service_name, username) > (?, ?)")
+            params.extend(after)
+
+        query = "SELECT service_name, username FROM passwords"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY service_name, username LIMIT ? OFFSET ?"
+        params.extend((-1 if limit is None else limit, offset))
+
+        with self._pool.read() as conn:
+            cursor = conn.execute(query, params)
+            cursor.arraysize = self.BATCH_SIZE
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    return
+                yield from rows
+
+    def _list_sealed(self, service_name: str, prefix: str, pattern: str, limit: int,
+                     offset: int, after: tuple) -> list:
+        """list_passwords() of encrypted metadata: decrypt every name, filter and sort"""
+        entries = sorted(
+            entry for entry in self._all_names()
+            if (not service_name or entry[0] == service_name)
+            and (not prefix or entry[0].startswith(prefix))
+            and (not pattern or fnmatch.fnmatchcase(entry[0], pattern))
+            and (not after or entry > tuple(after)))
+        return entries[offset:None if limit is None else offset + limit]
+
+    def search(self, query: str, limit: int = 20):
+        """Yield (service_name, username) pairs matching every term of query
+
+        Terms match case-insensitively anywhere in the service name or
+        username. Results come from the trigram index ranked by BM25, with
+        service name matches weighted higher. Queries with terms shorter than
+        three characters, which trigrams cannot match, and vaults without the
+        index use a LIKE scan ordered by service and username instead. With
+        encrypted metadata every name is decrypted and matched in Python.
+
+        Args:
+            query: Whitespace-separated search terms
+            limit: Maximum number of results
+        """
+        terms = query.split()
+        if not terms:
+            return
+
+        if self._metadata_cipher is not None:
+            terms = [term.lower() for term in terms]
+            yield from sorted(
+                (service_name, username) for service_name, username in self._all_names()
+                if all(term in service_name.lower() or term in username.lower() for term in terms)
+            )[:limit]
+            return
+
+        if self._search_index and min(map(len, terms)) >= self.FTS_MIN_TERM:
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            query = f'''
+                SELECT service_name, username FROM {self.FTS_TABLE}
+                WHERE {self.FTS_TABLE} MATCH ?
+                ORDER BY bm25({self.FTS_TABLE}, 2.0, 1.0), service_name, username
+                LIMIT ?
+            '''
+            params = (match, limit)
+        else:
+            clauses, params = [], []
+            for term in terms:
+                pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                clauses.append("(service_name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\')")
+                params.extend((pattern, pattern))
+            query = ("SELECT service_name, username FROM passwords WHERE "
+                     + " AND ".join(clauses) + " ORDER BY service_name, username LIMIT ?")
+            params.append(limit)
+        with self._pool.read() as conn:
+            yield from conn.execute(query, params)
+
+    def iter_all(self, workers: int = 1):
+        """Yield every stored (service_name, username, password), decrypting lazily
+
+        Entries come ordered by service and username, or in storage order
+        when the metadata is encrypted.
+
+        Args:
+            workers: Decryption worker processes, 0 for one per CPU
+        """
+        order = 'service_name, username' if self._metadata_cipher is None else 'id'
+        with self._pool.read() as conn, CryptoPool(self._cipher_keys(), workers) as pool:
+            cursor = conn.execute(f'''
+                SELECT service_name, username, encrypted_password FROM passwords
+                ORDER BY {order}
+            ''')
+            yield from self._open_names(pool.decrypt_many(cursor))
+
+    def audit(self, min_entropy: float = 60.0, max_age_days: int = 365, use_cache: bool = True,
+              workers: int = 1, batch_size: int = BATCH_SIZE, breach_index=None) -> dict:
+        """Find reused, weak, old and breached passwords
+
+        Each password is decrypted once and reduced to an HMAC fingerprint
+        (keyed with a subkey of the vault key, so it cannot be brute-forced
+        without it) and a strength score. Reuse is then a GROUP BY over the
+        fingerprints. With use_cache the scores persist in the vault and later
+        audits only decrypt passwords stored since; otherwise they are kept in
+        a temporary table for this audit only.
+
+        Args:
+            min_entropy: Passwords with fewer estimated bits are weak
+            max_age_days: Passwords unchanged for longer are old, None to skip
+            use_cache: Reuse and update the persistent audit cache
+            workers: Decryption worker processes, 0 for one per CPU
+            batch_size: Rows decrypted and scored per transaction
+            breach_index: BreachIndex to look the passwords up in, if any
+
+        Returns:
+            dict: total, processed (rows scored by this audit), reused (lists
+            of (service_name, username) sharing a password), weak
+            ((service_name, username, bits, classes) tuples), old
+            ((service_name, username, days) tuples) and breached
+            ((service_name, username) tuples)
+        """
+        table = self.AUDIT_TABLE if use_cache else 'audit_scratch'
+        with self._pool.write(), self._conn:
+            if use_cache:
+                # Cached breach results are only valid for the index they came from
+                index_id = breach_index.build_id if breach_index is not None else ''
+                if self._get_meta('audit.breach_index') != index_id:
+                    self._conn.execute(f'DELETE FROM {table}')
+                    self._set_meta('audit.breach_index', index_id)
             else:
-                cursor = conn.execute("SELECT service_name, username FROM passwords")
+                self._create_audit_table(table, temporary=True)
+        try:
+            with trace.span('audit.score'):
+                processed = self._score_passwords(table, workers, batch_size, breach_index)
+            # On the writer connection, the only one that sees a temporary table
+            with trace.span('audit.report'), self._pool.write():
+                return {
+                    'total': self._conn.execute('SELECT COUNT(*) FROM passwords').fetchone()[0],
+                    'processed': processed,
+                    'reused': self._reused_passwords(table),
+                    # Sorted after decrypting, encrypted names do not sort in SQL
+                    'weak': sorted(
+                        ((service_name, username, bits, audit.class_names(classes))
+                         for service_name, username, bits, classes in self._open_names(
+                             self._conn.execute(f'''
+                                 SELECT p.service_name, p.username, a.entropy, a.classes
+                                 FROM {table} AS a JOIN passwords AS p ON p.id = a.id
+                                 WHERE a.entropy < ?
+                             ''', (min_entropy,)))),
+                        key=lambda row: (row[2], row[0], row[1])),
+                    'old': [] if max_age_days is None else sorted(self._open_names(
+                        self._conn.execute('''
+                            SELECT service_name, username, age FROM (
+                                SELECT service_name, username, CAST(julianday('now') -
+                                    julianday(COALESCE(updated_at, created_at)) AS INTEGER) AS age
+                                FROM passwords
+                            ) WHERE age > ?
+                        ''', (max_age_days,))), key=lambda row: (-row[2], row[0], row[1])),
+                    'breached': sorted(self._open_names(self._conn.execute(f'''
+                        SELECT p.service_name, p.username
+                        FROM {table} AS a JOIN passwords AS p ON p.id = a.id
+                        WHERE a.breached
+                    '''))),
+                }
+        finally:
+            if not use_cache:
+                with self._pool.write(), self._conn:
+                    self._conn.execute(f'DROP TABLE temp.{table}')
+
+    def _score_passwords(self, table: str, workers: int, batch_size: int,
+                         breach_index=None) -> int:
+        """Fingerprint and score the rows missing from table, a batch at a time"""
+        fingerprint_key = kdf.expand(base64.urlsafe_b64decode(self._cipher_key),
+                                     b'pass-cli audit fingerprint')
+        processed = last_id = 0
+        with CryptoPool(self._cipher_keys(), workers) as pool:
+            while True:
+                with self._pool.write(), self._conn:
+                    rows = self._conn.execute(f'''
+                        SELECT p.id, p.encrypted_password FROM passwords AS p
+                        LEFT JOIN {table} AS a ON a.id = p.id
+                        WHERE p.id > ? AND a.id IS NULL ORDER BY p.id LIMIT ?
+                    ''', (last_id, batch_size)).fetchall()
+                    if not rows:
+                        return processed
+                    scores = []
+                    for row_id, password in pool.decrypt_many(rows):
+                        classes = audit.char_classes(password)
+                        fingerprint = hmac.new(fingerprint_key, password.encode(),
+                                               hashlib.sha256).digest()
+                        breached = None if breach_index is None else password in breach_index
+                        scores.append((row_id, fingerprint, audit.entropy_bits(password, classes),
+                                       classes, breached))
+                    self._conn.executemany(
+                        f'INSERT INTO {table} (id, fingerprint, entropy, classes, breached) '
+                        'VALUES (?, ?, ?, ?, ?)', scores)
+                last_id = rows[-1][0]
+                processed += len(rows)
 
-            result = cursor.fetchall()
-            if result:
-                return result
-            return []
+    def _reused_passwords(self, table: str) -> list:
+        rows = self._conn.execute(f'''
+            SELECT p.service_name, p.username, a.fingerprint
+            FROM {table} AS a JOIN passwords AS p ON p.id = a.id
+            WHERE a.fingerprint IN (
+                SELECT fingerprint FROM {table} GROUP BY fingerprint HAVING COUNT(*) > 1
+            )
+            ORDER BY a.fingerprint
+        ''')
+        return [sorted((service_name, username) for service_name, username, _ in group)
+                for _, group in itertools.groupby(self._open_names(rows), key=lambda row: row[2])]
 
     def delete_password(self, service_name: str, username: str) -> bool:
         """Delete a password from the database
@@ -144,15 +1196,54 @@ class PasswordManager:
         Returns:
             bool: True if password was deleted, False if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM passwords 
-                WHERE service_name = ? AND username = ?
-            ''', (service_name, username))
-            return cursor.rowcount > 0
+        def delete(conn):
+            self._begin_write(conn)
+            clause, params = self._entry_filter(service_name, username)
+            return conn.execute(f'DELETE FROM passwords WHERE {clause}', params)
+
+        with trace.span('sqlite.write'):
+            cursor = self._pool.run_write(delete)
+        if self._secret_cache is not None:
+            self._secret_cache.invalidate((service_name, username))
+        return cursor.rowcount > 0
+
+    def pool_stats(self) -> dict:
+        """Lock contention counters of the connection pool"""
+        return self._pool.stats()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the decrypted password cache, None when disabled"""
+        if self._secret_cache is None:
+            return None
+        return self._secret_cache.stats()
+
+    @classmethod
+    def is_initialized(cls, db_path: str = None) -> bool:
+        """Check for an encryption key through a read-only connection"""
+        path = db_path or cls.DEFAULT_DB_PATH
+        if not os.path.exists(path):
+            return False
+        try:
+            conn = sqlite3.connect(f'file:{pathname2url(path)}?mode=ro', uri=True)
+            try:
+                return conn.execute('SELECT EXISTS (SELECT 1 FROM encryption_keys)').fetchone()[0] == 1
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
 
     @classmethod
     def get_stored_key(cls) -> str:
         """Get encryption key from keyring"""
-        return keyring.get_password(cls.KEYRING_SERVICE, cls.KEYRING_USERNAME) 
\ No newline at end of file
+        with trace.span('keyring.get'):
+            import keyring
+
+            return keyring.get_password(cls.KEYRING_SERVICE, cls.KEYRING_USERNAME)
+
+    @classmethod
+    def get_pending_key(cls) -> str:
+        """Get the key an unfinished rotation is moving to from keyring"""
+        with trace.span('keyring.get'):
+            import keyring
+
+            return keyring.get_password(cls.KEYRING_SERVICE, cls.KEYRING_PENDING_USERNAME) 
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""Streaming readers and writers for password import/export and listing output"""
+
+import csv
+import json
+import os
+
+FORMATS = ('csv', 'json', 'jsonl')
+FIELDS = ('service', 'username', 'password')
+# Lower-case column names used by other password managers' exports, most
+# specific first (1Password, Bitwarden, KeePass, LastPass, browsers)
+FIELD_ALIASES = {
+    'service': ('service', 'service_name', 'name', 'title', 'url', 'login_uri'),
+    'username': ('username', 'user', 'login', 'login_username', 'email'),
+    'password': ('password', 'login_password'),
+}
+CHUNK_SIZE = 64 * 1024
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    """Guess the file format from its extension"""
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    return extension if extension in FORMATS else default
+
+
+def _to_record(entry: dict, position: int) -> tuple:
+    if not isinstance(entry, dict):
+        raise ValueError(f"Entry {position}: expected an object")
+    # Headers differ in case and padding between exporters ("Title", " URL")
+    entry = {key.strip().lower(): value for key, value in entry.items() if key is not None}
+    record = []
+    for field in FIELDS:
+        value = next((entry[alias] for alias in FIELD_ALIASES[field]
+                      if entry.get(alias) not in (None, '')), None)
+        if value is None:
+            raise ValueError(f"Entry {position}: missing '{field}'")
+        record.append(str(value))
+    return tuple(record)
+
+
+def _iter_json_array(stream):
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    def skip_whitespace(pos):
+        nonlocal buffer, eof
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return pos
+            buffer = ''
+            pos = 0
+            chunk = stream.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+
+    pos = skip_whitespace(0)
+    if buffer[pos:pos + 1] != '[':
+        raise ValueError("Expected a JSON array")
+    pos = skip_whitespace(pos + 1)
+    if buffer[pos:pos + 1] == ']':
+        return
+
+    while True:
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = stream.read(CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+        yield item
+
+        pos = skip_whitespace(end)
+        separator = buffer[pos:pos + 1]
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError("Malformed JSON array")
+        buffer = buffer[pos + 1:]
+        pos = skip_whitespace(0)
+
+
+def read_records(stream, fmt: str):
+    """Yield (service, username, password) tuples from an export file
+
+    Args:
+        stream: Text stream to read from
+        fmt: One of FORMATS
+    """
+    if fmt == 'csv':
+        entries = csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        entries = (json.loads(line) for line in stream if line.strip())
+    elif fmt == 'json':
+        entries = _iter_json_array(stream)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    for position, entry in enumerate(entries, start=1):
+        yield _to_record(entry, position)
+
+
+class BufferedWriter:
+    """File-like object that hands its output to a callback in large batches
+
+    Writing many short lines through click.echo is slow; this collects them
+    and flushes once the buffer holds about CHUNK_SIZE characters.
+    """
+
+    def __init__(self, flush_callback, size: int = CHUNK_SIZE):
+        self._flush_callback = flush_callback
+        self._size = size
+        self._parts = []
+        self._length = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._length += len(text)
+        if self._length >= self._size:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._parts:
+            self._flush_callback(''.join(self._parts))
+            self._parts = []
+            self._length = 0
+
+
+def write_records(stream, fmt: str, records, fields: tuple = FIELDS) -> int:
+    """Write record tuples to a stream
+
+    Args:
+        stream: Text stream to write to
+        fmt: One of FORMATS, or 'tsv' (tab-separated, no header, with tabs,
+            newlines and backslashes escaped)
+        records: Iterable of tuples matching fields
+        fields: Field names, (service, username, password) by default
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    elif fmt == 'tsv':
+        for record in records:
+            stream.write('\t'.join(str(value).translate(TSV_ESCAPES) for value in record) + '\n')
+            count += 1
+    elif fmt == 'jsonl':
+        for record in records:
+            stream.write(json.dumps(dict(zip(fields, record))) + '\n')
+            count += 1
+    elif fmt == 'json':
+        stream.write('[')
+        for record in records:
+            stream.write(',\n' if count else '\n')
+            stream.write(json.dumps(dict(zip(fields, record))))
+            count += 1
+        stream.write('\n]\n')
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return count
@@ -0,0 +1,169 @@
+"""Fast random password and passphrase generation
+
+Random bytes are drawn from os.urandom in bulk and mapped onto the alphabet
+with one bytes.translate() call: each byte below the largest multiple of the
+alphabet size selects alphabet[byte % size], the remaining bytes are dropped
+(rejection sampling), so every character is uniformly distributed without
+modulo bias. Passwords missing a required character class are rejected as a
+whole, which keeps the result uniform over all passwords that satisfy the
+policy.
+
+Passphrases are drawn uniformly from a bundled wordlist (see wordlist.py),
+which is only loaded when the first passphrase is generated.
+"""
+
+import itertools
+import math
+import os
+import secrets
+import string
+
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+CHARACTER_CLASSES = {
+    'lower': string.ascii_lowercase,
+    'upper': string.ascii_uppercase,
+    'digits': string.digits,
+    'symbols': SYMBOLS,
+}
+DEFAULT_CLASSES = tuple(CHARACTER_CLASSES)
+# Passwords drawn per os.urandom call
+BATCH_SIZE = 256
+CAPITALIZE = ('none', 'first', 'all', 'random')
+
+
+class PasswordGenerator:
+    """Generates passwords of a fixed length from a character-class policy
+
+    Args:
+        length: Password length
+        classes: Names from CHARACTER_CLASSES to draw characters from
+        exclude: Characters never to use, e.g. look-alikes such as "0O1lI"
+        require_each: Every password contains at least one character of
+            each class
+
+    Raises:
+        ValueError: For unknown or (after exclusions) empty classes, or a
+            length too short to satisfy the policy
+    """
+
+    def __init__(self, length: int = 16, classes=DEFAULT_CLASSES, exclude: str = '',
+                 require_each: bool = True):
+        unknown = [name for name in classes if name not in CHARACTER_CLASSES]
+        if unknown or not classes:
+            raise ValueError(f"Unknown character classes: {', '.join(unknown) or '(none)'}, "
+                             f"expected any of {', '.join(CHARACTER_CLASSES)}")
+        sets = []
+        for name in dict.fromkeys(classes):
+            chars = bytes(c for c in CHARACTER_CLASSES[name].encode() if chr(c) not in exclude)
+            if not chars:
+                raise ValueError(f"All {name} characters are excluded")
+            sets.append(chars)
+        if length < 1 or (require_each and length < len(sets)):
+            raise ValueError(f"Length must be at least {len(sets) if require_each else 1}")
+
+        self.length = length
+        self.alphabet = b''.join(sets)
+        size = len(self.alphabet)
+        self._table = bytes(self.alphabet[byte % size] for byte in range(256))
+        self._rejected = bytes(range(256 - 256 % size, 256))
+        self._required = sets if require_each else []
+
+    @property
+    def entropy_bits(self) -> float:
+        """Entropy of one password, ignoring the small loss from require_each"""
+        return self.length * math.log2(len(self.alphabet))
+
+    def _random_chars(self, count: int) -> bytes:
+        chars = b''
+        while len(chars) < count:
+            # About count * 256 / limit bytes are needed, draw a little extra
+            chars += os.urandom(count + count // 4 + 16).translate(self._table, self._rejected)
+        return chars[:count]
+
+    def _meets_policy(self, password: bytes) -> bool:
+        return all(len(password.translate(None, chars)) < self.length
+                   for chars in self._required)
+
+    def __iter__(self):
+        """Endless stream of passwords"""
+        length = self.length
+        while True:
+            block = self._random_chars(BATCH_SIZE * length)
+            for start in range(0, len(block), length):
+                password = block[start:start + length]
+                if self._meets_policy(password):
+                    yield password.decode('ascii')
+
+    def generate(self) -> str:
+        while True:
+            password = self._random_chars(self.length)
+            if self._meets_policy(password):
+                return password.decode('ascii')
+
+    def generate_many(self, count: int):
+        """Yield count passwords"""
+        return itertools.islice(self, count)
+
+
+class PassphraseGenerator:
+    """Generates passphrases of words drawn uniformly from a wordlist
+
+    Args:
+        words: Number of words
+        separator: String put between words
+        capitalize: 'none', 'first' (first word), 'all' (every word) or
+            'random' (each word with probability 1/2, one extra bit per word)
+        wordlist: Name of a bundled wordlist
+
+    Raises:
+        ValueError: For an unknown capitalization rule or fewer than one word
+    """
+
+    def __init__(self, words: int = 6, separator: str = '-', capitalize: str = 'none',
+                 wordlist: str = None):
+        if capitalize not in CAPITALIZE:
+            raise ValueError(f"Unknown capitalization rule: {capitalize}, "
+                             f"expected any of {', '.join(CAPITALIZE)}")
+        if words < 1:
+            raise ValueError("A passphrase needs at least one word")
+        self.words = words
+        self.separator = separator
+        self.capitalize = capitalize
+        self.wordlist_name = wordlist
+
+    @classmethod
+    def for_entropy(cls, bits: float, **kwargs) -> 'PassphraseGenerator':
+        """The shortest passphrase with at least the given entropy"""
+        probe = cls(1, **kwargs)
+        return cls(max(1, math.ceil(bits / probe.entropy_bits)), **kwargs)
+
+    @property
+    def wordlist(self):
+        from . import wordlist
+
+        return wordlist.load(self.wordlist_name or wordlist.DEFAULT_WORDLIST)
+
+    @property
+    def entropy_bits(self) -> float:
+        per_word = math.log2(len(self.wordlist)) + (self.capitalize == 'random')
+        return self.words * per_word
+
+    def _word(self, position: int, wordlist) -> str:
+        word = wordlist[secrets.randbelow(len(wordlist))]
+        if (self.capitalize == 'all' or (self.capitalize == 'first' and position == 0)
+                or (self.capitalize == 'random' and secrets.randbits(1))):
+            return word.capitalize()
+        return word
+
+    def __iter__(self):
+        """Endless stream of passphrases"""
+        while True:
+            yield self.generate()
+
+    def generate(self) -> str:
+        wordlist = self.wordlist
+        return self.separator.join(self._word(n, wordlist) for n in range(self.words))
+
+    def generate_many(self, count: int):
+        """Yield count passphrases"""
+        return itertools.islice(self, count)
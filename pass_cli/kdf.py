@@ -0,0 +1,153 @@
+"""Password-based key derivation with per-vault algorithm, parameters and salt
+
+A KDF spec is a JSON-serializable dict stored in the vault:
+
+    {"algorithm": "argon2id", "params": {...}, "salt": "<base64>", "split": "hkdf-sha256"}
+
+With "split" the derived master key is expanded with HKDF into a verifier
+and the Fernet key, so a single KDF pass both checks and unlocks a vault.
+Vaults created before specs were recorded use LEGACY_SPEC.
+"""
+
+import base64
+import os
+import time
+
+ALGORITHMS = ('argon2id', 'scrypt', 'pbkdf2')
+SPLIT = 'hkdf-sha256'
+KDF_ENV = 'PASS_CLI_KDF'
+
+DEFAULT_PARAMS = {
+    'argon2id': {'iterations': 3, 'lanes': 4, 'memory_cost': 64 * 1024},
+    'scrypt': {'n': 2 ** 15, 'r': 8, 'p': 1},
+    'pbkdf2': {'iterations': 600000},
+}
+# Cheapest parameters accepted by the algorithms, used by the test suite
+TEST_PARAMS = {
+    'argon2id': {'iterations': 1, 'lanes': 1, 'memory_cost': 8},
+    'scrypt': {'n': 2 ** 4, 'r': 8, 'p': 1},
+    'pbkdf2': {'iterations': 100},
+}
+
+LEGACY_SPEC = {
+    'algorithm': 'pbkdf2',
+    'params': {'iterations': 100000},
+    'salt': base64.b64encode(b'encryption-salt').decode(),
+}
+
+
+def available_algorithms() -> list:
+    """Algorithms supported by the installed cryptography package"""
+    try:
+        from cryptography.hazmat.primitives.kdf.argon2 import Argon2id  # noqa: F401
+    except ImportError:
+        return [algorithm for algorithm in ALGORITHMS if algorithm != 'argon2id']
+    return list(ALGORITHMS)
+
+
+def default_algorithm() -> str:
+    """Algorithm for new vaults: PASS_CLI_KDF, else the strongest available"""
+    algorithm = os.getenv(KDF_ENV) or available_algorithms()[0]
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown KDF: {algorithm}")
+    return algorithm
+
+
+def default_params(algorithm: str) -> dict:
+    params = TEST_PARAMS if os.getenv('TESTING') == 'true' else DEFAULT_PARAMS
+    return dict(params[algorithm])
+
+
+def new_spec(algorithm: str = None, params: dict = None) -> dict:
+    """Return a spec with a fresh random salt"""
+    algorithm = algorithm or default_algorithm()
+    return {
+        'algorithm': algorithm,
+        'params': dict(params) if params else default_params(algorithm),
+        'salt': base64.b64encode(os.urandom(16)).decode(),
+        'split': SPLIT,
+    }
+
+
+def same_strength(spec: dict, other: dict) -> bool:
+    """Whether two specs derive keys the same way (salts aside)"""
+    return (spec['algorithm'] == other['algorithm'] and spec['params'] == other['params']
+            and spec.get('split') == other.get('split'))
+
+
+def derive(secret: bytes, spec: dict, length: int = 32) -> bytes:
+    """Derive `length` bytes from secret as described by spec"""
+    algorithm, params = spec['algorithm'], spec['params']
+    salt = base64.b64decode(spec['salt'])
+    if algorithm == 'argon2id':
+        from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+
+        kdf = Argon2id(salt=salt, length=length, iterations=params['iterations'],
+                       lanes=params['lanes'], memory_cost=params['memory_cost'])
+    elif algorithm == 'scrypt':
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+        kdf = Scrypt(salt=salt, length=length, n=params['n'], r=params['r'], p=params['p'])
+    elif algorithm == 'pbkdf2':
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=length, salt=salt,
+                         iterations=params['iterations'])
+    else:
+        raise ValueError(f"Unknown KDF: {algorithm}")
+    return kdf.derive(secret)
+
+
+def expand(key: bytes, info: bytes, length: int = 32) -> bytes:
+    """HKDF-Expand key into a subkey bound to info"""
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+
+    return HKDFExpand(algorithm=hashes.SHA256(), length=length, info=info).derive(key)
+
+
+def split(master: bytes) -> tuple:
+    """Expand a derived master key into independent (verifier, cipher key) halves"""
+    return expand(master, b'pass-cli verifier'), expand(master, b'pass-cli fernet key')
+
+
+def time_derivation(algorithm: str, params: dict, repeat: int = 3) -> float:
+    """Fastest of `repeat` derivations, in seconds"""
+    spec = new_spec(algorithm, params)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        derive(b'kdf-calibration', spec)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def calibrate(algorithm: str, target: float, max_memory: int = 256 * 1024) -> tuple:
+    """Find parameters whose derivation takes about `target` seconds here
+
+    PBKDF2 iterations are scaled linearly. scrypt's cost (n) and Argon2id's
+    memory (up to max_memory KiB) are doubled while they stay under the
+    target, then Argon2id passes are added to use the remaining time.
+
+    Returns:
+        tuple: (params, measured seconds)
+    """
+    if algorithm == 'pbkdf2':
+        probe = {'iterations': 20000}
+        elapsed = time_derivation(algorithm, probe)
+        params = {'iterations': max(1000, int(probe['iterations'] * target / elapsed))}
+    elif algorithm == 'scrypt':
+        params = {'n': 2 ** 12, 'r': 8, 'p': 1}
+        while time_derivation(algorithm, dict(params, n=params['n'] * 2), repeat=1) <= target:
+            params['n'] *= 2
+    elif algorithm == 'argon2id':
+        params = {'iterations': 1, 'lanes': 4, 'memory_cost': 8 * 1024}
+        while params['memory_cost'] * 2 <= max_memory and time_derivation(
+                algorithm, dict(params, memory_cost=params['memory_cost'] * 2), repeat=1) <= target:
+            params['memory_cost'] *= 2
+        elapsed = time_derivation(algorithm, params)
+        params['iterations'] = max(1, int(target / elapsed))
+    else:
+        raise ValueError(f"Unknown KDF: {algorithm}")
+    return params, time_derivation(algorithm, params)
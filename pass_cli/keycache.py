@@ -0,0 +1,78 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from .utils import is_private_file, session_id
+
+
+class DerivedKeyCache:
+    """Session-scoped, time-limited cache of the derived cipher key
+
+    The entry lives in a 0600 file next to the database. It is bound to the
+    login session, the vault salt and the encryption key through an HMAC tag,
+    so it is ignored after re-initialization or when a different key is used.
+    """
+
+    FILENAME = '.keycache'
+
+    def __init__(self, db_path: str, ttl: int):
+        self.path = os.path.join(os.path.dirname(db_path), self.FILENAME)
+        self.ttl = ttl
+
+    def _tag(self, cipher_key: bytes, encryption_key: str, vault_salt: str) -> str:
+        message = f"{session_id()}:{vault_salt}:{encryption_key}".encode()
+        return hmac.new(cipher_key, message, hashlib.sha256).hexdigest()
+
+    def load(self, encryption_key: str, vault_salt: str) -> bytes:
+        """Return the cached cipher key, or None if missing, expired or not ours"""
+        if self.ttl <= 0:
+            return None
+        try:
+            if not is_private_file(self.path):
+                return None
+            with open(self.path) as f:
+                entry = json.load(f)
+            expires_at = float(entry['expires_at'])
+            cipher_key = base64.b64decode(entry['key'])
+            tag = entry['tag']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        now = time.time()
+        if not now < expires_at <= now + self.ttl:
+            self.clear()
+            return None
+        if not hmac.compare_digest(tag, self._tag(cipher_key, encryption_key, vault_salt)):
+            return None
+        return cipher_key
+
+    def save(self, cipher_key: bytes, encryption_key: str, vault_salt: str):
+        """Store the cipher key until the TTL expires"""
+        if self.ttl <= 0:
+            return
+        entry = {
+            'expires_at': time.time() + self.ttl,
+            'key': base64.b64encode(cipher_key).decode(),
+            'tag': self._tag(cipher_key, encryption_key, vault_salt),
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove the cached key"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,131 @@
+"""Process pool for bulk Fernet encryption and decryption
+
+Rows are dispatched to the workers in chunks to keep IPC overhead low, and
+only a bounded number of chunks is in flight, so memory use does not grow
+with the number of rows. Results are yielded in input order.
+"""
+
+import itertools
+import os
+from collections import deque
+
+WORKERS_ENV = 'PASS_CLI_WORKERS'
+DEFAULT_CHUNK_SIZE = 1000
+
+_worker_cipher = None
+
+
+def default_workers() -> int:
+    """Worker count from PASS_CLI_WORKERS, 1 (no pool) when unset"""
+    return int(os.getenv(WORKERS_ENV, '1'))
+
+
+def build_cipher(keys: list):
+    """Fernet for a single key, MultiFernet (encrypting with the first key) otherwise"""
+    from cryptography.fernet import Fernet, MultiFernet
+
+    if len(keys) == 1:
+        return Fernet(keys[0])
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def _init_worker(keys: list):
+    global _worker_cipher
+    _worker_cipher = build_cipher(keys)
+
+
+def _run_in_worker(fn, values: list) -> list:
+    return fn(_worker_cipher, values)
+
+
+def _encrypt_chunk(cipher, values: list) -> list:
+    return [cipher.encrypt(value.encode()).decode() for value in values]
+
+
+def _decrypt_chunk(cipher, tokens: list) -> list:
+    return [cipher.decrypt(token.encode()).decode() for token in tokens]
+
+
+def _rotate_chunk(cipher, tokens: list) -> list:
+    return [cipher.rotate(token.encode()).decode() for token in tokens]
+
+
+class CryptoPool:
+    """Runs Fernet operations on the last field of each row across processes
+
+    Args:
+        keys: URL-safe base64 Fernet keys, the first one is used to encrypt
+        workers: Number of worker processes, 0 for one per CPU. With a
+            single worker everything runs in the calling process.
+        chunk_size: Number of rows sent to a worker at a time
+    """
+
+    def __init__(self, keys: list, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.keys = keys
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.keys,))
+        return self._executor
+
+    def encrypt_many(self, rows):
+        """Yield rows with their last field (plaintext) encrypted"""
+        return self._map(_encrypt_chunk, rows)
+
+    def decrypt_many(self, rows):
+        """Yield rows with their last field (Fernet token) decrypted"""
+        return self._map(_decrypt_chunk, rows)
+
+    def rotate_many(self, rows):
+        """Yield rows with their last field re-encrypted under the first key"""
+        return self._map(_rotate_chunk, rows)
+
+    def _map(self, fn, rows):
+        iterator = iter(rows)
+        if self.workers == 1:
+            cipher = build_cipher(self.keys)
+            while True:
+                chunk = list(itertools.islice(iterator, self.chunk_size))
+                if not chunk:
+                    return
+                yield from self._merge(chunk, fn(cipher, [row[-1] for row in chunk]))
+
+        executor = self._get_executor()
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < self.workers * 2:
+                    chunk = list(itertools.islice(iterator, self.chunk_size))
+                    if not chunk:
+                        break
+                    future = executor.submit(_run_in_worker, fn, [row[-1] for row in chunk])
+                    pending.append((chunk, future))
+                if not pending:
+                    return
+                chunk, future = pending.popleft()
+                yield from self._merge(chunk, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _merge(chunk: list, values: list):
+        for row, value in zip(chunk, values):
+            yield (*row[:-1], value)
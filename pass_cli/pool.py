@@ -0,0 +1,131 @@
+"""SQLite connections for sharing a PasswordManager between threads
+
+A sqlite3 connection must not be used by two threads at once. Under WAL
+readers never block the writer or each other, so the pool hands every reading
+thread a connection of its own while writes are serialized on a single writer
+connection. Writes that still find the database busy after the busy timeout,
+e.g. because another process holds the write lock, are retried with
+exponential backoff.
+"""
+
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+def is_busy_error(error: Exception) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors worth retrying"""
+    message = str(error)
+    return isinstance(error, sqlite3.OperationalError) and (
+        'database is locked' in message or 'database is busy' in message
+        or 'database table is locked' in message)
+
+
+class ConnectionPool:
+    """One writer connection plus up to `readers` reader connections
+
+    With readers=0 every statement runs on the writer connection, which is
+    only safe from one thread at a time (the single-threaded default).
+
+    Args:
+        connect: Callable returning a new, configured connection
+        readers: Maximum number of reader connections, opened on demand
+        retries: Extra attempts for a write that fails with SQLITE_BUSY
+        backoff: Delay before the first retry in seconds, doubled each attempt
+    """
+
+    def __init__(self, connect, readers: int = 0, retries: int = 5, backoff: float = 0.01):
+        self._connect = connect
+        self.readers = readers
+        self.retries = retries
+        self.backoff = backoff
+        self.writer_conn = connect()
+        self._write_lock = threading.RLock()
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._reader_conns = []
+        self._open_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'busy_retries': 0, 'reader_waits': 0, 'writer_waits': 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        """Contention counters and the number of open reader connections"""
+        with self._stats_lock:
+            return dict(self._stats, readers_open=self._opened)
+
+    @contextmanager
+    def read(self):
+        """Check out a connection for reading"""
+        if not self.readers:
+            yield self.writer_conn
+            return
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if self._opened < self.readers:
+                self._opened += 1
+                conn = self._connect()
+                conn.execute('PRAGMA query_only = ON')
+                self._reader_conns.append(conn)
+                return conn
+        self._count('reader_waits')
+        return self._idle.get()
+
+    @contextmanager
+    def write(self):
+        """Hold the writer connection exclusively"""
+        if not self._write_lock.acquire(blocking=False):
+            self._count('writer_waits')
+            self._write_lock.acquire()
+        try:
+            yield self.writer_conn
+        finally:
+            self._write_lock.release()
+
+    def run_write(self, fn):
+        """Run fn(conn) in a write transaction, retrying while the database is busy
+
+        Returns:
+            The return value of fn
+        """
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                with self.write() as conn, conn:
+                    return fn(conn)
+            except sqlite3.OperationalError as e:
+                if attempt == self.retries or not is_busy_error(e):
+                    raise
+            self._count('busy_retries')
+            time.sleep(delay * (1 + random.random()))
+            delay *= 2
+
+    def close(self):
+        """Close the writer and every reader connection, idle or checked out"""
+        with self._open_lock:
+            readers, self._reader_conns = self._reader_conns, []
+        for conn in readers:
+            conn.close()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        self.writer_conn.close()
@@ -0,0 +1,149 @@
+"""Opt-in timing instrumentation
+
+Phases are wrapped in named spans:
+
+    with trace.span('kdf.derive'):
+        ...
+
+While tracing is off span() returns one shared no-op context manager, so
+instrumented code pays a single function call. `pass-cli --profile` prints
+a per-phase breakdown to stderr, and PASS_CLI_TRACE writes to a file:
+
+    PASS_CLI_TRACE=json:/tmp/pass-cli.jsonl   one JSON record per span
+    PASS_CLI_TRACE=cprofile:/tmp/pass-cli.prof cProfile stats for pstats/snakeviz
+
+A value without a prefix is treated as json:PATH.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'PASS_CLI_TRACE'
+TRACE_MODES = ('json', 'cprofile')
+
+_NULL_SPAN = contextlib.nullcontext()
+_tracer = None
+
+
+class Tracer:
+    """Collects (name, start, duration, depth) records of finished spans"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = []
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._local.depth = depth
+            self.records.append({
+                'name': name,
+                'start_ms': (start - self.started) * 1000,
+                'duration_ms': (end - start) * 1000,
+                'depth': depth,
+            })
+
+    def summary(self) -> list:
+        """Per-name (name, depth, count, total ms), in order of first start"""
+        phases = {}
+        for record in sorted(self.records, key=lambda r: r['start_ms']):
+            phase = phases.setdefault(record['name'], [record['depth'], 0, 0.0])
+            phase[1] += 1
+            phase[2] += record['duration_ms']
+        return [(name, depth, count, total) for name, (depth, count, total) in phases.items()]
+
+
+def span(name: str):
+    """Context manager timing the enclosed block while tracing is enabled"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name)
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def parse_target(value: str) -> tuple:
+    """Split a PASS_CLI_TRACE value into (mode, path)"""
+    mode, sep, path = value.partition(':')
+    if sep and mode in TRACE_MODES:
+        return mode, path
+    return 'json', value
+
+
+class Session:
+    """One traced CLI invocation: enables tracing and writes the results on finish()
+
+    Args:
+        report: Print the per-phase breakdown to stderr
+        target: PASS_CLI_TRACE value, or None
+    """
+
+    def __init__(self, report: bool = False, target: str = None):
+        self.report = report
+        self.mode, self.path = parse_target(target) if target else (None, None)
+        self.tracer = enable()
+        self.profiler = None
+        if self.mode == 'cprofile':
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def finish(self):
+        total_ms = (time.perf_counter() - self.tracer.started) * 1000
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.path)
+        disable()
+
+        if self.mode == 'json':
+            self._write_records(total_ms)
+        if self.report:
+            self._print_report(total_ms)
+
+    def _write_records(self, total_ms: float):
+        import json
+
+        # Only the command name: arguments may carry secrets (store -p)
+        command = next((arg for arg in sys.argv[1:] if not arg.startswith('-')), None)
+        context = {'pid': os.getpid(), 'command': command, 'time': time.time()}
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        with open(fd, 'a') as f:
+            for record in self.tracer.records:
+                f.write(json.dumps(dict(record, **context)) + '\n')
+            f.write(json.dumps(dict(context, name='total', start_ms=0.0,
+                                    duration_ms=total_ms, depth=-1)) + '\n')
+
+    def _print_report(self, total_ms: float):
+        lines = [f"\nProfile: {total_ms:.1f} ms total"]
+        accounted = 0.0
+        for name, depth, count, phase_ms in self.tracer.summary():
+            if depth == 0:
+                accounted += phase_ms
+            label = '  ' * depth + name
+            calls = f"x{count}" if count > 1 else ''
+            lines.append(f"  {label:<28} {calls:>6} {phase_ms:10.2f} ms "
+                         f"{phase_ms / total_ms * 100 if total_ms else 0:5.1f}%")
+        other_ms = max(0.0, total_ms - accounted)
+        lines.append(f"  {'(other)':<28} {'':>6} {other_ms:10.2f} ms "
+                     f"{other_ms / total_ms * 100 if total_ms else 0:5.1f}%")
+        sys.stderr.write('\n'.join(lines) + '\n')
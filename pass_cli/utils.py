@@ -1,8 +1,8 @@
-import secrets
-import string
+import os
+import re
 import subprocess
 
-from .database import PasswordManager
+ENV_NAME_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
 
 
 def check_sudo() -> bool:
@@ -16,41 +16,86 @@ def check_sudo() -> bool:
         return False
 
 
+def check_auth() -> bool:
+    """Check authentication with the configured backend
+
+    A successful check is remembered for the current login session, so
+    commands run shortly after each other skip the backend check.
+    """
+    from . import trace
+    from .auth import AuthToken, get_backend
+    from .database import PasswordManager
+
+    with trace.span('auth'):
+        backend = get_backend()
+        token = AuthToken(os.path.dirname(PasswordManager.DEFAULT_DB_PATH))
+        if token.is_valid(backend.name):
+            return True
+        with trace.span(f'auth.{backend.name}'):
+            if not backend.is_authenticated():
+                return False
+        token.issue(backend.name)
+        return True
+
+
 def check_initialized():
-    """Check if password manager is initialized"""
+    """Check if password manager is initialized, without creating or migrating the database"""
+    from .database import PasswordManager
+
+    return PasswordManager.is_initialized()
+
+
+def session_id() -> int:
+    """Identifier of the current login session, 0 where unsupported"""
     try:
-        pm = PasswordManager()
-        return pm._has_encryption_key()
-    except Exception:
+        return os.getsid(0)
+    except (AttributeError, OSError):
+        return 0
+
+
+def is_private_file(path: str) -> bool:
+    """Whether path is owned by the current user and not accessible to others"""
+    st = os.stat(path)
+    if st.st_mode & 0o077:
         return False
+    return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+
+
+def parse_secret_ref(ref: str) -> tuple:
+    """Parse '[NAME=]service:username' into (name, service_name, username)
+
+    The username follows the last colon, so service names may contain colons.
+    Without an explicit NAME, one is derived from service and username,
+    e.g. 'prod/db:app' becomes PROD_DB_APP.
+
+    Raises:
+        ValueError: If the reference has no service or username
+    """
+    name, sep, rest = ref.partition('=')
+    if not sep or not ENV_NAME_RE.fullmatch(name):
+        name, rest = None, ref
+    service_name, sep, username = rest.rpartition(':')
+    if not sep or not service_name or not username:
+        raise ValueError(f"Invalid secret reference '{ref}', expected service:username")
+    if name is None:
+        name = re.sub(r'[^A-Za-z0-9]+', '_', f"{service_name}_{username}").strip('_').upper()
+        if not ENV_NAME_RE.fullmatch(name):
+            name = f"_{name}"
+    return name, service_name, username
 
 
 def generate_strong_password(length: int = 16, is_encryption_key: bool = False) -> str:
     """Generate a strong random password or encryption key
 
+    The password has at least one lowercase letter, uppercase letter, digit
+    and symbol (see generator.PasswordGenerator).
+
     Args:
-        length: Length of the password/key
+        length: Length of the password/key, at least 4
         is_encryption_key: If True, uses 64 characters for encryption key
     """
+    from .generator import PasswordGenerator
+
     if is_encryption_key:
         length = 64
-
-    lowercase = string.ascii_lowercase
-    uppercase = string.ascii_uppercase
-    digits = string.digits
-    special = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-
-    password = [
-        secrets.choice(lowercase),
-        secrets.choice(uppercase),
-        secrets.choice(digits),
-        secrets.choice(special)
-    ]
-
-    all_characters = lowercase + uppercase + digits + special
-    password.extend(secrets.choice(all_characters) for _ in range(length - 4))
-
-    password = list(password)
-    secrets.SystemRandom().shuffle(password)
-
-    return ''.join(password)
+    return PasswordGenerator(length).generate()
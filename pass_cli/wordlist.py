@@ -0,0 +1,79 @@
+"""Packed wordlists for passphrase generation
+
+Wordlists ship as prebuilt blobs in pass_cli/data so that loading one is a
+single read with no text parsing:
+
+    magic    4 bytes   b'PCWL'
+    count    4 bytes   number of words, little-endian
+    width    1 byte    offset typecode, b'H' (uint16) or b'I' (uint32)
+    padding  3 bytes
+    offsets  (count + 1) little-endian offsets into the words section
+    words    the ASCII words back to back
+
+The bundled list is the EFF large wordlist (7776 words, CC BY 3.0 US,
+https://www.eff.org/dice).
+"""
+
+import array
+import functools
+import os
+import struct
+import sys
+
+MAGIC = b'PCWL'
+HEADER = struct.Struct('<4sIc3x')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_WORDLIST = 'eff_large'
+
+
+class Wordlist:
+    """Read-only sequence of words backed by a packed blob
+
+    Raises:
+        ValueError: If data is not a packed wordlist
+    """
+
+    def __init__(self, data: bytes):
+        if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a packed wordlist")
+        _, count, width = HEADER.unpack_from(data)
+        self.offsets = array.array(width.decode('ascii'))
+        start = HEADER.size
+        end = start + (count + 1) * self.offsets.itemsize
+        self.offsets.frombytes(data[start:end])
+        if sys.byteorder != 'little':
+            self.offsets.byteswap()
+        self.words = data[end:]
+        if len(self.offsets) != count + 1 or self.offsets[-1] != len(self.words):
+            raise ValueError("Truncated wordlist")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if not -len(self) <= index < len(self):
+            raise IndexError("word index out of range")
+        index %= len(self)
+        return self.words[self.offsets[index]:self.offsets[index + 1]].decode('ascii')
+
+
+def pack(words) -> bytes:
+    """Pack an iterable of unique ASCII words into the blob format above"""
+    encoded = [word.encode('ascii') for word in words]
+    if len(set(encoded)) != len(encoded):
+        raise ValueError("Wordlist contains duplicates")
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    width = 'H' if offsets[-1] < 2 ** 16 else 'I'
+    table = array.array(width, offsets)
+    if sys.byteorder != 'little':
+        table.byteswap()
+    return HEADER.pack(MAGIC, len(encoded), width.encode('ascii')) + table.tobytes() + b''.join(encoded)
+
+
+@functools.lru_cache(maxsize=None)
+def load(name: str = DEFAULT_WORDLIST) -> Wordlist:
+    """Load a bundled wordlist by name, once per process"""
+    with open(os.path.join(DATA_DIR, f'{name}.bin'), 'rb') as f:
+        return Wordlist(f.read())
@@ -39,6 +39,7 @@ setup(
         "Source Code": GITHUB_URL,
     },
     packages=find_packages(exclude=["tests*"]),
+    package_data={"pass_cli": ["data/*.bin"]},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Console",
@@ -0,0 +1,75 @@
+import os
+import stat
+import threading
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pass_cli.agent import AgentServer, connect_agent, socket_path
+from pass_cli.commands.retrieve import retrieve
+from pass_cli.database import PasswordManager
+
+
+@pytest.fixture
+def mock_keyring():
+    """Mock keyring operations"""
+    with patch('keyring.set_password') as mock_set, \
+         patch('keyring.get_password') as mock_get:
+        mock_set.return_value = None
+        mock_get.return_value = "test_key"
+        yield {'set': mock_set, 'get': mock_get}
+
+@pytest.fixture
+def running_agent(tmp_path, mock_keyring, monkeypatch):
+    """Start an agent serving an unlocked vault in a background thread"""
+    db_path = str(tmp_path / 'test_passwords.db')
+    monkeypatch.setattr('pass_cli.database.PasswordManager.DEFAULT_DB_PATH', db_path)
+    pm = PasswordManager("test_key", db_path=db_path)
+    pm.store_password("github", "testuser", "testpass123")
+
+    server = AgentServer(socket_path(db_path), pm, ttl=30)
+    thread = threading.Thread(target=server.serve_until_locked, daemon=True)
+    thread.start()
+    yield db_path, thread
+    client = connect_agent(db_path)
+    if client:
+        client.lock()
+    thread.join(timeout=5)
+
+def test_agent_serves_requests(running_agent):
+    """Test retrieve, store and list through the agent"""
+    db_path, _ = running_agent
+    client = connect_agent(db_path)
+    assert client is not None
+    assert client.get_password("github", "testuser") == "testpass123"
+
+    client.store_password("gmail", "testuser", "secret")
+    assert client.get_password("gmail", "testuser") == "secret"
+    assert ("gmail", "testuser") in client.list_passwords()
+    assert client.get_passwords([("gmail", "testuser"), ("nope", "x")]) == ["secret", None]
+
+def test_agent_socket_permissions(running_agent):
+    """Test that the agent socket is private to its owner"""
+    db_path, _ = running_agent
+    mode = os.stat(socket_path(db_path)).st_mode
+    assert stat.S_IMODE(mode) == 0o600
+
+def test_agent_lock(running_agent):
+    """Test that locking the agent removes its socket"""
+    db_path, thread = running_agent
+    connect_agent(db_path).lock()
+    thread.join(timeout=5)
+    assert connect_agent(db_path) is None
+
+def test_retrieve_uses_agent(running_agent):
+    """Test that retrieve uses the agent and skips the auth check"""
+    with patch('pass_cli.commands.retrieve.check_auth') as mock_check:
+        result = CliRunner().invoke(retrieve, ['-s', 'github', '-u', 'testuser', '--no-copy'])
+        mock_check.assert_not_called()
+    assert result.exit_code == 0
+    assert "testpass123" in result.output
+
+def test_no_agent(tmp_path):
+    """Test that connect_agent returns None when no agent is running"""
+    assert connect_agent(str(tmp_path / 'passwords.db')) is None
@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from pass_cli.aio import AsyncPasswordManager
+
+
+@pytest.fixture
+def temp_db_path(tmp_path):
+    """Create temporary test database"""
+    return str(tmp_path / 'test_passwords.db')
+
+
+@pytest.fixture
+def mock_keyring():
+    """Mock keyring operations"""
+    with patch('keyring.set_password'), patch('keyring.get_password', return_value="test_key"):
+        yield
+
+
+def test_async_round_trip(temp_db_path, mock_keyring):
+    """Test the async API against a real vault"""
+    async def scenario():
+        async with await AsyncPasswordManager.open("test_key", temp_db_path) as vault:
+            await vault.store_password("github", "testuser", "secret")
+            await vault.store_password("gitlab", "testuser", "other")
+            assert await vault.get_password("github", "testuser") == "secret"
+            assert await vault.get_password("github", "nobody") is None
+            assert await vault.list_passwords(prefix="git", limit=1) == [("github", "testuser")]
+            assert [entry async for entry in vault.iter_passwords(page_size=1)] == [
+                ("github", "testuser"), ("gitlab", "testuser")]
+            assert await vault.delete_password("github", "testuser")
+            assert await vault.get_password("github", "testuser") is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_lookups_are_coalesced(temp_db_path, mock_keyring):
+    """Test that concurrent lookups of one entry share a single decrypt"""
+    async def scenario():
+        async with await AsyncPasswordManager.open("test_key", temp_db_path) as vault:
+            await vault.store_password("github", "testuser", "secret")
+            with patch.object(vault._pm, '_decrypt', wraps=vault._pm._decrypt) as decrypt:
+                results = await asyncio.gather(
+                    *(vault.get_password("github", "testuser") for _ in range(10)))
+            assert results == ["secret"] * 10
+            assert decrypt.call_count == 1
+            assert not vault._inflight
+
+    asyncio.run(scenario())
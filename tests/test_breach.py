@@ -0,0 +1,50 @@
+import hashlib
+import random
+
+import pytest
+
+from pass_cli.breach import BreachIndex, build_index
+
+
+def write_dump(path, passwords, shuffle=False, count=10):
+    hashes = sorted(hashlib.sha1(p.encode()).hexdigest().upper() for p in passwords)
+    if shuffle:
+        random.Random(0).shuffle(hashes)
+    path.write_text(''.join(f"{h}:{count}\n" for h in hashes))
+    return str(path)
+
+
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_build_and_lookup(tmp_path, shuffle):
+    """Test that sorted and unsorted dumps give the same index"""
+    passwords = [f"password{i}" for i in range(2000)]
+    dump = write_dump(tmp_path / 'dump.txt', passwords + passwords[:10], shuffle)
+    index_path = str(tmp_path / 'breach.idx')
+
+    assert build_index(dump, index_path) == 2000
+    with BreachIndex(index_path) as index:
+        assert len(index) == 2000
+        assert all(password in index for password in passwords)
+        assert not any(f"other{i}" in index for i in range(2000))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['breach.idx', 'dump.txt']
+
+
+def test_build_skips_rare_and_malformed_hashes(tmp_path):
+    """Test min_count filtering and that junk lines are ignored"""
+    dump = tmp_path / 'dump.txt'
+    dump.write_text(f"{hashlib.sha1(b'common').hexdigest()}:50\n"
+                    f"{hashlib.sha1(b'rare').hexdigest().upper()}:1\n"
+                    "not a hash\nZZZZ:1\n")
+    index_path = str(tmp_path / 'breach.idx')
+    assert build_index(str(dump), index_path, min_count=2) == 1
+    with BreachIndex(index_path) as index:
+        assert "common" in index
+        assert "rare" not in index
+
+
+def test_rejects_other_files(tmp_path):
+    """Test that a file that is not an index is refused"""
+    path = tmp_path / 'breach.idx'
+    path.write_bytes(b'x' * 1000000)
+    with pytest.raises(ValueError):
+        BreachIndex(str(path))
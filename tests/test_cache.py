@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+from pass_cli.cache import SecretCache
+
+
+def test_lru_eviction_wipes_value():
+    """Test that the least recently used entry is evicted and zeroed"""
+    cache = SecretCache(maxsize=2, ttl=60)
+    cache.put("a", "secret-a")
+    buffer = cache._entries["a"][1]
+    cache.put("b", "secret-b")
+    assert cache.get("a") == "secret-a"
+    cache.put("c", "secret-c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "secret-a"
+    cache.put("d", "secret-d")
+    cache.put("e", "secret-e")
+    assert cache.get("a") is None
+    assert buffer == bytearray(len("secret-a"))
+
+def test_ttl_expiry():
+    """Test that expired entries are treated as misses"""
+    cache = SecretCache(maxsize=2, ttl=10)
+    with patch('time.monotonic', return_value=100.0):
+        cache.put("a", "secret")
+    with patch('time.monotonic', return_value=105.0):
+        assert cache.get("a") == "secret"
+    with patch('time.monotonic', return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 0, 'maxsize': 2}
+
+def test_expired_entries_are_swept():
+    """Test that expired values are wiped on any access, not just their own key"""
+    cache = SecretCache(maxsize=10, ttl=10)
+    with patch('time.monotonic', return_value=100.0):
+        cache.put("a", "secret-a")
+        cache.put("b", "secret-b")
+    buffer = cache._entries["a"][1]
+    with patch('time.monotonic', return_value=105.0):
+        cache.put("b", "secret-b2")
+    with patch('time.monotonic', return_value=111.0):
+        assert cache.get("other") is None
+    assert buffer == bytearray(len("secret-a"))
+    assert list(cache._entries) == ["b"]
+
+def test_invalidate_and_clear():
+    """Test explicit invalidation"""
+    cache = SecretCache()
+    cache.put("a", "secret-a")
+    cache.put("b", "secret-b")
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+def test_put_after_invalidation_is_dropped():
+    """Test that a value looked up before an invalidation is not cached"""
+    cache = SecretCache(maxsize=2)
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.put("a", "stale", generation)
+    cache.put("b", "fresh", generation)
+    assert cache.get("a") is None and cache.get("b") == "fresh"
+    cache.put("a", "new", cache.generation())
+    assert cache.get("a") == "new"
+
+    generation = cache.generation()
+    cache.invalidate("c")
+    cache.invalidate("d")
+    cache.invalidate("e")
+    cache.put("c", "stale", generation)
+    assert cache.get("c") is None
+    cache.clear()
+    cache.put("b", "stale", generation)
+    assert cache.get("b") is None
@@ -1,15 +1,27 @@
+import json
+import os
 from unittest.mock import patch
 
 import pytest
 from click.testing import CliRunner
 
+from pass_cli.commands.audit import audit
 from pass_cli.commands.auth import auth
 from pass_cli.commands.auth_check import auth_check
+from pass_cli.commands.breach_check import breach_check
+from pass_cli.commands.encrypt_metadata import encrypt_metadata
+from pass_cli.commands.exec_command import exec_command
+from pass_cli.commands.export import export
 from pass_cli.commands.generate import generate
+from pass_cli.commands.import_passwords import import_passwords
 from pass_cli.commands.init import init
+from pass_cli.commands.kdf_bench import kdf_bench
 from pass_cli.commands.list import list
 from pass_cli.commands.retrieve import retrieve
+from pass_cli.commands.retrieve_many import retrieve_many
+from pass_cli.commands.search import search
 from pass_cli.commands.store import store
+from pass_cli.generator import PasswordGenerator
 
 
 @pytest.fixture
@@ -77,6 +89,24 @@ def test_generate_command(runner, mock_sudo, mock_keyring, mock_db_path):
         assert "Generated and stored password" in result.output
 
 
+def test_generate_passphrase(runner, mock_sudo, mock_keyring, mock_db_path):
+    """Test passphrase generation with an entropy target"""
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+
+        result = runner.invoke(generate, ['-e', '50', '--separator', '.', '--capitalize', 'all',
+                                          '--no-copy'])
+        assert result.exit_code == 0
+        assert "Generated passphrase (51.7 bits of entropy):" in result.output
+        words = result.output.strip().splitlines()[-1].split('.')
+        assert len(words) == 4 and all(word[0].isupper() for word in words)
+
+        result = runner.invoke(generate, ['-P', '-s', 'laptop', '-u', 'login'])
+        assert "Generated and stored passphrase for laptop (77.5 bits of entropy)" in result.output
+        result = runner.invoke(retrieve, ['-s', 'laptop', '-u', 'login', '--no-copy'])
+        assert len(result.output.strip().splitlines()[-1].split('-')) == 6
+
+
 def test_store_command(runner, mock_sudo, mock_keyring, mock_db_path):
     """Test password storage command"""
     with runner.isolated_filesystem():
@@ -118,6 +148,161 @@ def test_retrieve_command(runner, mock_sudo, mock_keyring, mock_db_path):
         assert "testpass" in result.output
 
 
+def test_generate_many(runner, mock_sudo, mock_keyring, mock_db_path):
+    """Test streaming and bulk-storing many passwords with a class policy"""
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+
+        result = runner.invoke(generate, ['-n', '50', '-l', '8', '-c', 'lower,digits',
+                                          '-x', '0o1l'])
+        assert result.exit_code == 0
+        passwords = result.output.splitlines()
+        assert len(passwords) == 50
+        for password in passwords:
+            assert len(password) == 8
+            assert set(password) <= set('abcdefghijkmnpqrstuvwxyz23456789')
+            assert any(c.isdigit() for c in password) and any(c.isalpha() for c in password)
+
+        result = runner.invoke(generate, ['-n', '3', '-s', 'ci', '-u', 'runner-{n}'])
+        assert "Generated and stored 3 passwords for ci" in result.output
+        result = runner.invoke(list, ['-s', 'ci', '-F', 'tsv'])
+        assert result.output.splitlines() == [f"ci\trunner-{n}" for n in (1, 2, 3)]
+
+        result = runner.invoke(generate, ['-n', '3', '-s', 'ci', '-u', 'runner'])
+        assert "{n} placeholder" in result.output
+        result = runner.invoke(generate, ['-c', 'digits', '-x', '0123456789', '--no-copy'])
+        assert "All digits characters are excluded" in result.output
+
+
+def test_retrieve_many_command(runner, mock_sudo, mock_keyring, mock_db_path):
+    """Test fetching several passwords as JSON and env lines"""
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+        runner.invoke(store, ['-s', 'github', '-u', 'alice', '-p', 'secret one'])
+        runner.invoke(store, ['-s', 'prod/db', '-u', 'app', '-p', "it's"])
+
+        result = runner.invoke(retrieve_many, ['github:alice', 'DB_PASS=prod/db:app'])
+        assert result.exit_code == 0
+        assert [(s['name'], s['password']) for s in json.loads(result.output)] == [
+            ('GITHUB_ALICE', 'secret one'), ('DB_PASS', "it's")]
+
+        result = runner.invoke(retrieve_many, ['-F', 'env'],
+                               input='# deploy secrets\ngithub:alice\n\nDB_PASS=prod/db:app\n')
+        assert result.exit_code == 0
+        assert result.output == "GITHUB_ALICE='secret one'\nDB_PASS='it'\"'\"'s'\n"
+
+        result = runner.invoke(retrieve_many, ['github:alice', 'github:bob'])
+        assert result.exit_code == 1
+        assert "github / bob" in result.stderr
+        assert result.stdout == ""
+
+        result = runner.invoke(retrieve_many, ['github'])
+        assert result.exit_code == 1
+        assert "Invalid secret reference" in result.stderr
+
+
+def test_exec_command(runner, mock_sudo, mock_keyring, mock_db_path):
+    """Test that exec replaces the process with the command and mapped secrets"""
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+        runner.invoke(store, ['-s', 'prod/db', '-u', 'app', '-p', 'dbpass'])
+
+        with patch('os.execvpe') as mock_exec:
+            result = runner.invoke(exec_command, ['-m', 'DB_PASS=prod/db:app', '--',
+                                                  'server', '--port', '80'])
+        assert result.exit_code == 0
+        path, args, env = mock_exec.call_args.args
+        assert (path, args) == ('server', ('server', '--port', '80'))
+        assert env['DB_PASS'] == 'dbpass'
+        assert env['PATH'] == os.environ['PATH']
+
+        with patch('os.execvpe', side_effect=FileNotFoundError(2, 'No such file')):
+            result = runner.invoke(exec_command, ['-m', 'DB_PASS=prod/db:app', '--', 'nope'])
+        assert result.exit_code == 127
+
+        with patch('os.execvpe') as mock_exec:
+            result = runner.invoke(exec_command, ['-m', 'X=prod/db:nobody', '--', 'server'])
+        assert result.exit_code == 1
+        mock_exec.assert_not_called()
+
+
+def test_audit_command(runner, mock_sudo, mock_keyring, mock_db_path):
+    """Test the audit report in text and JSON"""
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+        runner.invoke(store, ['-s', 'github', '-u', 'alice', '-p', 'hunter2'])
+        runner.invoke(store, ['-s', 'gitlab', '-u', 'alice', '-p', 'hunter2'])
+
+        result = runner.invoke(audit)
+        assert result.exit_code == 0
+        assert "Reused passwords (1)" in result.output
+        assert "github / alice, gitlab / alice" in result.output
+        assert "Weak passwords, under 60 bits (2)" in result.output
+
+        result = runner.invoke(audit, ['-F', 'json', '--min-entropy', '10'])
+        report = json.loads(result.output)
+        assert report['processed'] == 0 and report['weak'] == []
+
+
+def test_breach_check_command(runner, mock_sudo, mock_keyring, mock_db_path, tmp_path):
+    """Test building an index, checking the vault and rejecting breached generated passwords"""
+    import hashlib
+
+    dump = tmp_path / 'dump.txt'
+    dump.write_text(''.join(f"{hashlib.sha1(p.encode()).hexdigest().upper()}:5\n"
+                            for p in sorted(['hunter2', 'letmein'])))
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+        runner.invoke(store, ['-s', 'github', '-u', 'alice', '-p', 'hunter2'])
+        runner.invoke(store, ['-s', 'bank', '-u', 'alice', '-p', 'Xk9#mQ2$vL7!pR4&wZ'])
+
+        result = runner.invoke(breach_check)
+        assert "No breach index found" in result.output
+
+        result = runner.invoke(breach_check, ['--build', str(dump)])
+        assert "Indexed 2 hashes" in result.output
+
+        result = runner.invoke(breach_check)
+        assert "1 of 2 passwords appear in known breaches" in result.output
+        assert "github / alice" in result.output
+
+        result = runner.invoke(breach_check, ['--password'], input='letmein\n')
+        assert "appears in known breaches" in result.output
+
+        result = runner.invoke(audit)
+        assert "Found in known breaches (1)" in result.output
+
+        with patch.object(PasswordGenerator, '__iter__',
+                          return_value=iter(['letmein', 'hunter2', 'fresh-password'])):
+            result = runner.invoke(generate, ['--no-copy'])
+        assert result.output.strip().splitlines()[-1] == 'fresh-password'
+
+        pins = tmp_path / 'pins.txt'
+        pins.write_text(''.join(f"{hashlib.sha1(f'{n:04d}'.encode()).hexdigest().upper()}\n"
+                                for n in range(10000)))
+        runner.invoke(breach_check, ['--build', str(pins)])
+        result = runner.invoke(generate, ['-l', '4', '-c', 'digits', '--no-copy'])
+        assert "Policy too weak" in result.output
+
+
+def test_profile_flag(runner, mock_sudo, mock_keyring, mock_db_path, monkeypatch):
+    """Test that --profile prints a per-phase breakdown after the command"""
+    from pass_cli.cli import main
+
+    monkeypatch.delenv('PASS_CLI_TRACE', raising=False)
+    with runner.isolated_filesystem():
+        runner.invoke(init, input='testkey\ntestkey\n')
+        runner.invoke(store, ['-s', 'testservice', '-u', 'testuser', '-p', 'testpass'])
+
+        result = runner.invoke(main, ['--profile', 'retrieve', '-s', 'testservice',
+                                      '-u', 'testuser', '--no-copy'])
+        assert result.exit_code == 0
+        assert "testpass" in result.stdout
+        for phase in ('import retrieve', 'auth', 'keyring.get', 'unlock', 'keycache.load',
+                      'sqlite.read', 'fernet.decrypt'):
+            assert phase in result.stderr
+
+
 def test_auth_commands(runner, mock_sudo):
     """Test authentication commands"""
     result = runner.invoke(auth)
@@ -164,9 +349,81 @@ def test_list_passwords(runner, initialized_db):
     assert 'No passwords found for service: nonexistent' in result.output
 
 
+def test_list_passwords_formats(runner, initialized_db):
+    """Test machine-readable list output"""
+    for service in ('github', 'gitlab', 'gmail'):
+        result = runner.invoke(store, ['-s', service, '-u', 'testuser', '-p', 'pass123'])
+        assert result.exit_code == 0
+
+    result = runner.invoke(list, ['--prefix', 'git', '--format', 'tsv'])
+    assert result.exit_code == 0
+    assert result.output == 'github\ttestuser\ngitlab\ttestuser\n'
+
+    result = runner.invoke(list, ['--limit', '1', '--offset', '2', '--format', 'json'])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == [{'service': 'gmail', 'username': 'testuser'}]
+
+    result = runner.invoke(list, ['--match', 'x*'])
+    assert 'No matching passwords found' in result.output
+
+
+def test_search(runner, initialized_db):
+    """Test searching service names and usernames"""
+    for service in ('github', 'gitlab', 'gmail'):
+        result = runner.invoke(store, ['-s', service, '-u', 'testuser', '-p', 'pass123'])
+        assert result.exit_code == 0
+
+    result = runner.invoke(search, ['git', '--format', 'tsv'])
+    assert result.exit_code == 0
+    assert sorted(result.output.splitlines()) == ['github\ttestuser', 'gitlab\ttestuser']
+
+    result = runner.invoke(search, ['mail'])
+    assert result.exit_code == 0
+    assert 'Service: gmail' in result.output
+
+    result = runner.invoke(search, ['nothing'])
+    assert 'No passwords matching: nothing' in result.output
+
+
+def test_encrypt_metadata(runner, initialized_db):
+    """Test converting a vault to encrypted names and using it afterwards"""
+    runner.invoke(store, ['-s', 'github', '-u', 'testuser', '-p', 'pass123'])
+
+    result = runner.invoke(encrypt_metadata, input='n\n')
+    assert "Operation cancelled." in result.output
+    result = runner.invoke(encrypt_metadata, ['--force'])
+    assert "Encrypted the names of 1 entries" in result.output
+    result = runner.invoke(encrypt_metadata)
+    assert "already encrypted" in result.output
+
+    runner.invoke(store, ['-s', 'gitlab', '-u', 'testuser', '-p', 'pass456'])
+    result = runner.invoke(retrieve, ['-s', 'github', '-u', 'testuser', '--no-copy'])
+    assert result.output.strip().splitlines()[-1] == 'pass123'
+    result = runner.invoke(search, ['git', '--format', 'tsv'])
+    assert result.output.splitlines() == ['github\ttestuser', 'gitlab\ttestuser']
+
+
+def test_kdf_bench_apply(runner, initialized_db):
+    """Test calibrating a KDF and upgrading the vault with it"""
+    result = runner.invoke(store, ['-s', 'github', '-u', 'testuser', '-p', 'pass123'])
+    assert result.exit_code == 0
+
+    with patch('pass_cli.kdf.calibrate', return_value=({'iterations': 200}, 0.05)):
+        result = runner.invoke(kdf_bench, ['-a', 'pbkdf2', '--apply'])
+    assert result.exit_code == 0
+    assert 'iterations=200' in result.output
+    assert 'Upgraded the vault to pbkdf2, re-encrypted 1 passwords' in result.output
+
+    result = runner.invoke(retrieve, ['-s', 'github', '-u', 'testuser', '--no-copy'])
+    assert 'pass123' in result.output
+
+    result = runner.invoke(kdf_bench, ['-a', 'pbkdf2', '-t', '10'])
+    assert 'Vault KDF: pbkdf2 iterations=200' in result.output
+
+
 def test_list_passwords_no_auth(runner, initialized_db):
     """Test listing passwords without authentication"""
-    with patch('pass_cli.commands.list.check_sudo', return_value=False):
+    with patch('pass_cli.commands.list.check_auth', return_value=False):
         result = runner.invoke(list)
         assert "Authentication required!" in result.output
 
@@ -176,3 +433,38 @@ def test_list_passwords_not_initialized(runner, mock_db_path):
     with runner.isolated_filesystem():
         result = runner.invoke(list)
         assert "Password manager not initialized!" in result.output
+
+
+def test_import_with_byte_order_mark(runner, initialized_db, tmp_path):
+    """Test importing a CSV file that starts with a UTF-8 byte order mark"""
+    source = tmp_path / 'passwords.csv'
+    source.write_text('Service,Username,Password\ngithub,testuser1,pass123\n', encoding='utf-8-sig')
+
+    result = runner.invoke(import_passwords, [str(source)])
+    assert "Imported 1 passwords" in result.output
+
+    result = runner.invoke(retrieve, ['-s', 'github', '-u', 'testuser1', '--no-copy'])
+    assert 'pass123' in result.output
+
+
+def test_import_export(runner, initialized_db, tmp_path):
+    """Test importing passwords from CSV and exporting them as JSON Lines"""
+    source = tmp_path / 'passwords.csv'
+    source.write_text('service,username,password\ngithub,testuser1,pass123\ngmail,testuser2,pass456\n')
+
+    result = runner.invoke(import_passwords, [str(source)])
+    assert result.exit_code == 0
+    assert "Imported 2 passwords" in result.output
+
+    result = runner.invoke(export, ['--format', 'jsonl'])
+    assert result.exit_code == 0
+    assert '{"service": "github", "username": "testuser1", "password": "pass123"}' in result.output
+    assert "Exported 2 passwords" in result.output
+
+    target = tmp_path / 'backup.csv'
+    target.write_text('stale')
+    target.chmod(0o644)
+    result = runner.invoke(export, ['-o', str(target)])
+    assert "Exported 2 passwords" in result.output
+    assert 'gmail,testuser2,pass456' in target.read_text()
+    assert target.stat().st_mode & 0o777 == 0o600
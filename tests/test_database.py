@@ -1,9 +1,15 @@
+import base64
+import hashlib
 import os
+import sqlite3
+import threading
+import time
 from unittest.mock import patch
 
 import pytest
 from cryptography.fernet import Fernet
 
+from pass_cli import kdf
 from pass_cli.database import PasswordManager
 
 
@@ -47,4 +53,515 @@ def test_keyring_integration(temp_db_path, mock_keyring):
         PasswordManager.KEYRING_SERVICE,
         PasswordManager.KEYRING_USERNAME,
         "test_key"
-    ) 
\ No newline at end of file
+    ) 
+
+def test_key_cache_skips_derivation(temp_db_path, mock_keyring):
+    """Test that a warm key cache reuses the derived cipher key"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, use_key_cache=True)
+    pm.store_password("github", "testuser", "testpass123")
+
+    with patch('pass_cli.kdf.derive') as mock_derive:
+        cached = PasswordManager("test_key", db_path=temp_db_path, use_key_cache=True)
+        mock_derive.assert_not_called()
+    assert cached.get_password("github", "testuser") == "testpass123"
+
+def test_key_cache_rejects_wrong_key(temp_db_path, mock_keyring):
+    """Test that the key cache never unlocks the vault for a different key"""
+    PasswordManager("correct_key", db_path=temp_db_path, use_key_cache=True)
+
+    with pytest.raises(ValueError, match="Invalid encryption key"):
+        PasswordManager("wrong_key", db_path=temp_db_path, use_key_cache=True)
+
+def test_key_cache_expiry(temp_db_path, mock_keyring):
+    """Test that expired cache entries are discarded"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, use_key_cache=True)
+
+    with patch('time.time', return_value=time.time() + PasswordManager.KEY_CACHE_TTL + 1):
+        assert pm._key_cache.load("test_key", pm._get_vault_salt()) is None
+    assert not os.path.exists(pm._key_cache.path)
+
+def test_schema_version_and_wal(temp_db_path, mock_keyring):
+    """Test that the schema version is recorded and WAL mode is enabled"""
+    with PasswordManager("test_key", db_path=temp_db_path) as pm:
+        assert pm._schema_version() == PasswordManager.SCHEMA_VERSION
+        assert pm._conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    with patch.object(PasswordManager, '_migrate_v1') as mock_migrate:
+        PasswordManager("test_key", db_path=temp_db_path).close()
+        mock_migrate.assert_not_called()
+
+def test_close(temp_db_path, mock_keyring):
+    """Test that close releases the connection"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.close()
+    assert pm._conn is None
+    pm.close()
+
+def test_store_password_upsert(temp_db_path, mock_keyring):
+    """Test that storing an existing entry replaces it"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.store_password("github", "testuser", "oldpass")
+    pm.store_password("github", "testuser", "newpass")
+    assert pm.get_password("github", "testuser") == "newpass"
+    assert list(pm.list_passwords()) == [("github", "testuser")]
+
+def test_migration_deduplicates_rows(temp_db_path, mock_keyring):
+    """Test that upgrading a v1 vault keeps the latest duplicate and adds the index"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm._conn.execute('DROP INDEX idx_passwords_service_username')
+    for password in ("first", "second"):
+        pm._conn.execute(
+            'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+            ("github", "testuser", pm.cipher_suite.encrypt(password.encode()).decode()))
+    pm._conn.execute('PRAGMA user_version = 1')
+    pm._conn.commit()
+    pm.close()
+
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    assert pm._schema_version() == PasswordManager.SCHEMA_VERSION
+    assert list(pm.list_passwords()) == [("github", "testuser")]
+    assert pm.get_password("github", "testuser") == "second"
+    plan = pm._conn.execute('''
+        EXPLAIN QUERY PLAN SELECT encrypted_password FROM passwords
+        WHERE service_name = ? AND username = ?
+    ''', ("github", "testuser")).fetchall()
+    assert 'idx_passwords_service_username' in str(plan)
+
+def test_store_many_and_iter_all(temp_db_path, mock_keyring):
+    """Test bulk storage and streaming decryption"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    records = ((f"service-{i:03}", "testuser", f"pass-{i}") for i in range(250))
+    assert pm.store_many(records, batch_size=100) == 250
+    stored = list(pm.iter_all())
+    assert len(stored) == 250
+    assert stored[0] == ("service-000", "testuser", "pass-0")
+
+def test_list_passwords_filters_and_pagination(temp_db_path, mock_keyring):
+    """Test SQL-side filtering, offset paging and keyset cursors"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    services = ["github", "gitlab", "gmail", "slack"]
+    pm.store_many((service, user, "secret") for service in services for user in ("a", "b"))
+
+    listing = pm.list_passwords()
+    assert not isinstance(listing, list)
+    assert next(listing) == ("github", "a")
+    assert list(pm.list_passwords(prefix="git")) == [
+        ("github", "a"), ("github", "b"), ("gitlab", "a"), ("gitlab", "b")]
+    assert list(pm.list_passwords(pattern="g*l*")) == [
+        ("gitlab", "a"), ("gitlab", "b"), ("gmail", "a"), ("gmail", "b")]
+    assert list(pm.list_passwords(limit=2, offset=3)) == [("gitlab", "b"), ("gmail", "a")]
+    assert list(pm.list_passwords(after=("gmail", "a"))) == [
+        ("gmail", "b"), ("slack", "a"), ("slack", "b")]
+
+    pm.store_many([("x\U0010ffff", "a", "secret"), ("x\U0010ffffy", "a", "secret"),
+                   ("x\ud7ffz", "a", "secret"), ("x\ue000", "a", "secret"), ("y", "a", "secret")])
+    assert list(pm.list_passwords(prefix="x\U0010ffff")) == [
+        ("x\U0010ffff", "a"), ("x\U0010ffffy", "a")]
+    assert list(pm.list_passwords(prefix="x\ud7ff")) == [("x\ud7ffz", "a")]
+    assert list(pm.list_passwords(prefix="\U0010ffff")) == []
+
+def test_get_passwords(temp_db_path, mock_keyring):
+    """Test batched lookups keep the key order and report missing entries as None"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, cache_size=10)
+    pm.store_many((f"service{i}", "user", f"pass{i}") for i in range(20))
+    assert pm.get_password("service3", "user") == "pass3"
+
+    with patch.object(PasswordManager, 'LOOKUP_BATCH', 4):
+        passwords = pm.get_passwords(
+            [("service7", "user"), ("missing", "user"), ("service3", "user"), ("service7", "user")]
+            + [(f"service{i}", "user") for i in range(10, 20)])
+    assert passwords[:4] == ["pass7", None, "pass3", "pass7"]
+    assert passwords[4:] == [f"pass{i}" for i in range(10, 20)]
+    assert pm.get_passwords([]) == []
+
+def test_audit(temp_db_path, mock_keyring):
+    """Test reuse, weakness and age findings and the incremental audit cache"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.store_password("github", "alice", "hunter2")
+    pm.store_password("gitlab", "alice", "hunter2")
+    pm.store_password("bank", "alice", "Xk9#mQ2$vL7!pR4&wZ")
+    pm._conn.execute("UPDATE passwords SET updated_at = datetime('now', '-400 days') "
+                     "WHERE service_name = 'bank'")
+    pm._conn.commit()
+
+    report = pm.audit()
+    assert report['total'] == report['processed'] == 3
+    assert report['reused'] == [[("github", "alice"), ("gitlab", "alice")]]
+    assert [(s, u) for s, u, _, _ in report['weak']] == [("github", "alice"), ("gitlab", "alice")]
+    assert report['weak'][0][3] == ['lowercase', 'digits']
+    assert report['old'] == [("bank", "alice", 400)]
+
+    # Only the changed row is decrypted again
+    pm.store_password("gitlab", "alice", "Yt8@nW3%bK6^sE1*qJ")
+    report = pm.audit(max_age_days=None)
+    assert report['processed'] == 1
+    assert report['reused'] == [] and report['old'] == []
+    assert pm.audit(use_cache=False)['processed'] == 3
+    assert pm.audit()['processed'] == 0
+
+    # Fingerprints are keyed with the vault key and dropped on rekey
+    with patch('keyring.delete_password'):
+        pm.rekey("new_key")
+    assert pm._conn.execute(f'SELECT COUNT(*) FROM {PasswordManager.AUDIT_TABLE}').fetchone()[0] == 0
+    assert pm.audit()['processed'] == 3
+
+def test_audit_breach_index(temp_db_path, mock_keyring, tmp_path):
+    """Test breached passwords are flagged and cached results follow the index"""
+    from pass_cli.breach import BreachIndex, build_index
+
+    dump = tmp_path / 'dump.txt'
+    dump.write_text(hashlib.sha1(b"hunter2").hexdigest() + ":3\n")
+    build_index(str(dump), str(tmp_path / 'breach.idx'))
+
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.store_password("github", "alice", "hunter2")
+    pm.store_password("bank", "alice", "Xk9#mQ2$vL7!pR4&wZ")
+    assert pm.audit()['breached'] == []
+    with BreachIndex(str(tmp_path / 'breach.idx')) as index:
+        report = pm.audit(breach_index=index)
+        assert report['processed'] == 2
+        assert report['breached'] == [("github", "alice")]
+        assert pm.audit(breach_index=index)['processed'] == 0
+
+def test_search(temp_db_path, mock_keyring):
+    """Test that the trigram index follows writes and short terms fall back to LIKE"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    for trigger in ('insert', 'delete', 'update'):
+        pm._conn.execute(f'DROP TRIGGER passwords_fts_{trigger}')
+    pm._conn.execute(f'DROP TABLE {PasswordManager.FTS_TABLE}')
+    pm.store_password("GitHub", "alice", "secret")
+    pm._conn.execute('PRAGMA user_version = 3')
+    pm._conn.commit()
+    pm.close()
+
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    assert list(pm.search("hub")) == [("GitHub", "alice")]
+    pm.store_many([("gitlab", "bob", "secret"), ("gmail", "alice@example.com", "secret")])
+    assert list(pm.search("ALI")) == [("GitHub", "alice"), ("gmail", "alice@example.com")]
+    assert list(pm.search("git ali")) == [("GitHub", "alice")]
+    assert list(pm.search("gm")) == [("gmail", "alice@example.com")]
+    assert list(pm.search("lab", limit=0)) == []
+
+    pm.delete_password("GitHub", "alice")
+    assert list(pm.search("hub")) == []
+    plan = pm._conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM {PasswordManager.FTS_TABLE} WHERE {PasswordManager.FTS_TABLE} MATCH 'lab'"
+    ).fetchall()
+    assert 'VIRTUAL TABLE INDEX' in str(plan)
+
+def test_encrypted_metadata(temp_db_path, keyring_store):
+    """Test that names are encrypted at rest and exact lookups use the blind index"""
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    pm.store_many([("GitHub", "alice", "pw-1"), ("gitlab", "bob", "pw-2"),
+                   ("gmail", "alice@example.com", "pw-1")])
+    assert not pm.metadata_encrypted
+    assert pm.encrypt_metadata(batch_size=2) == 3
+    assert pm.metadata_encrypted and pm.encrypt_metadata() == 0
+
+    pm.store_password("gitlab", "bob", "pw-3")
+    pm.store_password("prod/db", "app", "pw-4")
+    assert pm.get_password("gitlab", "bob") == "pw-3"
+    assert pm.get_passwords([("prod/db", "app"), ("GitHub", "nobody"), ("GitHub", "alice")]) == [
+        "pw-4", None, "pw-1"]
+    assert list(pm.list_passwords()) == [("GitHub", "alice"), ("gitlab", "bob"),
+                                         ("gmail", "alice@example.com"), ("prod/db", "app")]
+    assert list(pm.list_passwords(prefix="g", limit=1, offset=1)) == [("gmail", "alice@example.com")]
+    assert list(pm.list_passwords(pattern="g*l*", after=("gitlab", "bob"))) == [
+        ("gmail", "alice@example.com")]
+    assert list(pm.search("ALI")) == [("GitHub", "alice"), ("gmail", "alice@example.com")]
+    assert sorted(pm.iter_all()) == [("GitHub", "alice", "pw-1"), ("gitlab", "bob", "pw-3"),
+                                     ("gmail", "alice@example.com", "pw-1"),
+                                     ("prod/db", "app", "pw-4")]
+    assert pm.audit(max_age_days=None)['reused'] == [[("GitHub", "alice"),
+                                                      ("gmail", "alice@example.com")]]
+    assert pm.delete_password("gitlab", "bob") and not pm.delete_password("gitlab", "bob")
+
+    plan = pm._conn.execute(
+        'EXPLAIN QUERY PLAN SELECT encrypted_password FROM passwords WHERE lookup = ?',
+        (b'x',)).fetchall()
+    assert 'idx_passwords_lookup' in str(plan)
+    assert pm._conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name LIKE 'passwords_fts%'").fetchone() is None
+
+    pm.rekey("new_key")
+    pm.close()
+    pm = PasswordManager("new_key", db_path=temp_db_path)
+    assert pm.get_password("prod/db", "app") == "pw-4"
+    pm.close()
+    with open(temp_db_path, 'rb') as f:
+        data = f.read()
+    assert b'gmail' not in data and b'prod/db' not in data
+
+def test_encrypted_metadata_from_other_instance(temp_db_path, keyring_store):
+    """Test that instances unlocked before the conversion never write plaintext names"""
+    pm = PasswordManager("key", db_path=temp_db_path)
+    pm.store_password("github", "alice", "pw-1")
+    stale = [PasswordManager("key", db_path=temp_db_path) for _ in range(4)]
+    assert pm.encrypt_metadata() == 1
+
+    stale[0].store_password("gitlab", "bob", "pw-2")
+    assert stale[1].store_many([("gmail", "carol", "pw-3")]) == 1
+    assert stale[2].delete_password("github", "alice")
+    assert stale[3].encrypt_metadata() == 0
+    assert list(pm.list_passwords()) == [("gitlab", "bob"), ("gmail", "carol")]
+    assert pm.get_password("gitlab", "bob") == "pw-2"
+
+    with pytest.raises(sqlite3.IntegrityError, match="metadata is encrypted"):
+        with pm._conn:
+            pm._conn.execute("INSERT INTO passwords (service_name, username, encrypted_password) "
+                             "VALUES ('plain', 'text', 'x')")
+    for instance in [pm, *stale]:
+        instance.close()
+
+def test_thread_safe_mode(temp_db_path, mock_keyring):
+    """Test mixed store/retrieve/delete from many threads sharing one instance"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, thread_safe=True, pool_size=3)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(30):
+                service = f"service-{n}-{i % 5}"
+                pm.store_password(service, "testuser", f"pass-{i}")
+                assert pm.get_password(service, "testuser") == f"pass-{i}"
+                list(pm.list_passwords(prefix=f"service-{n}-"))
+                if i % 3 == 0:
+                    assert pm.delete_password(service, "testuser")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(list(pm.list_passwords())) == 8 * 4
+    stats = pm.pool_stats()
+    assert 0 < stats['readers_open'] <= 3
+    pm.close()
+
+def test_parallel_bulk_operations(temp_db_path, mock_keyring):
+    """Test bulk encryption and decryption on a worker pool"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    records = [(f"service-{i:03}", "testuser", f"pass-{i}") for i in range(50)]
+    assert pm.store_many(records, batch_size=8, workers=2) == 50
+    assert pm.get_password("service-007", "testuser") == "pass-7"
+    assert list(pm.iter_all(workers=2)) == records
+
+@pytest.fixture
+def keyring_store():
+    """Mock keyring operations with an in-memory store"""
+    store = {}
+    with patch('keyring.set_password', side_effect=lambda s, u, p: store.__setitem__(u, p)), \
+         patch('keyring.get_password', side_effect=lambda s, u: store.get(u)), \
+         patch('keyring.delete_password', side_effect=lambda s, u: store.pop(u)):
+        yield store
+
+def test_rekey(temp_db_path, keyring_store):
+    """Test re-encrypting the vault with a new key"""
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    pm.store_many((f"service-{i}", "testuser", f"pass-{i}") for i in range(10))
+
+    assert pm.rekey("new_key", batch_size=3) == 10
+    assert keyring_store == {PasswordManager.KEYRING_USERNAME: "new_key"}
+    assert not pm.rekey_in_progress()
+    assert pm.get_password("service-4", "testuser") == "pass-4"
+
+    with pytest.raises(ValueError, match="Invalid encryption key"):
+        PasswordManager("old_key", db_path=temp_db_path)
+    assert PasswordManager("new_key", db_path=temp_db_path).get_password(
+        "service-9", "testuser") == "pass-9"
+
+def test_rekey_resume(temp_db_path, keyring_store):
+    """Test that an interrupted rotation keeps reads working and resumes"""
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    pm.store_many((f"service-{i}", "testuser", f"pass-{i}") for i in range(10))
+
+    set_meta = PasswordManager._set_meta
+
+    def interrupt_second_batch(self, key, value):
+        if key == 'rekey.cursor' and value == 8:
+            raise KeyboardInterrupt
+        set_meta(self, key, value)
+
+    with patch.object(PasswordManager, '_set_meta', interrupt_second_batch):
+        with pytest.raises(KeyboardInterrupt):
+            pm.rekey("new_key", batch_size=4)
+    pm.close()
+
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    assert pm.rekey_in_progress()
+    assert pm._get_meta('rekey.cursor') == '4'
+    assert [password for _, _, password in pm.iter_all()] == \
+        sorted(f"pass-{i}" for i in range(10))
+
+    with pytest.raises(ValueError, match="different encryption key"):
+        pm.rekey("other_key")
+    assert pm.rekey(PasswordManager.get_pending_key(), batch_size=4) == 6
+    assert PasswordManager("new_key", db_path=temp_db_path).get_password(
+        "service-0", "testuser") == "pass-0"
+
+def test_rekey_recovers_keyring_update(temp_db_path, keyring_store):
+    """Test finishing a rotation that stopped before updating the keyring"""
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    pm.store_password("github", "testuser", "testpass123")
+    with patch.object(pm, '_replace_stored_key'):
+        pm.rekey("new_key")
+
+    pm = PasswordManager(PasswordManager.get_stored_key(), db_path=temp_db_path)
+    assert pm.get_password("github", "testuser") == "testpass123"
+    assert keyring_store == {PasswordManager.KEYRING_USERNAME: "new_key"}
+
+def test_writes_follow_rotation_by_other_instance(temp_db_path, keyring_store):
+    """Test that instances unlocked before a rotation write with its new key"""
+    pm = PasswordManager("old_key", db_path=temp_db_path)
+    pm.store_many((f"service-{i}", "testuser", f"pass-{i}") for i in range(6))
+    during, after, stranded = (PasswordManager("old_key", db_path=temp_db_path)
+                               for _ in range(3))
+
+    # Every row is rotated, but the rotation stops before switching keys
+    with patch.object(pm, '_switch_keys', side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            pm.rekey("new_key", batch_size=4)
+    during.store_password("service-1", "testuser", "changed")
+    during.store_many([("service-7", "testuser", "pass-7")])
+    # Only the row added above the cursor is left to rotate
+    assert pm.rekey("new_key") == 1
+
+    after.store_password("service-8", "testuser", "pass-8")
+    assert after.get_password("service-8", "testuser") == "pass-8"
+    keyring_store.clear()
+    with pytest.raises(ValueError, match="unlock it again"):
+        stranded.store_password("service-9", "testuser", "pass-9")
+
+    pm = PasswordManager("new_key", db_path=temp_db_path)
+    assert pm.get_passwords([("service-1", "testuser"), ("service-7", "testuser"),
+                             ("service-8", "testuser")]) == ["changed", "pass-7", "pass-8"]
+    assert pm.get_password("service-9", "testuser") is None
+    assert pm.rekey("newer_key") == 8
+
+def test_unlock_runs_kdf_once(temp_db_path, mock_keyring):
+    """Test that unlocking derives the verifier and cipher key from one KDF pass"""
+    PasswordManager("correct_key", db_path=temp_db_path).store_password("github", "testuser", "secret")
+
+    with patch('pass_cli.kdf.derive', wraps=kdf.derive) as mock_derive:
+        pm = PasswordManager("correct_key", db_path=temp_db_path)
+        assert mock_derive.call_count == 1
+    assert pm.get_password("github", "testuser") == "secret"
+    assert pm.kdf_spec()['split'] == kdf.SPLIT
+
+    with pytest.raises(ValueError, match="Invalid encryption key"):
+        PasswordManager("wrong_key", db_path=temp_db_path)
+
+def test_legacy_kdf_upgrade(temp_db_path, mock_keyring):
+    """Test that vaults without a recorded KDF are upgraded on request"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    legacy = Fernet(pm._derive_cipher_key("test_key", kdf.LEGACY_SPEC))
+    salt = os.urandom(16)
+    pm._conn.execute('DELETE FROM vault_meta')
+    pm._conn.execute('UPDATE encryption_keys SET key_hash = ?, salt = ?', (
+        pm._hash_key("test_key", salt), base64.b64encode(salt).decode()))
+    pm._conn.execute(
+        'INSERT INTO passwords (service_name, username, encrypted_password) VALUES (?, ?, ?)',
+        ("github", "testuser", legacy.encrypt(b"secret").decode()))
+    pm._conn.commit()
+    pm.close()
+
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    assert pm.kdf_spec() == kdf.LEGACY_SPEC
+    assert pm.kdf_upgrade_needed()
+    assert pm.get_password("github", "testuser") == "secret"
+    pm.close()
+
+    pm = PasswordManager("test_key", db_path=temp_db_path, upgrade_kdf=True)
+    assert not pm.kdf_upgrade_needed()
+    assert pm.kdf_spec()['algorithm'] == kdf.default_algorithm()
+    assert not pm.rekey_in_progress()
+    assert pm.get_password("github", "testuser") == "secret"
+    mock_keyring['set'].assert_called_once()
+
+def test_kdf_target_change(temp_db_path, mock_keyring):
+    """Test that a new KDF target is applied by rekeying with the same key"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.store_password("github", "testuser", "secret")
+    old_spec = pm.kdf_spec()
+    pm.set_kdf_target('pbkdf2', {'iterations': 200})
+    pm.close()
+
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    assert pm.kdf_spec() == old_spec and pm.kdf_upgrade_needed()
+    assert pm.rekey("test_key") == 1
+    spec = pm.kdf_spec()
+    assert spec['algorithm'] == 'pbkdf2' and spec['params'] == {'iterations': 200}
+    assert spec['salt'] != old_spec['salt']
+    assert pm.get_password("github", "testuser") == "secret"
+    with pytest.raises(ValueError):
+        pm.set_kdf_target('md5')
+
+def test_concurrent_kdf_upgrades(temp_db_path, keyring_store):
+    """Test that instances upgrading the same vault at once join or reload the rotation"""
+    pm = PasswordManager("test_key", db_path=temp_db_path)
+    pm.store_many([(f"service-{i}", "testuser", f"pass-{i}") for i in range(5)])
+    pm.set_kdf_target('pbkdf2', {'iterations': 200})
+    first, second, late, other = (PasswordManager("test_key", db_path=temp_db_path)
+                                  for _ in range(4))
+
+    with patch.object(first, '_finish_rotation'):
+        first.rekey("test_key")
+    assert second.rekey("test_key", batch_size=2) == 5
+    assert first._finish_rotation("test_key") == 0
+    assert late.rekey("test_key") == 0
+    with pytest.raises(ValueError, match="rekeyed by another process"):
+        other.rekey("new_key")
+
+    for instance in (first, second, late):
+        assert instance.get_password("service-3", "testuser") == "pass-3"
+        assert not instance.rekey_in_progress()
+    assert pm.kdf_spec()['params'] == {'iterations': 200}
+    assert PasswordManager("test_key", db_path=temp_db_path).get_password(
+        "service-0", "testuser") == "pass-0"
+    assert PasswordManager.KEYRING_PENDING_USERNAME not in keyring_store
+
+def test_decrypted_value_cache(temp_db_path, mock_keyring):
+    """Test that cached passwords skip decryption and are invalidated on writes"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, cache_size=8)
+    pm.store_password("github", "testuser", "testpass123")
+    assert pm.get_password("github", "testuser") == "testpass123"
+
+    with patch.object(pm, 'cipher_suite') as mock_cipher:
+        assert pm.get_password("github", "testuser") == "testpass123"
+        mock_cipher.decrypt.assert_not_called()
+    assert pm.cache_stats()['hits'] == 1
+
+    pm.store_password("github", "testuser", "newpass")
+    assert pm.get_password("github", "testuser") == "newpass"
+    pm.delete_password("github", "testuser")
+    assert pm.get_password("github", "testuser") is None
+
+def test_value_cache_skips_lookups_overtaken_by_writes(temp_db_path, mock_keyring):
+    """Test that lookups racing a write in another thread do not cache the old value"""
+    pm = PasswordManager("test_key", db_path=temp_db_path, cache_size=8, thread_safe=True)
+    key = ("github", "testuser")
+
+    def overwritten_after(fetch, password):
+        def fetch_then_overwrite(*args):
+            result = fetch(*args)
+            writer = threading.Thread(target=pm.store_password, args=(*key, password))
+            writer.start()
+            writer.join()
+            return result
+        return fetch_then_overwrite
+
+    pm.store_password(*key, "old")
+    with patch.object(pm, '_fetch_encrypted', overwritten_after(pm._fetch_encrypted, "new")):
+        assert pm.get_password(*key) == "old"
+    assert pm.get_password(*key) == "new"
+
+    pm.store_password(*key, "old")
+    with patch.object(pm, '_fetch_encrypted_many',
+                      overwritten_after(pm._fetch_encrypted_many, "new")):
+        assert pm.get_passwords([key]) == ["old"]
+    assert pm.get_passwords([key]) == ["new"]
+    pm.close()
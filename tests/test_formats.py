@@ -0,0 +1,46 @@
+import io
+from unittest.mock import patch
+
+import pytest
+
+from pass_cli.formats import detect_format, read_records, write_records
+
+RECORDS = [("github", "johndoe", "pa,ss\"1"), ("gmail", "jane", "pass2")]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json", "jsonl"])
+def test_round_trip(fmt):
+    """Test that written records read back unchanged"""
+    stream = io.StringIO()
+    assert write_records(stream, fmt, iter(RECORDS)) == 2
+    stream.seek(0)
+    assert list(read_records(stream, fmt)) == RECORDS
+
+def test_json_array_streaming():
+    """Test that JSON arrays are parsed across small read chunks"""
+    data = '[ {"service": "a", "username": "u", "password": "p1"} ,\n' \
+           '{"name": "b", "login": "v", "password": "p2"}]'
+    with patch('pass_cli.formats.CHUNK_SIZE', 3):
+        records = list(read_records(io.StringIO(data), 'json'))
+    assert records == [("a", "u", "p1"), ("b", "v", "p2")]
+
+def test_missing_field():
+    """Test that entries without a password are rejected"""
+    with pytest.raises(ValueError, match="Entry 1: missing 'password'"):
+        list(read_records(io.StringIO('service,username\ngithub,johndoe\n'), 'csv'))
+
+@pytest.mark.parametrize("data", [
+    'Title,Url,Username,Password,OTPAuth\nGitHub,https://github.com,johndoe,pw,\n',
+    'folder,favorite,type,name,notes,fields,login_uri,login_username,login_password\n'
+    ',,login,GitHub,,,https://github.com,johndoe,pw\n',
+    ' URL , Username , Password \nGitHub,johndoe,pw\n',
+])
+def test_other_password_manager_headers(data):
+    """Test that headers match aliases regardless of case and padding"""
+    assert list(read_records(io.StringIO(data), 'csv')) == [("GitHub", "johndoe", "pw")]
+
+def test_detect_format():
+    """Test format detection from file names"""
+    assert detect_format('backup.JSONL') == 'jsonl'
+    assert detect_format('backup.json') == 'json'
+    assert detect_format('<stdin>') == 'csv'
@@ -0,0 +1,83 @@
+import collections
+import math
+
+import pytest
+
+from pass_cli import wordlist
+from pass_cli.generator import SYMBOLS, PassphraseGenerator, PasswordGenerator
+
+
+def test_policy_and_exclusions():
+    """Test that every password has each class and no excluded characters"""
+    generator = PasswordGenerator(12, exclude='0O1lI')
+    passwords = list(generator.generate_many(500)) + [generator.generate()]
+    assert len(passwords) == 501
+    for password in passwords:
+        assert len(password) == 12
+        assert any(c.islower() for c in password)
+        assert any(c.isupper() for c in password)
+        assert any(c.isdigit() for c in password)
+        assert any(c in SYMBOLS for c in password)
+        assert not set(password) & set('0O1lI')
+    assert len(set(passwords)) == 501
+
+
+def test_uniform_alphabet():
+    """Test that rejection sampling leaves no modulo bias"""
+    # 26 + 10 characters: a plain byte % 36 would favour the first 4 by 1/7
+    generator = PasswordGenerator(36, ['lower', 'digits'], require_each=False)
+    counts = collections.Counter(''.join(generator.generate_many(20000)))
+    expected = 20000
+    assert len(counts) == 36
+    assert max(abs(count - expected) for count in counts.values()) < 6 * math.sqrt(expected)
+    assert generator.entropy_bits == pytest.approx(36 * math.log2(36))
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'classes': ['lower', 'emoji']},
+    {'classes': []},
+    {'classes': ['digits'], 'exclude': '0123456789'},
+    {'length': 3},
+    {'length': 0, 'require_each': False},
+])
+def test_invalid_policy(kwargs):
+    """Test that impossible policies are rejected up front"""
+    with pytest.raises(ValueError):
+        PasswordGenerator(**kwargs)
+
+
+def test_passphrase_rules():
+    """Test word count, separators, capitalization and entropy targets"""
+    words = set(wordlist.load())
+    assert len(words) == 7776
+
+    generator = PassphraseGenerator(5, separator=' ', capitalize='first')
+    parts = generator.generate().split(' ')
+    assert len(parts) == 5
+    assert parts[0][0].isupper() and parts[0].lower() in words
+    assert all(part in words for part in parts[1:])
+    assert generator.entropy_bits == pytest.approx(5 * math.log2(7776))
+
+    generator = PassphraseGenerator(4, capitalize='all')
+    assert all(part[0].isupper() for part in next(iter(generator)).split('-'))
+
+    generator = PassphraseGenerator.for_entropy(80, capitalize='random')
+    assert generator.words == 6 and generator.entropy_bits >= 80
+    assert PassphraseGenerator.for_entropy(64).words == 5
+    assert len(list(generator.generate_many(3))) == 3
+
+    with pytest.raises(ValueError):
+        PassphraseGenerator(capitalize='shout')
+    with pytest.raises(ValueError):
+        PassphraseGenerator(0)
+
+
+def test_wordlist_pack_roundtrip():
+    """Test that a packed wordlist reads back word for word"""
+    words = ['alpha', 'bravo', 'charlie', 'x' * 70000]
+    packed = wordlist.Wordlist(wordlist.pack(words))
+    assert list(packed) == words and packed[-1] == words[-1]
+    with pytest.raises(ValueError):
+        wordlist.pack(['alpha', 'alpha'])
+    with pytest.raises(ValueError):
+        wordlist.Wordlist(b'not a wordlist')
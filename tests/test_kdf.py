@@ -0,0 +1,34 @@
+import pytest
+
+from pass_cli import kdf
+
+
+@pytest.mark.parametrize('algorithm', kdf.available_algorithms())
+def test_derive_is_deterministic_per_spec(algorithm):
+    """Test that a spec reproduces its key and fresh salts give different keys"""
+    spec = kdf.new_spec(algorithm)
+    assert spec['params'] == kdf.TEST_PARAMS[algorithm]
+    key = kdf.derive(b'secret', spec)
+    assert len(key) == 32
+    assert kdf.derive(b'secret', dict(spec)) == key
+    assert kdf.derive(b'other', spec) != key
+    assert kdf.derive(b'secret', kdf.new_spec(algorithm)) != key
+
+
+def test_same_strength_ignores_salt():
+    spec = kdf.new_spec('scrypt')
+    assert kdf.same_strength(spec, kdf.new_spec('scrypt'))
+    assert not kdf.same_strength(spec, kdf.new_spec('scrypt', {'n': 2 ** 5, 'r': 8, 'p': 1}))
+    assert not kdf.same_strength(spec, kdf.LEGACY_SPEC)
+
+
+def test_calibrate_pbkdf2():
+    params, elapsed = kdf.calibrate('pbkdf2', 0.01)
+    assert params['iterations'] >= 1000
+    assert elapsed > 0
+
+
+def test_unknown_algorithm(monkeypatch):
+    monkeypatch.setenv(kdf.KDF_ENV, 'md5')
+    with pytest.raises(ValueError):
+        kdf.default_algorithm()
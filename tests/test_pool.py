@@ -0,0 +1,87 @@
+import sqlite3
+import threading
+
+import pytest
+
+from pass_cli.pool import ConnectionPool
+
+
+@pytest.fixture
+def connect(tmp_path):
+    db_path = str(tmp_path / 'pool.db')
+
+    def factory():
+        conn = sqlite3.connect(db_path, timeout=0, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    return factory
+
+
+def test_single_connection_mode(connect):
+    """Test that without readers every statement uses the writer connection"""
+    pool = ConnectionPool(connect)
+    with pool.read() as conn:
+        assert conn is pool.writer_conn
+    pool.close()
+
+
+def test_readers_are_bounded_and_reused(connect):
+    """Test that reader connections are opened on demand up to the limit"""
+    pool = ConnectionPool(connect, readers=2)
+    with pool.read() as first, pool.read() as second:
+        assert first is not second
+        assert first is not pool.writer_conn
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute('CREATE TABLE t (x)')
+    with pool.read() as conn:
+        assert conn in (first, second)
+    assert pool.stats()['readers_open'] == 2
+    pool.close()
+
+
+def test_close_includes_checked_out_readers(connect):
+    """Test that close() also closes reader connections still in use"""
+    pool = ConnectionPool(connect, readers=2)
+    with pool.read() as idle:
+        pass
+    with pool.read() as busy, pool.read() as other:
+        pool.close()
+        for conn in (idle, busy, other):
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute('SELECT 1')
+
+
+def test_run_write_retries_busy_database(connect):
+    """Test that a write blocked by another connection is retried with backoff"""
+    pool = ConnectionPool(connect, retries=20, backoff=0.001)
+    pool.run_write(lambda conn: conn.execute('CREATE TABLE t (x)'))
+
+    other = connect()
+    other.execute('BEGIN IMMEDIATE')
+    timer = threading.Timer(0.05, other.commit)
+    timer.start()
+    pool.run_write(lambda conn: conn.execute('INSERT INTO t VALUES (1)'))
+    timer.join()
+
+    assert pool.stats()['busy_retries'] > 0
+    assert pool.writer_conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    other.close()
+    pool.close()
+
+
+def test_run_write_gives_up(connect):
+    """Test that non-busy errors are not retried and busy ones eventually raise"""
+    pool = ConnectionPool(connect, retries=2, backoff=0.001)
+    with pytest.raises(sqlite3.OperationalError, match='no such table'):
+        pool.run_write(lambda conn: conn.execute('INSERT INTO missing VALUES (1)'))
+    assert pool.stats()['busy_retries'] == 0
+
+    pool.run_write(lambda conn: conn.execute('CREATE TABLE t (x)'))
+    other = connect()
+    other.execute('BEGIN IMMEDIATE')
+    with pytest.raises(sqlite3.OperationalError, match='locked'):
+        pool.run_write(lambda conn: conn.execute('INSERT INTO t VALUES (1)'))
+    assert pool.stats()['busy_retries'] == 2
+    other.rollback()
+    other.close()
+    pool.close()
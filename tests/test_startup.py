@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ('cryptography', 'keyring', 'pyperclip')
+IMPORT_BUDGET_MS = float(os.getenv('PASS_CLI_IMPORT_BUDGET_MS', '50'))
+
+
+def run_cli(args: list, *options: str) -> subprocess.CompletedProcess:
+    code = (
+        "import sys\n"
+        "from pass_cli.cli import main\n"
+        "try:\n"
+        f"    main({args!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    return subprocess.run([sys.executable, *options, '-c', code],
+                          capture_output=True, text=True, check=True)
+
+
+def own_import_ms(importtime_output: str) -> float:
+    """Import time of pass_cli itself, excluding click, from -X importtime output"""
+    total = click = 0
+    counting = False
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        counting = counting or name.startswith('pass_cli')
+        if not counting:
+            continue
+        if depth == 1:
+            total += int(cumulative)
+        if name == 'click' and not click:
+            click = int(cumulative)
+    return (total - click) / 1000
+
+
+def test_help_does_not_import_heavy_modules():
+    """Test that --help loads no command modules or heavy dependencies"""
+    result = run_cli(['--help'])
+    assert 'pass-cli retrieve' in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_generate_does_not_import_heavy_modules():
+    """Test that generate --no-copy needs neither cryptography nor the clipboard"""
+    result = run_cli(['generate', '--no-copy'])
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_passphrase_does_not_import_heavy_modules():
+    """Test that generate --passphrase only adds the packed wordlist"""
+    result = run_cli(['generate', '--passphrase', '--no-copy'])
+    lines = result.stdout.strip().splitlines()
+    assert len(lines[-2].split('-')) == 6
+    assert lines[-1] == '[]'
+
+
+def test_help_import_time_budget():
+    """Test that the import time of --help stays within budget"""
+    result = run_cli(['--help'], '-X', 'importtime')
+    assert own_import_ms(result.stderr) < IMPORT_BUDGET_MS
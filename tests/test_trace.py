@@ -0,0 +1,65 @@
+import json
+import sys
+from unittest.mock import patch
+
+from pass_cli import trace
+
+
+def test_span_is_noop_when_disabled():
+    """Test that disabled tracing hands out one shared no-op span"""
+    trace.disable()
+    assert trace.span('a') is trace.span('b')
+    with trace.span('a'):
+        pass
+
+
+def test_nested_spans_are_recorded():
+    """Test that spans record their depth and are summarized per name"""
+    tracer = trace.enable()
+    try:
+        with trace.span('outer'):
+            for _ in range(2):
+                with trace.span('inner'):
+                    pass
+    finally:
+        trace.disable()
+
+    assert [(r['name'], r['depth']) for r in tracer.records] == [
+        ('inner', 1), ('inner', 1), ('outer', 0)]
+    assert [(name, depth, count) for name, depth, count, _ in tracer.summary()] == [
+        ('outer', 0, 1), ('inner', 1, 2)]
+
+
+def test_parse_target():
+    """Test that trace targets default to JSON output"""
+    assert trace.parse_target('cprofile:/tmp/out.prof') == ('cprofile', '/tmp/out.prof')
+    assert trace.parse_target('json:/tmp/out.jsonl') == ('json', '/tmp/out.jsonl')
+    assert trace.parse_target('/tmp/out.jsonl') == ('json', '/tmp/out.jsonl')
+
+
+def test_session_writes_json_records(tmp_path):
+    """Test that a JSON trace session appends one record per span and a total"""
+    path = tmp_path / 'trace.jsonl'
+    argv = ['pass-cli', '--profile', 'store', '-s', 'x', '-u', 'y', '-p', 'SECRET']
+    session = trace.Session(target=str(path))
+    with trace.span('kdf.derive'):
+        pass
+    with patch.object(sys, 'argv', argv):
+        session.finish()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r['name'] for r in records] == ['kdf.derive', 'total']
+    assert records[0]['command'] == 'store' and 'SECRET' not in path.read_text()
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert trace.span('kdf.derive') is trace.span('other')
+
+
+def test_session_writes_cprofile_stats(tmp_path):
+    """Test that a cProfile session dumps stats readable by pstats"""
+    import pstats
+
+    path = tmp_path / 'trace.prof'
+    session = trace.Session(target=f'cprofile:{path}')
+    sum(range(1000))
+    session.finish()
+    assert pstats.Stats(str(path)).total_calls > 0
@@ -1,10 +1,14 @@
+import os
 import subprocess
+import time
 from unittest.mock import patch
 
 import pytest
 
-from pass_cli.utils import (check_initialized, check_sudo,
-                            generate_strong_password)
+from pass_cli.auth import AuthToken
+from pass_cli.database import PasswordManager
+from pass_cli.utils import (check_auth, check_initialized, check_sudo,
+                            generate_strong_password, parse_secret_ref)
 
 
 def test_check_sudo_success():
@@ -19,14 +23,53 @@ def test_check_sudo_failure():
         mock_run.side_effect = subprocess.CalledProcessError(1, "sudo")
         assert check_sudo() == False
 
-def test_check_initialized():
-    """Test initialization check"""
-    with patch('pass_cli.database.PasswordManager._has_encryption_key') as mock_has_key:
-        mock_has_key.return_value = True
-        assert check_initialized() == True
-        
-        mock_has_key.return_value = False
-        assert check_initialized() == False
+def test_check_initialized(tmp_path, monkeypatch):
+    """Test the read-only initialization check"""
+    db_path = str(tmp_path / 'test_passwords.db')
+    monkeypatch.setattr('pass_cli.database.PasswordManager.DEFAULT_DB_PATH', db_path)
+    assert check_initialized() == False
+    assert not os.path.exists(db_path)
+
+    PasswordManager(db_path=db_path).close()
+    assert check_initialized() == False
+
+    with patch('keyring.set_password'):
+        PasswordManager("test_key", db_path=db_path).close()
+    assert check_initialized() == True
+
+def test_check_auth_caches_result(tmp_path, monkeypatch):
+    """Test that a successful auth check is reused until the token expires"""
+    monkeypatch.setattr('pass_cli.database.PasswordManager.DEFAULT_DB_PATH',
+                        str(tmp_path / 'test_passwords.db'))
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value.returncode = 0
+        assert check_auth() == True
+        assert check_auth() == True
+        assert mock_run.call_count == 1
+
+    token = AuthToken(str(tmp_path))
+    with patch('time.time', return_value=time.time() + token.ttl + 1):
+        assert token.is_valid('sudo') == False
+    assert token.is_valid('none') == False
+
+def test_check_auth_failure_not_cached(tmp_path, monkeypatch):
+    """Test that failed auth checks are not remembered"""
+    monkeypatch.setattr('pass_cli.database.PasswordManager.DEFAULT_DB_PATH',
+                        str(tmp_path / 'test_passwords.db'))
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value.returncode = 1
+        assert check_auth() == False
+        assert check_auth() == False
+        assert mock_run.call_count == 2
+
+def test_no_auth_backend(tmp_path, monkeypatch):
+    """Test selecting the 'none' backend"""
+    monkeypatch.setattr('pass_cli.database.PasswordManager.DEFAULT_DB_PATH',
+                        str(tmp_path / 'test_passwords.db'))
+    monkeypatch.setenv('PASS_CLI_AUTH', 'none')
+    with patch('subprocess.run') as mock_run:
+        assert check_auth() == True
+        mock_run.assert_not_called()
 
 def test_generate_strong_password():
     """Test password generation"""
@@ -40,4 +83,15 @@ def test_generate_strong_password():
 
     # Test encryption key
     key = generate_strong_password(is_encryption_key=True)
-    assert len(key) == 64 
\ No newline at end of file
+    assert len(key) == 64 
+
+
+def test_parse_secret_ref():
+    """Test secret references with and without an explicit variable name"""
+    assert parse_secret_ref('github:johndoe') == ('GITHUB_JOHNDOE', 'github', 'johndoe')
+    assert parse_secret_ref('DB_PASS=prod/db:app') == ('DB_PASS', 'prod/db', 'app')
+    assert parse_secret_ref('https://example.com:me') == ('HTTPS_EXAMPLE_COM_ME',
+                                                         'https://example.com', 'me')
+    for ref in ('github', ':johndoe', 'github:', 'DB_PASS=github'):
+        with pytest.raises(ValueError):
+            parse_secret_ref(ref)